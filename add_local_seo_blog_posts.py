@@ -1,263 +0,0 @@
-
-#!/usr/bin/env python3
-"""
-Add two new blog posts with local DFW keywords for SEO optimization
-"""
-
-from datetime import datetime, timedelta
-from app import app, db
-from models import BlogPost
-
-def add_local_seo_blog_posts():
-    """Add two blog posts targeting local DFW keywords"""
-    
-    with app.app_context():
-        # Blog Post 1: Essential Website Features for DFW Startups
-        post1_slug = "essential-website-features-dallas-fort-worth-texas-startups"
-        existing_post1 = BlogPost.query.filter_by(slug=post1_slug).first()
-        
-        if not existing_post1:
-            post1 = BlogPost()
-            post1.title = "5 Essential Website Features for Dallas Fort Worth Texas Startups"
-            post1.slug = post1_slug
-            post1.content = """<h2>Why Dallas Fort Worth Texas Startups Need Strategic Website Features</h2>
-
-<p>Starting a business in the competitive Dallas Fort Worth Texas market means every advantage counts. Your website isn't just a digital business card—it's your most powerful tool for attracting local customers and establishing credibility in the DFW area.</p>
-
-<p>After working with dozens of <strong>small businesses in Dallas Fort Worth Texas</strong>, I've identified the five essential features that make the difference between a website that sits idle and one that actively grows your business.</p>
-
-<h2>1. Local SEO Optimization for Dallas Fort Worth Texas</h2>
-
-<p>Your <strong>small business website</strong> needs to show up when potential customers search for services in your area. This means:</p>
-
-<ul>
-<li><strong>Location-based keywords:</strong> Naturally incorporating "Dallas," "Fort Worth," "DFW," and specific neighborhoods</li>
-<li><strong>Google My Business integration:</strong> Ensuring consistency between your website and local listings</li>
-<li><strong>Local schema markup:</strong> Helping search engines understand your Dallas Fort Worth Texas location</li>
-<li><strong>Area-specific content:</strong> Mentioning local landmarks, events, and community connections</li>
-</ul>
-
-<h3>Real Example:</h3>
-<p>Instead of "Best HVAC Services," optimize for "Best HVAC Services Dallas Fort Worth Texas" or "Emergency AC Repair Plano Texas."</p>
-
-<h2>2. Mobile-First Design for DFW Customers</h2>
-
-<p>Over 70% of your Dallas Fort Worth Texas customers will find you on their mobile devices. Your <strong>affordable website development</strong> must prioritize:</p>
-
-<ul>
-<li><strong>Responsive design:</strong> Perfect display on all devices</li>
-<li><strong>Fast loading times:</strong> Under 3 seconds on mobile networks</li>
-<li><strong>Touch-friendly navigation:</strong> Easy-to-tap buttons and menus</li>
-<li><strong>Readable fonts:</strong> Clear typography without zooming</li>
-</ul>
-
-<h2>3. Clear Contact Information and Service Area</h2>
-
-<p>Dallas Fort Worth Texas customers need to know immediately if you serve their area. Include:</p>
-
-<ul>
-<li><strong>Prominent phone number:</strong> Click-to-call functionality</li>
-<li><strong>Service area map:</strong> Clear coverage of DFW neighborhoods</li>
-<li><strong>Multiple contact methods:</strong> Phone, email, contact forms</li>
-<li><strong>Response time expectations:</strong> When customers can expect to hear back</li>
-</ul>
-
-<h2>4. Social Proof from Dallas Fort Worth Texas Customers</h2>
-
-<p>Local testimonials carry incredible weight. Your <strong>professional web design Dallas Fort Worth Texas</strong> should showcase:</p>
-
-<ul>
-<li><strong>Customer reviews:</strong> From real DFW area clients</li>
-<li><strong>Before/after photos:</strong> Local project examples</li>
-<li><strong>Case studies:</strong> Detailed success stories</li>
-<li><strong>Google Reviews integration:</strong> Automated display of fresh reviews</li>
-</ul>
-
-<h2>5. E-commerce Setup for Local Shops (When Applicable)</h2>
-
-<p>Many Dallas Fort Worth Texas small businesses benefit from online sales capabilities:</p>
-
-<ul>
-<li><strong>Local pickup options:</strong> Reduce shipping costs for DFW customers</li>
-<li><strong>Inventory management:</strong> Real-time stock updates</li>
-<li><strong>Payment processing:</strong> Secure, trusted payment methods</li>
-<li><strong>Local delivery zones:</strong> Service area-specific shipping</li>
-</ul>
-
-<h2>Getting Started with Your Dallas Fort Worth Texas Website</h2>
-
-<p>These features might seem overwhelming, but the right <strong>web design Dallas Fort Worth Texas</strong> professional can implement them seamlessly. The key is starting with a strategic foundation rather than trying to add features later.</p>
-
-<h3>Questions to Ask Your Web Designer:</h3>
-<ol>
-<li>How will you optimize my site for Dallas Fort Worth Texas searches?</li>
-<li>Can you show me examples of mobile-optimized local business websites?</li>
-<li>How do you integrate customer testimonials and reviews?</li>
-<li>What's your process for local SEO optimization?</li>
-<li>Do you provide training on managing my website content?</li>
-</ol>
-
-<h2>Ready to Launch Your Dallas Fort Worth Texas Business Online?</h2>
-
-<p>Your competitors with professional websites are already capturing customers you could serve. Don't let another month pass without establishing your professional online presence in the Dallas Fort Worth Texas market.</p>
-
-<p>Ready to discuss your <strong>small business web design</strong> needs? Let's create a website that works as hard as you do to grow your Dallas Fort Worth Texas business.</p>"""
-            
-            post1.excerpt = "Discover the 5 essential website features every Dallas Fort Worth Texas startup needs to attract local customers and compete effectively in the DFW market. From local SEO to mobile optimization."
-            post1.tags = "Dallas Fort Worth Texas, web design, small business website, local SEO, startup website, DFW business, mobile-first design"
-            post1.meta_description = "Essential website features for Dallas Fort Worth Texas startups. Local SEO, mobile design, and small business web strategies for DFW market success."
-            post1.featured_image = "https://hosting.photobucket.com/ffe76a37-34ae-4a9f-949c-780379ff74c1/e492cf05-51b9-4103-b275-9fde5aaf7461.jpeg?width=590&height=370&fit=bounds"
-            post1.published = True
-            post1.author = "Krysta McAlister"
-            
-            db.session.add(post1)
-            print("✅ Added blog post 1: Essential Website Features for DFW Startups")
-        else:
-            print("ℹ️  Blog post 1 already exists")
-        
-        # Blog Post 2: How Professional Website Boosts Local Business
-        post2_slug = "professional-website-boost-dallas-fort-worth-texas-local-business"
-        existing_post2 = BlogPost.query.filter_by(slug=post2_slug).first()
-        
-        if not existing_post2:
-            post2 = BlogPost()
-            post2.title = "How a Professional Website Can Boost Your Dallas Fort Worth Texas Local Business"
-            post2.slug = post2_slug
-            post2.content = """<h2>The Reality of Local Business Competition in Dallas Fort Worth Texas</h2>
-
-<p>Walk down any street in Dallas, Fort Worth, Plano, or Arlington, and you'll see the same story playing out: local businesses struggling to compete against larger companies with professional online presences. But here's what many <strong>Dallas Fort Worth Texas small business</strong> owners don't realize—a professional website levels the playing field.</p>
-
-<p>In the DFW market, your website isn't just an expense; it's your most cost-effective employee, working 24/7 to attract customers while you sleep.</p>
-
-<h2>The Professional Website Advantage in Dallas Fort Worth Texas</h2>
-
-<h3>1. Instant Credibility in the DFW Market</h3>
-
-<p>When someone searches for "best [your service] near me" in Dallas Fort Worth Texas, what do they see? If your competitors have professional websites and you don't, the choice is already made.</p>
-
-<p><strong>Professional web design Dallas Fort Worth Texas</strong> immediately signals:</p>
-<ul>
-<li>You're established and trustworthy</li>
-<li>You invest in quality (including your services)</li>
-<li>You're accessible and responsive to customers</li>
-<li>You understand modern business practices</li>
-</ul>
-
-<h3>Real DFW Example:</h3>
-<p>Two HVAC companies serve the same Plano neighborhood. Company A has a professional website with customer reviews, service area maps, and clear pricing. Company B relies on word-of-mouth and a basic Facebook page. When the AC breaks on a hot Texas day, which one gets the call?</p>
-
-<h2>2. 24/7 Lead Generation for Your Dallas Fort Worth Texas Business</h2>
-
-<p>Your <strong>small business website</strong> works around the clock, capturing leads even when your doors are closed:</p>
-
-<ul>
-<li><strong>Contact forms:</strong> Customers can reach out anytime</li>
-<li><strong>Service descriptions:</strong> Answer common questions automatically</li>
-<li><strong>Online scheduling:</strong> Let customers book appointments</li>
-<li><strong>Emergency contact:</strong> Capture urgent service requests</li>
-</ul>
-
-<h3>The Numbers Don't Lie:</h3>
-<p>Local businesses with professional websites see an average of 30-50% more inquiries than those relying solely on social media or directory listings.</p>
-
-<h2>3. Local SEO Dominance in Dallas Fort Worth Texas Searches</h2>
-
-<p>When someone searches "plumber near me" or "best restaurant Fort Worth," Google decides who appears first. <strong>Affordable website development Dallas Fort Worth Texas</strong> that includes local SEO optimization ensures you're found by customers in your service area.</p>
-
-<h4>Key Local SEO Benefits:</h4>
-<ul>
-<li><strong>Google My Business integration:</strong> Consistent information across platforms</li>
-<li><strong>Location-based keywords:</strong> Target specific DFW neighborhoods</li>
-<li><strong>Local content:</strong> Blog about Dallas Fort Worth Texas community topics</li>
-<li><strong>Review management:</strong> Showcase customer satisfaction</li>
-</ul>
-
-<h2>4. Competitive Advantage Against Larger Companies</h2>
-
-<p>Large corporations may have bigger budgets, but they can't match your local knowledge and personal service. A professional website highlights these advantages:</p>
-
-<ul>
-<li><strong>Local expertise:</strong> Understanding of DFW market specifics</li>
-<li><strong>Personal relationships:</strong> Face-to-face service availability</li>
-<li><strong>Community involvement:</strong> Local partnerships and sponsorships</li>
-<li><strong>Faster response times:</strong> Immediate local service</li>
-</ul>
-
-<h2>5. Cost-Effective Marketing for Dallas Fort Worth Texas Small Businesses</h2>
-
-<p>Traditional advertising in the DFW market is expensive. Radio, TV, and print ads cost thousands with limited targeting. Your website provides:</p>
-
-<ul>
-<li><strong>Targeted reach:</strong> Only people searching for your services</li>
-<li><strong>Measurable results:</strong> Track exactly where leads come from</li>
-<li><strong>Long-term value:</strong> One-time investment with ongoing returns</li>
-<li><strong>Content marketing:</strong> Build authority through helpful blog posts</li>
-</ul>
-
-<h2>Real Success Stories from Dallas Fort Worth Texas Businesses</h2>
-
-<h3>Case Study: Local Landscaping Company</h3>
-<p><strong>Challenge:</strong> Competing against national chains in the Plano market<br>
-<strong>Solution:</strong> Professional website with local project galleries and service area maps<br>
-<strong>Result:</strong> 200% increase in consultation requests within 6 months</p>
-
-<h3>Case Study: Family Restaurant in Fort Worth</h3>
-<p><strong>Challenge:</strong> Low visibility against chain restaurants<br>
-<strong>Solution:</strong> Website with online ordering and local food blog content<br>
-<strong>Result:</strong> 40% increase in takeout orders and improved Google rankings</p>
-
-<h2>What Makes a Website "Professional" for Dallas Fort Worth Texas Businesses?</h2>
-
-<p>Not all websites are created equal. Your <strong>local business web design</strong> should include:</p>
-
-<ul>
-<li><strong>Mobile optimization:</strong> Perfect display on all devices</li>
-<li><strong>Fast loading times:</strong> Under 3 seconds on mobile</li>
-<li><strong>Clear navigation:</strong> Easy to find information</li>
-<li><strong>Professional photography:</strong> High-quality images of your work</li>
-<li><strong>Customer testimonials:</strong> Social proof from DFW clients</li>
-<li><strong>Contact information:</strong> Multiple ways to reach you</li>
-<li><strong>Service area maps:</strong> Clear coverage of DFW neighborhoods</li>
-</ul>
-
-<h2>Getting Started: Your Dallas Fort Worth Texas Website Journey</h2>
-
-<p>The best time to invest in professional <strong>web design Dallas Fort Worth Texas</strong> was yesterday. The second-best time is today.</p>
-
-<h3>Steps to Take Right Now:</h3>
-<ol>
-<li><strong>Audit your current online presence:</strong> What do customers see when they search for you?</li>
-<li><strong>Research your competition:</strong> What websites rank well in your DFW market?</li>
-<li><strong>Define your goals:</strong> More leads? Online sales? Brand awareness?</li>
-<li><strong>Choose the right partner:</strong> Find a designer who understands local Dallas Fort Worth Texas business</li>
-</ol>
-
-<h2>Don't Wait—Your Dallas Fort Worth Texas Competitors Aren't</h2>
-
-<p>Every day without a professional website is another day your competitors capture customers you could serve. In the competitive Dallas Fort Worth Texas market, a professional website isn't a luxury—it's a necessity.</p>
-
-<p>Ready to boost your local business with <strong>professional web design Dallas Fort Worth Texas</strong>? Let's discuss how a strategic website can transform your business and help you dominate your local market.</p>
-
-<p>The question isn't whether you can afford to invest in a professional website. The question is: can you afford not to?</p>"""
-            
-            post2.excerpt = "Discover how a professional website gives Dallas Fort Worth Texas local businesses a competitive edge. Real case studies and strategies for dominating your DFW market online."
-            post2.tags = "Dallas Fort Worth Texas, local business, professional website, small business marketing, DFW competition, web design ROI"
-            post2.meta_description = "How professional websites boost Dallas Fort Worth Texas local businesses. Real DFW case studies showing increased leads and competitive advantages."
-            post2.featured_image = "https://hosting.photobucket.com/ffe76a37-34ae-4a9f-949c-780379ff74c1/e4e81bd3-3ea4-4b1e-9d8e-59560dedd1c6.jpeg?width=960&height=720&fit=bounds"
-            post2.published = True
-            post2.author = "Krysta McAlister"
-            
-            db.session.add(post2)
-            print("✅ Added blog post 2: How Professional Website Boosts DFW Local Business")
-        else:
-            print("ℹ️  Blog post 2 already exists")
-        
-        try:
-            db.session.commit()
-            print("🎉 Successfully added local SEO blog posts to database!")
-        except Exception as e:
-            db.session.rollback()
-            print(f"❌ Error adding blog posts: {e}")
-
-if __name__ == "__main__":
-    add_local_seo_blog_posts()
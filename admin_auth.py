@@ -4,6 +4,7 @@ Provides customizable login URLs and strong password requirements
 """
 
 import logging
+import os
 import re
 import secrets
 from datetime import datetime, timedelta
@@ -12,6 +13,7 @@ from flask import (
     Blueprint,
     flash,
     jsonify,
+    make_response,
     redirect,
     render_template,
     request,
@@ -19,12 +21,83 @@ from flask import (
     url_for,
 )
 from flask_login import current_user, login_required, login_user, logout_user
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, object_session
 from werkzeug.security import generate_password_hash
 
+from app_cache import cache
+from login_throttle import check_login_attempt, refund_login_attempt
 from models import AdminUser, db
+from repository import admin_by_login_url
 
 admin_auth = Blueprint("admin_auth", __name__)
 
+# Commits broadcast a change to every worker; the TTL only bounds a missed one
+LOGIN_URL_INDEX_TTL = float(os.environ.get("ADMIN_LOGIN_URL_INDEX_SECONDS", "300"))
+LOGIN_URL_TAG = "admin_login_urls"
+
+
+class LoginUrlIndex:
+    """In-memory set of valid custom login URLs so probes are rejected without a query"""
+
+    def __init__(self, ttl=LOGIN_URL_INDEX_TTL):
+        self.ttl = ttl
+
+    @staticmethod
+    def invalidate():
+        """Drop the index in every worker once an AdminUser change commits"""
+        cache.invalidate([LOGIN_URL_TAG])
+
+    @staticmethod
+    def _query():
+        rows = db.session.query(AdminUser.custom_login_url).all()
+        return frozenset(row.custom_login_url for row in rows)
+
+    def __contains__(self, url_path):
+        try:
+            urls = cache.get_or_set(
+                LOGIN_URL_TAG, self._query, ttl=self.ttl, tags=[LOGIN_URL_TAG]
+            )
+        except SQLAlchemyError as e:
+            # Fall through to the normal lookup rather than locking admins out
+            logging.error(f"Error loading admin login URLs: {e}")
+            return True
+        return url_path in urls
+
+
+login_urls = LoginUrlIndex()
+
+
+def _flag_login_url_change(target):
+    """Mark the session so the index is rebuilt once the change commits"""
+    db_session = object_session(target)
+    if db_session is not None:
+        db_session.info["admin_login_urls_changed"] = True
+
+
+@event.listens_for(AdminUser, "after_insert")
+@event.listens_for(AdminUser, "after_delete")
+def _login_url_added_or_removed(mapper, connection, target):
+    _flag_login_url_change(target)
+
+
+@event.listens_for(AdminUser, "after_update")
+def _login_url_updated(mapper, connection, target):
+    if inspect(target).attrs.custom_login_url.history.has_changes():
+        _flag_login_url_change(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _rebuild_login_urls(db_session):
+    if db_session.info.pop("admin_login_urls_changed", False):
+        login_urls.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_login_url_change(db_session):
+    db_session.info.pop("admin_login_urls_changed", None)
+
 
 def validate_password_strength(password):
     """
@@ -127,8 +200,12 @@ def setup_admin():
 @admin_auth.route("/admin-<url_path>", methods=["GET", "POST"])
 def login(url_path):
     """Dynamic login route using custom URL"""
+    # Probes for unknown URLs are answered from memory, without a query
+    if url_path not in login_urls:
+        return render_template("404.html"), 404
+
     # Find admin user by custom URL
-    admin = AdminUser.query.filter_by(custom_login_url=url_path).first()
+    admin = admin_by_login_url(url_path)
 
     if not admin:
         # Invalid URL - redirect to 404 to avoid revealing admin URLs
@@ -138,6 +215,19 @@ def login(url_path):
         return redirect(url_for("admin_dashboard"))
 
     if request.method == "POST":
+        # Throttle per IP and per account before any password hash is computed
+        wait = check_login_attempt(request.remote_addr, admin.id)
+        if wait:
+            logging.warning(f"Throttled admin login attempt from {request.remote_addr}")
+            flash(
+                "Too many login attempts. Please wait a moment and try again.", "error"
+            )
+            response = make_response(
+                render_template("admin_login.html", admin=admin), 429
+            )
+            response.headers["Retry-After"] = str(wait)
+            return response
+
         try:
             username = request.form.get("username", "").strip()
             password = request.form.get("password", "")
@@ -157,6 +247,7 @@ def login(url_path):
                     return render_template("admin_login.html", admin=admin)
 
                 # Successful login
+                refund_login_attempt(request.remote_addr, admin.id)
                 admin.reset_login_attempts()
                 db.session.commit()
                 login_user(admin)
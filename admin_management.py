@@ -12,6 +12,7 @@ from getpass import getpass
 
 # Add the project root to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DB_POOL_PROFILE", "cli")
 
 from app import app, db
 from models import AdminUser
@@ -9,6 +9,12 @@ from flask_wtf.csrf import CSRFProtect
 from sqlalchemy.orm import DeclarativeBase
 from werkzeug.middleware.proxy_fix import ProxyFix
 
+from app_cache import init_cache
+from db_pool import engine_options, instrument_engine
+from fragment_cache import init_fragment_cache
+from query_recorder import init_query_recorder, record_engine
+from read_replica import REPLICA_BIND, RoutingSession, replica_binds
+
 # Initialize Sentry SDK early to avoid circular imports
 try:
     import sentry_sdk
@@ -60,7 +66,7 @@ class Base(DeclarativeBase):
     pass
 
 
-db = SQLAlchemy(model_class=Base)
+db = SQLAlchemy(model_class=Base, session_options={"class_": RoutingSession})
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -71,16 +77,23 @@ app.secret_key = os.environ.get("SESSION_SECRET")
 if not app.secret_key:
     raise ValueError("SESSION_SECRET environment variable must be set for security")
 app.config["PERMANENT_SESSION_LIFETIME"] = 60 * 60 * 24 * 30  # 30 days
+# Canonical site root for absolute links in feeds and sitemaps; never taken
+# from the request, whose Host and X-Forwarded-Host the client controls
+app.config["SITE_URL"] = os.environ.get("SITE_URL", "https://thegreycanvas.co").rstrip(
+    "/"
+)
 
-# Configure proxy for HTTPS in production
-app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
+# Configure proxy for HTTPS in production; x_for gives request.remote_addr the
+# client's address, which the login and form rate limits are keyed on
+app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1)
 
 # Configure database
 app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL")
-app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-    "pool_recycle": 300,
-    "pool_pre_ping": True,
-}
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(
+    app.config["SQLALCHEMY_DATABASE_URI"]
+)
+# Optional read replica for read-only pages, see read_replica.py
+app.config["SQLALCHEMY_BINDS"] = replica_binds()
 
 # Configure Flask-Mail
 app.config["MAIL_SERVER"] = os.environ.get("MAIL_SERVER", "smtp.gmail.com")
@@ -106,6 +119,9 @@ def csrf_token():
     from flask_wtf.csrf import generate_csrf
     return generate_csrf()
 
+# {% cache %} for the base.html chrome, see fragment_cache.py
+init_fragment_cache(app)
+
 # Initialize Flask-Login for admin authentication
 login_manager = LoginManager()
 login_manager.init_app(app)
@@ -119,26 +135,26 @@ login_manager.login_message_category = "info"
 @login_manager.user_loader
 def load_user(user_id):
     """Load user for Flask-Login - supports both Replit users and Admin users"""
-    from models import AdminUser, User
-
-    # Try to load as AdminUser first (for secure admin login)
-    try:
-        admin_user = AdminUser.query.get(int(user_id)) if user_id.isdigit() else None
-        if admin_user:
-            return admin_user
-    except (ValueError, TypeError):
-        pass
+    from identity import load_identity
 
-    # Fall back to Replit OAuth user
-    return User.query.get(user_id)
+    return load_identity(user_id)
 
 
-# Create database tables
+# Check the database schema
 with app.app_context():
     # Import models to register them with SQLAlchemy
     import models  # noqa: F401
-
-    db.create_all()
+    from migrations import check_schema
+
+    instrument_engine(db.engine)
+    init_query_recorder(app, db.engine)
+    if REPLICA_BIND in db.engines:
+        instrument_engine(db.engines[REPLICA_BIND])
+        record_engine(db.engines[REPLICA_BIND])
+    # Commits on any model invalidate cache entries tagged with its table
+    init_cache(db.Model, db.engine)
+    # Migrations run in the deploy step; boot only checks the schema version
+    check_schema(db)
 
 # Import routes
 from routes import *
@@ -175,11 +191,22 @@ def start_backup_system():
             except Exception as e:
                 logging.error(f"Cleanup job error: {str(e)}")
         
+        def retention_job():
+            """Archive old submissions and purge expired personal details"""
+            try:
+                from submission_retention import run_retention
+
+                with app.app_context():
+                    run_retention(db)
+            except Exception as e:
+                logging.error(f"Submission retention error: {str(e)}")
+
         def scheduler_thread():
             """Background scheduler thread"""
             # Schedule jobs
             schedule.every().day.at("02:00").do(backup_job)
             schedule.every().sunday.at("03:00").do(cleanup_job)
+            schedule.every().day.at("03:30").do(retention_job)
             
             logging.info("Backup scheduler started - Daily backups at 2:00 AM")
             logging.info(f"Next backup scheduled for: {schedule.next_run()}")
@@ -0,0 +1,559 @@
+"""
+Application cache with tag-based invalidation shared across workers
+Values live in a bounded in-process LRU and, with CACHE_SHARED=filesystem, in
+a directory shared by every worker on the host. Each entry carries tags; a
+tag is a table name ("blog_post") or a row ("blog_post:12"), and committing
+any change to that table or row invalidates every entry tagged with it.
+
+Invalidation is automatic for ORM writes: flushes and bulk statements record
+the tables they touched, and after_commit drops the matching entries here
+and broadcasts the tags to the other workers, via Postgres LISTEN/NOTIFY or,
+on other databases, an append-only log file that every worker watches.
+Workers may serve an entry for up to CACHE_WATCH_SECONDS after another
+worker's commit; TTLs bound everything else.
+
+Cache plain data (strings, dicts, tuples), never ORM instances, and treat
+returned values as read-only: the local tier hands out the stored object.
+"""
+
+import logging
+import os
+import pickle
+import re
+import select
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from functools import wraps
+from hashlib import sha256
+from pathlib import Path
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = float(os.environ.get("CACHE_DEFAULT_TTL", "300"))
+LOCAL_SIZE = int(os.environ.get("CACHE_LOCAL_SIZE", "1024"))
+# "filesystem" adds the shared tier; anything else keeps caching per worker
+SHARED_TIER = os.environ.get("CACHE_SHARED", "").lower()
+CACHE_DIR = Path(os.environ.get("CACHE_DIR", "cache"))
+# "auto" uses NOTIFY on Postgres and the log file elsewhere; "off" disables
+BROADCAST = os.environ.get("CACHE_BROADCAST", "auto").lower()
+WATCH_SECONDS = float(os.environ.get("CACHE_WATCH_SECONDS", "0.5"))
+NOTIFY_CHANNEL = "app_cache"
+# Invalidation log is rotated past this size; watchers then clear their tier
+LOG_MAX_BYTES = 1024 * 1024
+PRUNE_SECONDS = 3600
+
+MISSING = object()
+
+
+def tag_name(tag):
+    """Normalise a tag so it is also a safe stamp file name"""
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", str(tag))
+
+
+class LocalTier:
+    """Bounded LRU of (expires_at, tags, value) with a tag -> keys index"""
+
+    def __init__(self, max_entries=LOCAL_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._tag_keys = defaultdict(set)
+        # Bumped on invalidation so values computed before it are not stored
+        self._generations = defaultdict(int)
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            if entry[0] < time.monotonic():
+                self._remove(key)
+                return MISSING
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def snapshot(self, tags):
+        with self._lock:
+            return (self._epoch, tuple(self._generations[tag] for tag in tags))
+
+    def set(self, key, value, ttl, tags, snapshot=None):
+        with self._lock:
+            current = (self._epoch, tuple(self._generations[tag] for tag in tags))
+            if snapshot is not None and snapshot != current:
+                return False
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, tags, value)
+            for tag in tags:
+                self._tag_keys[tag].add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+            return True
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            for tag in entry[1]:
+                keys = self._tag_keys.get(tag)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._tag_keys[tag]
+
+    def delete(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def invalidate(self, tags):
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] += 1
+                for key in list(self._tag_keys.get(tag, ())):
+                    self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._tag_keys.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class FileTier:
+    """
+    Pickled entries in a directory shared by the workers on one host
+
+    Invalidating a tag rewrites its stamp file; an entry remembers the stamps
+    its tags had when its value was computed and is a miss once any differs.
+    """
+
+    def __init__(self, directory=CACHE_DIR):
+        self.entries = Path(directory) / "entries"
+        self.stamps = Path(directory) / "tags"
+        self.entries.mkdir(parents=True, exist_ok=True)
+        self.stamps.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key):
+        return self.entries / f"{sha256(key.encode()).hexdigest()}.pkl"
+
+    def stamp(self, tags):
+        versions = []
+        for tag in tags:
+            try:
+                versions.append((self.stamps / tag).stat().st_mtime_ns)
+            except FileNotFoundError:
+                versions.append(0)
+        return tuple(versions)
+
+    def get(self, key):
+        """(value, seconds left, tags) for a live entry, otherwise MISSING"""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as handle:
+                expires_at, tags, stamps, value = pickle.load(handle)
+        except FileNotFoundError:
+            return MISSING
+        except (OSError, pickle.PickleError, EOFError, ValueError) as e:
+            logger.warning(f"Discarding unreadable cache entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            return MISSING
+        remaining = expires_at - time.time()
+        if remaining <= 0 or self.stamp(tags) != stamps:
+            path.unlink(missing_ok=True)
+            return MISSING
+        return value, remaining, tags
+
+    def set(self, key, value, ttl, tags, stamps):
+        path = self._path(key)
+        temporary = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(temporary, "wb") as handle:
+                pickle.dump((time.time() + ttl, tags, stamps, value), handle)
+            os.replace(temporary, path)
+        except (OSError, pickle.PickleError) as e:
+            temporary.unlink(missing_ok=True)
+            logger.warning(f"Could not write shared cache entry: {e}")
+
+    def delete(self, key):
+        self._path(key).unlink(missing_ok=True)
+
+    def invalidate(self, tags):
+        for tag in tags:
+            stamp = self.stamps / tag
+            try:
+                stamp.write_text(str(time.time_ns()))
+            except OSError as e:
+                # Without a fresh stamp the entries stay valid; drop them all
+                logger.error(f"Could not stamp cache tag {tag}, clearing: {e}")
+                self.clear()
+                return
+
+    def clear(self):
+        for path in self.entries.glob("*.pkl"):
+            path.unlink(missing_ok=True)
+
+    def prune(self):
+        """Delete expired entries and stamps no live entry can still depend on"""
+        now = time.time()
+        oldest_stamp = now - max(DEFAULT_TTL, PRUNE_SECONDS) * 24
+        for path in self.entries.glob("*.pkl"):
+            try:
+                with open(path, "rb") as handle:
+                    expired = pickle.load(handle)[0] < now
+            except (OSError, pickle.PickleError, EOFError, ValueError):
+                expired = True
+            if expired:
+                path.unlink(missing_ok=True)
+        # A missing stamp reads as 0, which only ever turns hits into misses
+        for path in self.stamps.iterdir():
+            if path.stat().st_mtime < oldest_stamp:
+                path.unlink(missing_ok=True)
+
+
+class LogBroadcaster:
+    """Invalidations appended to a log file that every worker on the host tails"""
+
+    def __init__(self, directory=CACHE_DIR):
+        self.path = Path(directory) / "invalidations.log"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.touch(exist_ok=True)
+        stat = self.path.stat()
+        self._inode, self._offset = stat.st_ino, stat.st_size
+
+    def publish(self, tags):
+        line = f"{os.getpid()} {' '.join(tags)}\n".encode()
+        # O_APPEND writes of one short line land whole, even from many workers
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+            size = os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+        if size > LOG_MAX_BYTES:
+            # Later writers create a fresh file; watchers notice the new inode
+            os.replace(self.path, self.path.with_suffix(".log.1"))
+
+    def listen(self, on_invalidate, on_reset):
+        pid = str(os.getpid())
+        while True:
+            time.sleep(WATCH_SECONDS)
+            try:
+                try:
+                    stat = self.path.stat()
+                except FileNotFoundError:
+                    continue
+                if stat.st_ino != self._inode:
+                    # Rotated: lines written before the rotation may be unread
+                    self._inode, self._offset = stat.st_ino, 0
+                    on_reset()
+                size = stat.st_size
+                if size == self._offset:
+                    continue
+                with open(self.path, "rb") as handle:
+                    handle.seek(self._offset)
+                    data = handle.read(size - self._offset)
+                complete = data.rfind(b"\n") + 1
+                self._offset += complete
+                for line in data[:complete].decode().splitlines():
+                    sender, _, tags = line.partition(" ")
+                    if sender != pid and tags:
+                        on_invalidate(tags.split(), remote=True)
+            except OSError as e:
+                logger.error(f"Cache invalidation log unreadable: {e}")
+
+
+class NotifyBroadcaster:
+    """Invalidations sent with Postgres NOTIFY and received with LISTEN"""
+
+    # NOTIFY payloads are limited to 8000 bytes
+    MAX_PAYLOAD = 7900
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def publish(self, tags):
+        payloads, current = [], ""
+        for tag in tags:
+            if current and len(current) + len(tag) + 1 > self.MAX_PAYLOAD:
+                payloads.append(current)
+                current = ""
+            current = f"{current} {tag}" if current else tag
+        payloads.append(current)
+        try:
+            with self.engine.connect() as connection:
+                for payload in payloads:
+                    connection.execute(
+                        text("SELECT pg_notify(:channel, :payload)"),
+                        {
+                            "channel": NOTIFY_CHANNEL,
+                            "payload": f"{os.getpid()} {payload}",
+                        },
+                    )
+                connection.commit()
+        except SQLAlchemyError as e:
+            logger.error(f"Could not broadcast cache invalidation: {e}")
+
+    def listen(self, on_invalidate, on_reset):
+        pid = str(os.getpid())
+        while True:
+            try:
+                # A dedicated connection, detached so the pool never reuses it
+                raw = self.engine.raw_connection()
+                raw.detach()
+                connection = raw.driver_connection
+                connection.autocommit = True
+                connection.cursor().execute(f"LISTEN {NOTIFY_CHANNEL}")
+                # Anything may have changed while no connection was listening
+                on_reset()
+                while True:
+                    if select.select([connection], [], [], 5) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notice = connection.notifies.pop(0)
+                        sender, _, tags = notice.payload.partition(" ")
+                        if sender != pid and tags:
+                            on_invalidate(tags.split(), remote=True)
+            except Exception as e:
+                logger.error(f"Cache invalidation listener failed, reconnecting: {e}")
+                time.sleep(5)
+
+
+class Cache:
+    """Two-tier cache; see the module docstring"""
+
+    def __init__(self, local_size=LOCAL_SIZE):
+        self.local = LocalTier(local_size)
+        self.attached = []
+        self.shared = None
+        self.broadcaster = None
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.remote_invalidations = 0
+
+    def configure(self, engine=None):
+        """Attach the shared tier and start listening for other workers"""
+        if SHARED_TIER == "filesystem":
+            self.shared = FileTier()
+        mode = BROADCAST
+        if mode == "auto":
+            is_postgres = engine is not None and engine.dialect.name == "postgresql"
+            mode = "notify" if is_postgres else "file"
+        if mode == "notify":
+            self.broadcaster = NotifyBroadcaster(engine)
+        elif mode == "file":
+            self.broadcaster = LogBroadcaster()
+        if self.broadcaster is not None:
+            threading.Thread(
+                target=self.broadcaster.listen,
+                args=(self.invalidate, self._clear_local),
+                daemon=True,
+                name="app-cache-invalidation",
+            ).start()
+        if self.shared is not None:
+            threading.Thread(target=self._prune_loop, daemon=True).start()
+
+    def _prune_loop(self):
+        while True:
+            time.sleep(PRUNE_SECONDS)
+            try:
+                self.shared.prune()
+            except OSError as e:
+                logger.error(f"Shared cache prune failed: {e}")
+
+    def get(self, key, default=None):
+        value = self.local.get(key)
+        if value is not MISSING:
+            self.local_hits += 1
+            return value
+        if self.shared is not None:
+            entry = self.shared.get(key)
+            if entry is not MISSING:
+                self.shared_hits += 1
+                self.local.set(key, *entry)
+                return entry[0]
+        self.misses += 1
+        return default
+
+    def set(self, key, value, ttl=None, tags=()):
+        ttl = DEFAULT_TTL if ttl is None else ttl
+        tags = tuple(sorted({tag_name(tag) for tag in tags}))
+        self.local.set(key, value, ttl, tags)
+        if self.shared is not None:
+            self.shared.set(key, value, ttl, tags, self.shared.stamp(tags))
+
+    def get_or_set(self, key, builder, ttl=None, tags=()):
+        """
+        Cached value for key, calling builder() to compute it on a miss
+
+        A value whose tags are invalidated while builder() runs is returned
+        but not stored, so a concurrent commit never leaves a stale entry.
+        """
+        value = self.local.get(key)
+        if value is not MISSING:
+            self.local_hits += 1
+            return value
+        ttl = DEFAULT_TTL if ttl is None else ttl
+        tags = tuple(sorted({tag_name(tag) for tag in tags}))
+        if self.shared is not None:
+            entry = self.shared.get(key)
+            if entry is not MISSING:
+                self.shared_hits += 1
+                self.local.set(key, *entry)
+                return entry[0]
+        self.misses += 1
+
+        snapshot = self.local.snapshot(tags)
+        stamps = self.shared.stamp(tags) if self.shared is not None else None
+        value = builder()
+        if self.local.set(key, value, ttl, tags, snapshot) and self.shared is not None:
+            self.shared.set(key, value, ttl, tags, stamps)
+        return value
+
+    def delete(self, key):
+        self.local.delete(key)
+        if self.shared is not None:
+            self.shared.delete(key)
+
+    def invalidate(self, tags, remote=False):
+        """Drop every entry carrying any of the tags, here and in other workers"""
+        tags = sorted({tag_name(tag) for tag in tags})
+        if not tags:
+            return
+        for tier in (self.local, *self.attached):
+            tier.invalidate(tags)
+        if remote:
+            self.remote_invalidations += 1
+            # NOTIFY can come from another host, whose shared tier is not ours
+            if self.shared is not None and isinstance(
+                self.broadcaster, NotifyBroadcaster
+            ):
+                self.shared.invalidate(tags)
+            return
+        self.invalidations += 1
+        if self.shared is not None:
+            self.shared.invalidate(tags)
+        if self.broadcaster is not None:
+            self.broadcaster.publish(tags)
+
+    def attach(self, tier):
+        """
+        Invalidate another LocalTier along with this cache
+
+        For per-worker values that must not reach the shared tier, such as
+        detached ORM rows: they keep their own tier but are dropped by the
+        same commits and broadcasts as every other entry.
+        """
+        self.attached.append(tier)
+
+    def _clear_local(self):
+        for tier in (self.local, *self.attached):
+            tier.clear()
+
+    def clear(self):
+        self._clear_local()
+        if self.shared is not None:
+            self.shared.clear()
+
+    def metrics(self):
+        lookups = self.local_hits + self.shared_hits + self.misses
+        return {
+            "local_entries": len(self.local),
+            "local_hits": self.local_hits,
+            "shared_tier": SHARED_TIER or None,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_ratio": (
+                round((self.local_hits + self.shared_hits) / lookups, 3)
+                if lookups
+                else None
+            ),
+            "broadcast": type(self.broadcaster).__name__ if self.broadcaster else None,
+            "invalidations_sent": self.invalidations,
+            "invalidations_received": self.remote_invalidations,
+        }
+
+
+cache = Cache()
+
+
+def cached(ttl=None, tags=()):
+    """Cache a function's result per argument list, e.g. @cached(600, ["project"])"""
+
+    def decorator(function):
+        prefix = f"{function.__module__}.{function.__qualname__}"
+
+        @wraps(function)
+        def wrapped(*args, **kwargs):
+            key = f"{prefix}:{args!r}:{sorted(kwargs.items())!r}"
+            return cache.get_or_set(
+                key, lambda: function(*args, **kwargs), ttl=ttl, tags=tags
+            )
+
+        wrapped.invalidate = lambda: cache.invalidate(tags)
+        return wrapped
+
+    return decorator
+
+
+def _record_tags(session, tags):
+    session.info.setdefault("cache_tags", set()).update(tags)
+
+
+def _row_written(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is None:
+        return
+    table = mapper.persist_selectable.name
+    tags = {table}
+    identity = mapper.primary_key_from_instance(target)
+    if len(identity) == 1 and identity[0] is not None:
+        tags.add(f"{table}:{identity[0]}")
+    _record_tags(session, tags)
+
+
+def _statement_executed(orm_execute_state):
+    # Bulk UPDATE/DELETE and dialect upserts skip the unit of work's events
+    if (
+        orm_execute_state.is_update
+        or orm_execute_state.is_delete
+        or (orm_execute_state.is_insert)
+    ):
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            _record_tags(orm_execute_state.session, {table.name})
+
+
+def _committed(session):
+    tags = session.info.pop("cache_tags", None)
+    if tags:
+        cache.invalidate(tags)
+
+
+def _rolled_back(session):
+    session.info.pop("cache_tags", None)
+
+
+def init_cache(model_base, engine):
+    """
+    Invalidate the cache from commits on every model and start broadcasting
+
+    Args:
+        model_base: Declarative base the models in models.py derive from
+        engine: Primary engine, used for LISTEN/NOTIFY on Postgres
+    """
+    for event_name in ("after_insert", "after_update", "after_delete"):
+        event.listen(model_base, event_name, _row_written, propagate=True)
+    event.listen(Session, "do_orm_execute", _statement_executed)
+    event.listen(Session, "after_commit", _committed)
+    event.listen(Session, "after_rollback", _rolled_back)
+    cache.configure(engine)
@@ -4,6 +4,7 @@ Backup Scheduler for The Grey Canvas
 Runs daily backups and manages backup scheduling
 """
 
+import os
 import time
 import schedule
 import logging
@@ -12,6 +13,9 @@ from threading import Thread
 import signal
 import sys
 
+# Standalone scheduler process: size the database pool for background work
+os.environ.setdefault("DB_POOL_PROFILE", "background")
+
 from backup_system import run_daily_backup
 
 # Configure logging
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Blog content importer for The Grey Canvas
+Loads Markdown/HTML articles with front matter from content/blog and upserts
+changed posts in a single transaction.
+
+Usage: python content_import.py [--dir content/blog] [--dry-run]
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DB_POOL_PROFILE", "cli")
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import app, db
+from models import BlogPost
+
+try:
+    import markdown
+except ImportError:
+    # Markdown support is optional; HTML articles work without it
+    markdown = None
+
+logger = logging.getLogger(__name__)
+
+CONTENT_DIR = Path(__file__).resolve().parent / "content" / "blog"
+CONTENT_SUFFIXES = (".html", ".md")
+
+# Front matter keys mapped onto BlogPost columns
+POST_FIELDS = (
+    "title",
+    "slug",
+    "author",
+    "published",
+    "featured_image",
+    "tags",
+    "excerpt",
+    "meta_description",
+    "content",
+)
+REQUIRED_FIELDS = ("title", "slug", "content")
+MAX_LENGTHS = {
+    "title": 200,
+    "slug": 200,
+    "author": 100,
+    "featured_image": 500,
+    "tags": 500,
+    "meta_description": 160,
+}
+DEFAULT_AUTHOR = "Krysta McAlister"
+
+
+class ContentError(ValueError):
+    """Raised when a content file is malformed"""
+
+
+def parse_content_file(path):
+    """
+    Parse a content file with a `---` delimited front matter block
+
+    Args:
+        path (Path): Markdown or HTML file
+
+    Returns:
+        dict: Normalised BlogPost field values
+    """
+    text = path.read_text(encoding="utf-8")
+    lines = text.splitlines()
+    if not lines or lines[0].strip() != "---":
+        raise ContentError(f"{path.name}: missing front matter")
+
+    meta = {}
+    for index, line in enumerate(lines[1:], start=1):
+        if line.strip() == "---":
+            body = "\n".join(lines[index + 1 :])
+            break
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        key, sep, value = line.partition(":")
+        if not sep:
+            raise ContentError(f"{path.name}: invalid front matter line {index + 1}")
+        meta[key.strip()] = value.strip()
+    else:
+        raise ContentError(f"{path.name}: unterminated front matter")
+
+    unknown = set(meta) - set(POST_FIELDS)
+    if unknown:
+        raise ContentError(f"{path.name}: unknown keys {', '.join(sorted(unknown))}")
+
+    if path.suffix == ".md":
+        if markdown is None:
+            raise ContentError(f"{path.name}: install 'markdown' to import .md files")
+        body = markdown.markdown(body)
+
+    post = {field: meta.get(field) or None for field in POST_FIELDS}
+    post["content"] = body.strip() or None
+    post["slug"] = post["slug"] or path.stem
+    post["author"] = post["author"] or DEFAULT_AUTHOR
+    post["published"] = (meta.get("published") or "true").lower() in [
+        "true",
+        "yes",
+        "1",
+    ]
+
+    for field in REQUIRED_FIELDS:
+        if not post[field]:
+            raise ContentError(f"{path.name}: '{field}' is required")
+    for field, limit in MAX_LENGTHS.items():
+        if post[field] and len(post[field]) > limit:
+            raise ContentError(f"{path.name}: '{field}' exceeds {limit} characters")
+    return post
+
+
+def content_hash(values, fields=POST_FIELDS):
+    """Stable hash of the imported fields, used to skip unchanged posts"""
+    normalised = {}
+    for field in fields:
+        value = values.get(field)
+        if isinstance(value, str):
+            value = value.strip() or None
+        normalised[field] = value
+    payload = json.dumps(normalised, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_content(directory=CONTENT_DIR):
+    """Parse every content file in the directory, keyed by slug"""
+    posts = {}
+    for path in sorted(Path(directory).iterdir()):
+        if path.suffix not in CONTENT_SUFFIXES:
+            continue
+        post = parse_content_file(path)
+        if post["slug"] in posts:
+            raise ContentError(f"{path.name}: duplicate slug '{post['slug']}'")
+        posts[post["slug"]] = post
+    return posts
+
+
+def import_content(directory=CONTENT_DIR, dry_run=False):
+    """
+    Upsert posts whose content hash differs from the database row
+
+    Args:
+        directory (Path): Content directory to import
+        dry_run (bool): Report changes without writing them
+
+    Returns:
+        dict: Slugs grouped into created, updated and unchanged
+    """
+    posts = load_content(directory)
+    result = {"created": [], "updated": [], "unchanged": []}
+    if not posts:
+        return result
+
+    # One query for every post the content directory knows about
+    existing = {
+        post.slug: post
+        for post in BlogPost.query.filter(BlogPost.slug.in_(list(posts))).all()
+    }
+
+    for slug, values in posts.items():
+        current = existing.get(slug)
+        if current is not None:
+            # Fields left out of the front matter are filled at write time
+            fields = [field for field in POST_FIELDS if values[field] is not None]
+            stored = {field: getattr(current, field) for field in fields}
+            if content_hash(stored, fields) == content_hash(values, fields):
+                result["unchanged"].append(slug)
+                continue
+            result["updated"].append(slug)
+            target = current
+        else:
+            result["created"].append(slug)
+            target = BlogPost()
+            if not dry_run:
+                db.session.add(target)
+
+        if not dry_run:
+            for field in POST_FIELDS:
+                setattr(target, field, values[field])
+
+    if dry_run:
+        db.session.rollback()
+        return result
+
+    try:
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        raise
+    return result
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import blog content files")
+    parser.add_argument("--dir", default=str(CONTENT_DIR), help="Content directory")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Show changes without writing"
+    )
+    args = parser.parse_args()
+
+    with app.app_context():
+        try:
+            result = import_content(Path(args.dir), dry_run=args.dry_run)
+        except ContentError as e:
+            print(f"❌ Content error: {e}")
+            return 1
+        except SQLAlchemyError as e:
+            logging.error(f"Database error importing blog content: {e}")
+            print(f"❌ Database error: {e}")
+            return 1
+
+    prefix = "Would import" if args.dry_run else "Imported"
+    print(
+        f"✅ {prefix}: {len(result['created'])} created, "
+        f"{len(result['updated'])} updated, {len(result['unchanged'])} unchanged"
+    )
+    for key in ("created", "updated"):
+        for slug in result[key]:
+            print(f"   {key}: {slug}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
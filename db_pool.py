@@ -0,0 +1,179 @@
+"""
+Database connection pool profiles and live pool metrics
+Each kind of process gets a pool sized for its workload, chosen with
+DB_POOL_PROFILE ("web", "background" or "cli") and fine-tuned with
+DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT and DB_POOL_RECYCLE.
+
+Web and background pools record how long every checkout waited, so a worker
+stalled on the pool shows up in /admin/metrics rather than as slow pages.
+"""
+
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from sqlalchemy import event
+from sqlalchemy.exc import DisconnectionError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+POOL_PROFILES = {
+    # gunicorn workers: a few request threads each, fail fast when saturated
+    "web": {"pool_size": 5, "max_overflow": 5, "pool_timeout": 10},
+    # schedulers and queue workers: few connections, patient checkouts
+    "background": {"pool_size": 2, "max_overflow": 2, "pool_timeout": 30},
+    # one-off scripts: no idle connections kept between statements
+    "cli": {"poolclass": NullPool},
+}
+DEFAULT_PROFILE = "web"
+POOL_RECYCLE_SECONDS = 300
+
+ENV_OVERRIDES = {
+    "DB_POOL_SIZE": ("pool_size", int),
+    "DB_MAX_OVERFLOW": ("max_overflow", int),
+    "DB_POOL_TIMEOUT": ("pool_timeout", float),
+    "DB_POOL_RECYCLE": ("pool_recycle", int),
+}
+
+# Upper bounds of the checkout wait histogram, in milliseconds
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolMetrics:
+    """Checkout latency histogram and connection lifecycle counters"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._counts = [0] * (len(self.buckets) + 1)
+            self._total_ms = 0.0
+            self._max_ms = 0.0
+            self.checkouts = 0
+            self.timeouts = 0
+            self.connects = 0
+            self.invalidations = 0
+            self.pre_ping_failures = 0
+
+    def incr(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def observe_wait(self, seconds):
+        ms = seconds * 1000.0
+        with self._lock:
+            self._counts[bisect_left(self.buckets, ms)] += 1
+            self._total_ms += ms
+            self._max_ms = max(self._max_ms, ms)
+            self.checkouts += 1
+
+    def histogram(self):
+        with self._lock:
+            counts = list(self._counts)
+            total_ms, max_ms, checkouts = self._total_ms, self._max_ms, self.checkouts
+        labels = [f"le_{bound}ms" for bound in self.buckets] + ["inf"]
+        return {
+            "buckets": dict(zip(labels, counts)),
+            "count": checkouts,
+            "mean_ms": round(total_ms / checkouts, 3) if checkouts else 0.0,
+            "max_ms": round(max_ms, 3),
+        }
+
+
+metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times how long each checkout waits for a connection"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            metrics.incr("timeouts")
+            raise
+        metrics.observe_wait(time.perf_counter() - started)
+        return connection
+
+
+def current_profile():
+    profile = os.environ.get("DB_POOL_PROFILE", DEFAULT_PROFILE).lower()
+    if profile not in POOL_PROFILES:
+        logger.warning(f"Unknown DB_POOL_PROFILE '{profile}', using {DEFAULT_PROFILE}")
+        return DEFAULT_PROFILE
+    return profile
+
+
+def engine_options(database_url=None, profile=None):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for a pool profile
+
+    Args:
+        database_url (str): Target database; in-memory SQLite keeps its own pool
+        profile (str): Profile name, defaulting to DB_POOL_PROFILE
+    """
+    profile = profile or current_profile()
+    options = {"pool_recycle": POOL_RECYCLE_SECONDS, "pool_pre_ping": True}
+    if database_url and ":memory:" in database_url:
+        return options
+
+    options.update(POOL_PROFILES[profile])
+    if options.get("poolclass") is NullPool:
+        options.pop("pool_recycle")
+        return options
+
+    options["poolclass"] = InstrumentedQueuePool
+    for env_name, (option, cast) in ENV_OVERRIDES.items():
+        value = os.environ.get(env_name)
+        if value:
+            options[option] = cast(value)
+    return options
+
+
+def instrument_engine(engine):
+    """Count connects, invalidations and pre-ping failures on an engine's pool"""
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        metrics.incr("connects")
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.incr("invalidations")
+        # Pre-ping reports a dead connection as a DisconnectionError
+        if isinstance(exception, DisconnectionError):
+            metrics.incr("pre_ping_failures")
+
+
+def get_pool_metrics(engine):
+    """Pool occupancy and checkout statistics for this worker"""
+    pool = engine.pool
+    stats = {
+        "profile": current_profile(),
+        "pool_class": type(pool).__name__,
+        "connects": metrics.connects,
+        "invalidations": metrics.invalidations,
+        "pre_ping_failures": metrics.pre_ping_failures,
+    }
+    if isinstance(pool, QueuePool):
+        stats.update(
+            {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(0, pool.overflow()),
+                "max_overflow": pool._max_overflow,
+                "timeout_seconds": pool.timeout(),
+                "checkout_timeouts": metrics.timeouts,
+                "checkout_wait": metrics.histogram(),
+            }
+        )
+    return stats
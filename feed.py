@@ -0,0 +1,175 @@
+"""
+Atom and RSS feeds for the blog
+Feeds live in the app cache tagged "blog_post", so a committed post write
+drops them in every worker, and are rebuilt incrementally: only entries whose
+post changed are rendered again.
+"""
+
+import hashlib
+import logging
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+
+from app import db
+from app_cache import MISSING, LocalTier, cache
+from models import BlogPost
+
+logger = logging.getLogger(__name__)
+
+FEED_ENTRY_LIMIT = 20
+# Commits invalidate feeds; the TTL only bounds what a missed broadcast costs
+FEED_CACHE_SECONDS = float(os.environ.get("FEED_CACHE_SECONDS", "600"))
+# Rendered entries, keyed by post version; enough for both feeds on a few hosts
+ENTRY_CACHE_SIZE = int(os.environ.get("FEED_ENTRY_CACHE_SIZE", "200"))
+
+FEED_TITLE = "The Grey Canvas Blog"
+FEED_SUBTITLE = "Web design insights for Texas small businesses"
+
+_entry_cache = LocalTier(ENTRY_CACHE_SIZE)
+
+
+def _attr(value):
+    """Escape a value for a double-quoted XML attribute"""
+    return escape(value, {'"': "&quot;"})
+
+
+def _rfc3339(value):
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _rfc822(value):
+    return format_datetime(value.replace(tzinfo=timezone.utc), usegmt=True)
+
+
+def _load_posts():
+    """Fetch only the columns the feed renders"""
+    return (
+        db.session.query(
+            BlogPost.id,
+            BlogPost.title,
+            BlogPost.slug,
+            BlogPost.excerpt,
+            BlogPost.meta_description,
+            BlogPost.author,
+            BlogPost.tags,
+            BlogPost.created_at,
+            BlogPost.updated_at,
+        )
+        .filter(BlogPost.published == True)  # noqa: E712
+        .order_by(BlogPost.created_at.desc())
+        .limit(FEED_ENTRY_LIMIT)
+        .all()
+    )
+
+
+def _summary(post):
+    return post.excerpt or post.meta_description or ""
+
+
+def _atom_entry(post, base_url):
+    url = f"{base_url}/blog/{post.slug}"
+    updated = post.updated_at or post.created_at
+    entry = "  <entry>\n"
+    entry += f"    <title>{escape(post.title)}</title>\n"
+    entry += f'    <link rel="alternate" type="text/html" href="{_attr(url)}"/>\n'
+    entry += f"    <id>{escape(url)}</id>\n"
+    entry += f"    <published>{_rfc3339(post.created_at)}</published>\n"
+    entry += f"    <updated>{_rfc3339(updated)}</updated>\n"
+    entry += f"    <author><name>{escape(post.author)}</name></author>\n"
+    for tag in (post.tags or "").split(","):
+        if tag.strip():
+            entry += f'    <category term="{_attr(tag.strip())}"/>\n'
+    entry += f"    <summary>{escape(_summary(post))}</summary>\n"
+    entry += "  </entry>\n"
+    return entry
+
+
+def _rss_item(post, base_url):
+    url = f"{base_url}/blog/{post.slug}"
+    item = "    <item>\n"
+    item += f"      <title>{escape(post.title)}</title>\n"
+    item += f"      <link>{escape(url)}</link>\n"
+    item += f'      <guid isPermaLink="true">{escape(url)}</guid>\n'
+    item += f"      <pubDate>{_rfc822(post.created_at)}</pubDate>\n"
+    item += f"      <dc:creator>{escape(post.author)}</dc:creator>\n"
+    for tag in (post.tags or "").split(","):
+        if tag.strip():
+            item += f"      <category>{escape(tag.strip())}</category>\n"
+    item += f"      <description>{escape(_summary(post))}</description>\n"
+    item += "    </item>\n"
+    return item
+
+
+def _render_entries(kind, posts, base_url):
+    """Render entries, reusing fragments for posts that have not changed"""
+    render = _atom_entry if kind == "atom" else _rss_item
+    fragments = []
+    for post in posts:
+        # Edited posts get a new key; the LRU drops the old fragment
+        key = (kind, base_url, post.id, post.updated_at)
+        fragment = _entry_cache.get(key)
+        if fragment is MISSING:
+            fragment = render(post, base_url)
+            _entry_cache.set(key, fragment, FEED_CACHE_SECONDS * 6, ())
+        fragments.append(fragment)
+    return "".join(fragments)
+
+
+def _build_feed(kind, base_url):
+    posts = _load_posts()
+    site = _attr(base_url)
+    last_modified = max(
+        (post.updated_at or post.created_at for post in posts),
+        default=datetime(2025, 1, 1),
+    )
+    entries = _render_entries(kind, posts, base_url)
+
+    if kind == "atom":
+        body = '<?xml version="1.0" encoding="UTF-8"?>\n'
+        body += '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+        body += f"  <title>{escape(FEED_TITLE)}</title>\n"
+        body += f"  <subtitle>{escape(FEED_SUBTITLE)}</subtitle>\n"
+        body += f'  <link rel="alternate" type="text/html" href="{site}/blog"/>\n'
+        body += f'  <link rel="self" href="{site}/blog/feed.xml"/>\n'
+        body += f"  <id>{site}/blog</id>\n"
+        body += f"  <updated>{_rfc3339(last_modified)}</updated>\n"
+        body += entries
+        body += "</feed>"
+    else:
+        body = '<?xml version="1.0" encoding="UTF-8"?>\n'
+        body += '<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/">\n'
+        body += "  <channel>\n"
+        body += f"    <title>{escape(FEED_TITLE)}</title>\n"
+        body += f"    <link>{site}/blog</link>\n"
+        body += f"    <description>{escape(FEED_SUBTITLE)}</description>\n"
+        body += "    <language>en-us</language>\n"
+        body += f"    <lastBuildDate>{_rfc822(last_modified)}</lastBuildDate>\n"
+        body += entries
+        body += "  </channel>\n"
+        body += "</rss>"
+
+    etag = hashlib.sha256(body.encode("utf-8")).hexdigest()[:32]
+    logger.debug(f"Rebuilt {kind} feed for {base_url}")
+    return body, etag, last_modified
+
+
+def get_feed(kind, base_url):
+    """
+    Return (body, etag, last_modified) for the requested feed
+
+    Args:
+        kind (str): "atom" or "rss"
+        base_url (str): Canonical site root (SITE_URL) for absolute links
+
+    Returns:
+        tuple: Cached feed document with its validators
+    """
+    body, etag, last_modified = cache.get_or_set(
+        f"feed:{kind}:{base_url}",
+        lambda: _build_feed(kind, base_url),
+        ttl=FEED_CACHE_SECONDS,
+        tags=("blog_post",),
+    )
+    return body, etag, last_modified
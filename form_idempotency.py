@@ -0,0 +1,118 @@
+"""
+Idempotency keys for contact and intake submissions
+Each rendered form carries a random key. The key is saved in the same
+transaction as the submission, so a double-click or browser resubmit of the
+same render is recognised and answered with the original success response
+instead of a second row and a second email.
+
+Keys seen by this worker are remembered in memory, so a repeated post to the
+same worker costs no query at all.
+"""
+
+import logging
+import os
+import random
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from models import FormSubmissionKey
+
+logger = logging.getLogger(__name__)
+
+# Replays after this long are treated as new submissions
+KEY_TTL_SECONDS = float(os.environ.get("FORM_IDEMPOTENCY_SECONDS", "86400"))
+MAX_LOCAL_KEYS = int(os.environ.get("FORM_IDEMPOTENCY_MAX_KEYS", "10000"))
+KEY_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+def issue_submission_key():
+    """Random key placed in a hidden field when a form is rendered"""
+    return secrets.token_hex(16)
+
+
+def valid_key(key):
+    return bool(key) and KEY_PATTERN.match(key) is not None
+
+
+class SubmissionKeyStore:
+    """Recently used keys, in memory for this worker and in the database for all"""
+
+    def __init__(self, ttl=KEY_TTL_SECONDS, max_keys=MAX_LOCAL_KEYS):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+        self.replays = 0
+
+    def _remember(self, form, key, now):
+        with self._lock:
+            self._seen[(form, key)] = now
+            self._seen.move_to_end((form, key))
+            while len(self._seen) > self.max_keys:
+                self._seen.popitem(last=False)
+
+    def _seen_locally(self, form, key, now):
+        with self._lock:
+            used_at = self._seen.get((form, key))
+            if used_at is None:
+                return False
+            if now - used_at > self.ttl:
+                del self._seen[(form, key)]
+                return False
+            return True
+
+    def is_replay(self, form, key):
+        """True if a submission with this key was already saved"""
+        if not valid_key(key):
+            return False
+        now = time.time()
+        if self._seen_locally(form, key, now):
+            self.replays += 1
+            return True
+        try:
+            row = db.session.get(FormSubmissionKey, key)
+        except SQLAlchemyError as e:
+            # Failing open risks a duplicate; failing closed would lose the lead
+            logger.error(f"Idempotency lookup failed: {e}")
+            db.session.rollback()
+            return False
+        if row is None or row.form != form:
+            return False
+        if now - row.created_at > self.ttl:
+            # Let add() reuse the expired key; the flush turns it into an UPDATE
+            db.session.delete(row)
+            return False
+        self._remember(form, key, row.created_at)
+        self.replays += 1
+        return True
+
+    def add(self, form, key):
+        """
+        Stage the key alongside a new submission; the caller commits
+
+        A concurrent post of the same key then fails the commit on the primary
+        key, which the caller treats as a replay.
+        """
+        if not valid_key(key):
+            return
+        now = time.time()
+        # Occasionally drop keys that can no longer match a replay
+        if random.random() < 0.01:
+            db.session.query(FormSubmissionKey).filter(
+                FormSubmissionKey.created_at < now - self.ttl
+            ).delete(synchronize_session=False)
+        db.session.add(FormSubmissionKey(key=key, form=form, created_at=now))
+
+    def committed(self, form, key):
+        """Remember a key whose submission was just committed"""
+        if valid_key(key):
+            self._remember(form, key, time.time())
+
+
+submission_keys = SubmissionKeyStore()
@@ -0,0 +1,147 @@
+"""
+Sliding-window rate limiting for public form endpoints
+Contact, intake and newsletter submissions are limited per client IP and
+per submitted email address. Only valid submissions that are not replays of
+an earlier post count, so a typo or a double-click never uses up a slot; an
+over-limit submission is refused before it is saved or mailed, and the view
+shows the form again with the error (a 429 with Retry-After).
+
+Limits are "<requests>/<seconds>" strings, overridable per form and key type,
+e.g. FORM_RATE_LIMIT_CONTACT_IP=5/600 or FORM_RATE_LIMIT_NEWSLETTER_EMAIL=2/3600.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+
+from flask import make_response, request
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMITS = {
+    "contact": {"ip": "5/600", "email": "3/600"},
+    "intake": {"ip": "5/3600", "email": "3/3600"},
+    "newsletter": {"ip": "10/600", "email": "3/3600"},
+}
+# Keys tracked per worker; the least recently seen are dropped beyond this
+MAX_TRACKED_KEYS = int(os.environ.get("FORM_RATE_LIMIT_MAX_KEYS", "20000"))
+
+
+def parse_limit(value):
+    """Parse "5/600" into (5, 600.0); "0" or "off" disables the limit"""
+    if value.strip().lower() in ("0", "off", "none"):
+        return None
+    count, _, seconds = value.partition("/")
+    return int(count), float(seconds or 60)
+
+
+def configured_limits():
+    limits = {}
+    for form, defaults in DEFAULT_LIMITS.items():
+        for kind, default in defaults.items():
+            env_name = f"FORM_RATE_LIMIT_{form.upper()}_{kind.upper()}"
+            limits[(form, kind)] = parse_limit(os.environ.get(env_name, default))
+    return limits
+
+
+class SlidingWindowLimiter:
+    """Per-worker sliding-window log of request times per key"""
+
+    def __init__(self, limits, max_keys=MAX_TRACKED_KEYS):
+        self.limits = limits
+        self.max_keys = max_keys
+        self._hits = OrderedDict()
+        self._lock = threading.Lock()
+        self.shed = Counter()
+
+    def hit(self, form, keys, now=None):
+        """
+        Record a submission against every key, or refuse it if any is full
+
+        Either every window is charged or none is, so a submission refused
+        for its email does not use up a slot for its IP.
+
+        Args:
+            form (str): Key into the limits table
+            keys (dict): Value per key type, e.g. {"ip": ..., "email": ...}
+
+        Returns:
+            int: 0 if allowed, otherwise seconds until a slot frees up
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            windows = []
+            for kind, value in keys.items():
+                limit = self.limits.get((form, kind))
+                if limit is None or not value:
+                    continue
+                max_requests, window = limit
+                key = (form, kind, value)
+                hits = self._hits.get(key)
+                if hits is None:
+                    hits = self._hits[key] = deque()
+                self._hits.move_to_end(key)
+                while hits and hits[0] <= now - window:
+                    hits.popleft()
+                if len(hits) >= max_requests:
+                    self.shed[f"{form}.{kind}"] += 1
+                    return max(1, int(hits[0] + window - now) + 1)
+                windows.append(hits)
+
+            for hits in windows:
+                hits.append(now)
+            while len(self._hits) > self.max_keys:
+                self._hits.popitem(last=False)
+        return 0
+
+    def metrics(self):
+        with self._lock:
+            shed = dict(self.shed)
+            tracked = len(self._hits)
+        return {
+            "shed_total": sum(shed.values()),
+            "shed": shed,
+            "tracked_keys": tracked,
+            "limits": {
+                f"{form}.{kind}": (f"{limit[0]}/{int(limit[1])}" if limit else "off")
+                for (form, kind), limit in self.limits.items()
+            },
+        }
+
+
+_limiter = SlidingWindowLimiter(configured_limits())
+
+
+RATE_LIMIT_MESSAGE = "Too many submissions. Please try again later."
+
+
+def charge_submission(form, email):
+    """
+    Count a valid, non-duplicate submission against its client IP and email
+
+    Args:
+        form (str): Key into the limits table ("contact", "intake", "newsletter")
+        email (str): The submitter's email address
+
+    Returns:
+        int: 0 if the submission may proceed, otherwise seconds to wait
+    """
+    email = (email or "").strip().lower()
+    wait = _limiter.hit(form, {"ip": request.remote_addr, "email": email})
+    if wait:
+        logger.warning(f"Shed {form} submission from {request.remote_addr}")
+    return wait
+
+
+def too_many_submissions(body, wait):
+    """A 429 carrying the re-rendered form page and Retry-After"""
+    response = make_response(body, 429)
+    response.headers["Retry-After"] = str(wait)
+    return response
+
+
+def get_rate_limit_metrics():
+    """Shed-request counters for this worker"""
+    return _limiter.metrics()
@@ -1,9 +1,30 @@
 from flask_wtf import FlaskForm
-from wtforms import EmailField, SelectField, StringField, TelField, TextAreaField
+from wtforms import (
+    EmailField,
+    HiddenField,
+    SelectField,
+    StringField,
+    TelField,
+    TextAreaField,
+)
 from wtforms.validators import DataRequired, Email, Length, Optional
 
 
-class ContactForm(FlaskForm):
+class SpamGuardMixin:
+    """Honeypot and render-time fields checked by spam_filter"""
+
+    # Hidden from people with CSS; bots that fill every input reveal themselves
+    website = StringField("Website")
+    form_started = HiddenField()
+
+
+class IdempotentFormMixin:
+    """Per-render key that lets a resubmitted form be recognised"""
+
+    submission_key = HiddenField()
+
+
+class ContactForm(SpamGuardMixin, IdempotentFormMixin, FlaskForm):
     name = StringField("Name", validators=[DataRequired(), Length(min=2, max=100)])
     email = EmailField("Email", validators=[DataRequired(), Email()])
     phone = TelField("Phone", validators=[Optional(), Length(max=20)])
@@ -15,7 +36,7 @@ class ContactForm(FlaskForm):
     )
 
 
-class IntakeForm(FlaskForm):
+class IntakeForm(SpamGuardMixin, IdempotentFormMixin, FlaskForm):
     business_name = StringField(
         "Business Name", validators=[DataRequired(), Length(min=2, max=100)]
     )
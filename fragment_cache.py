@@ -0,0 +1,118 @@
+"""
+Jinja fragment caching
+{% cache key, ttl %}...{% endcache %} renders its body once per key and
+serves the stored HTML until the TTL runs out (FRAGMENT_CACHE_TTL when the
+ttl is left out). base.html uses it for the chrome every page repeats; keep
+anything per-request (CSRF tokens, flashes, the signed-in user) outside the
+tag, or put what it depends on into the key, as the navigation does with
+request.endpoint.
+
+Fragments live in a per-worker LRU and only change when templates do, so the
+cache is off in debug mode, where templates reload on edit. Per-key hit and
+miss counts are in /admin/metrics for tuning.
+"""
+
+import os
+import threading
+import time
+from collections import Counter
+
+from jinja2 import nodes
+from jinja2.ext import Extension
+
+from app_cache import MISSING, LocalTier
+
+FRAGMENT_CACHE = os.environ.get("FRAGMENT_CACHE", "1").lower() not in (
+    "0",
+    "false",
+    "off",
+)
+FRAGMENT_CACHE_TTL = float(os.environ.get("FRAGMENT_CACHE_TTL", "3600"))
+FRAGMENT_CACHE_SIZE = int(os.environ.get("FRAGMENT_CACHE_SIZE", "256"))
+
+
+class FragmentCache:
+    """Rendered template fragments with per-key hit/miss counts"""
+
+    def __init__(self, max_entries=FRAGMENT_CACHE_SIZE):
+        self.enabled = FRAGMENT_CACHE
+        self.store = LocalTier(max_entries)
+        self.hits = Counter()
+        self.misses = Counter()
+        self.render_seconds = Counter()
+        self._lock = threading.Lock()
+
+    def render(self, key, ttl, caller):
+        if not self.enabled:
+            return caller()
+        html = self.store.get(key)
+        if html is not MISSING:
+            with self._lock:
+                self.hits[key] += 1
+            return html
+        started = time.perf_counter()
+        html = caller()
+        with self._lock:
+            self.misses[key] += 1
+            self.render_seconds[key] += time.perf_counter() - started
+        self.store.set(key, html, FRAGMENT_CACHE_TTL if ttl is None else ttl, ())
+        return html
+
+    def clear(self):
+        self.store.clear()
+
+    def metrics(self):
+        with self._lock:
+            keys = sorted(set(self.hits) | set(self.misses))
+            fragments = {
+                key: {
+                    "hits": self.hits[key],
+                    "misses": self.misses[key],
+                    "mean_render_ms": (
+                        round(self.render_seconds[key] * 1000 / self.misses[key], 3)
+                        if self.misses[key]
+                        else None
+                    ),
+                }
+                for key in keys
+            }
+            hits, misses = sum(self.hits.values()), sum(self.misses.values())
+        return {
+            "enabled": self.enabled,
+            "entries": len(self.store),
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 3) if hits + misses else None,
+            "fragments": fragments,
+        }
+
+
+fragments = FragmentCache()
+
+
+class FragmentCacheExtension(Extension):
+    """Adds {% cache key[, ttl] %}...{% endcache %}"""
+
+    tags = {"cache"}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        if parser.stream.skip_if("comma"):
+            args.append(parser.parse_expression())
+        else:
+            args.append(nodes.Const(None))
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method("_render", args), [], [], body
+        ).set_lineno(lineno)
+
+    def _render(self, key, ttl, caller):
+        return fragments.render(str(key), ttl, caller)
+
+
+def init_fragment_cache(app):
+    """Register {% cache %} on the app's Jinja environment"""
+    if app.debug or app.config.get("TEMPLATES_AUTO_RELOAD"):
+        fragments.enabled = False
+    app.jinja_env.add_extension(FragmentCacheExtension)
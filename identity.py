@@ -0,0 +1,118 @@
+"""
+Session identity loading for Flask-Login
+Session IDs carry the principal type ("admin:<id>" or "user:<id>") so the
+loader reads exactly one table, and recently loaded users are kept in a
+short-lived in-process cache so most requests load no user row at all.
+
+Cached users are tagged with their row in the app cache, so committing a
+change to one drops it in every worker. Bulk changes outside the ORM only
+tag the table; call clear_identity_cache after those.
+"""
+
+import os
+
+from sqlalchemy.orm.util import identity_key as orm_identity_key
+
+from app import db
+from app_cache import MISSING, LocalTier, cache, tag_name
+from models import AdminUser, User
+from repository import user_by_id
+
+CACHE_TTL = float(os.environ.get("IDENTITY_CACHE_SECONDS", "30"))
+CACHE_SIZE = int(os.environ.get("IDENTITY_CACHE_SIZE", "256"))
+
+PRINCIPALS = {"admin": AdminUser, "user": User}
+
+
+def identity_key(model, pk):
+    """Session ID for a user row, e.g. "admin:1" """
+    prefix = "admin" if model is AdminUser else "user"
+    return f"{prefix}:{pk}"
+
+
+def parse_identity(user_id):
+    """
+    Split a session ID into (model, primary key)
+
+    Unprefixed IDs from sessions created before the prefix existed are
+    treated as Replit users, matching the loader that was active then.
+    """
+    prefix, sep, pk = user_id.partition(":")
+    model = PRINCIPALS.get(prefix) if sep else None
+    if model is None:
+        return User, user_id
+    if model is AdminUser:
+        if not pk.isdigit():
+            return None, None
+        return AdminUser, int(pk)
+    return model, pk
+
+
+class IdentityCache:
+    """Bounded TTL tier of detached user snapshots, invalidated by app_cache"""
+
+    def __init__(self, ttl=CACHE_TTL, max_size=CACHE_SIZE):
+        self.ttl = ttl
+        self.store = LocalTier(max_size)
+        self.hits = 0
+        self.misses = 0
+        cache.attach(self.store)
+
+    def get(self, key):
+        snapshot = self.store.get(key)
+        if snapshot is MISSING:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return snapshot
+
+    def version(self, tags):
+        """Taken before loading, so a put after a concurrent commit is skipped"""
+        return self.store.snapshot(tags)
+
+    def put(self, key, snapshot, tags, version):
+        self.store.set(key, snapshot, self.ttl, tags, version)
+
+    def clear(self):
+        self.store.clear()
+
+
+_cache = IdentityCache()
+
+
+def load_identity(user_id):
+    """
+    Resolve a Flask-Login session ID to a user attached to this request's session
+
+    Cached snapshots are merged with load=False, which attaches a copy to the
+    session without a SELECT; changes made to it still flush normally.
+    """
+    model, pk = parse_identity(user_id)
+    if model is None:
+        return None
+
+    # A row this request already loaded stays owned by the request's session
+    if orm_identity_key(model, pk) in db.session.identity_map:
+        return db.session.get(model, pk)
+
+    key = identity_key(model, pk)
+    if _cache.ttl > 0:
+        snapshot = _cache.get(key)
+        if snapshot is not None:
+            return db.session.merge(snapshot, load=False)
+
+    tags = (tag_name(f"{model.__tablename__}:{pk}"),)
+    version = _cache.version(tags)
+    user = user_by_id(model, pk)
+    if user is None or _cache.ttl <= 0:
+        return user
+
+    # Detach the freshly loaded row as the snapshot and hand back a copy
+    db.session.expunge(user)
+    _cache.put(key, user, tags, version)
+    return db.session.merge(user, load=False)
+
+
+def clear_identity_cache():
+    """Drop every cached user, e.g. after bulk changes outside the ORM"""
+    _cache.clear()
@@ -0,0 +1,526 @@
+#!/usr/bin/env python3
+"""
+Index advisor for The Grey Canvas
+Crawls the site with the test client while recording every SELECT the app
+issues, runs EXPLAIN on each one, and reports:
+
+- missing indexes: filter/sort column sets that force a full scan or a sort,
+  checked by creating the index inside a rolled-back transaction and
+  explaining again, with the planner's cost before and after
+- redundant indexes: indexes whose columns repeat the leading columns of a
+  unique constraint, primary key or wider index
+- unused indexes: indexes no crawled statement used (and, on PostgreSQL,
+  that pg_stat_user_indexes has never seen scanned)
+
+Run it against a development or staging copy of the database: hypothetical
+indexes are built for real before being rolled back.
+
+Usage: python index_advisor.py [--path /extra/url ...] [--json]
+"""
+
+import json
+import os
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DB_POOL_PROFILE", "cli")
+
+from flask import url_for
+from sqlalchemy import event, inspect
+from sqlalchemy.sql import Select, operators, visitors
+from sqlalchemy.sql.elements import BinaryExpression
+from sqlalchemy.sql.schema import Column
+
+# Endpoints that change state, sign out, or deliberately raise
+SKIP_ENDPOINTS = {
+    "admin_auth.logout",
+    "replit_auth.login",
+    "replit_auth.authorized",
+    "replit_auth.logout",
+    "test_sentry",
+    "test_sentry_message",
+    "admin_auth.setup_admin",
+}
+EQUALITY_OPERATORS = (operators.eq, operators.is_, operators.in_op)
+
+
+@dataclass
+class CapturedStatement:
+    """A distinct SELECT seen during the crawl, with one set of parameters"""
+
+    sql: str
+    parameters: object
+    # (table, equality columns, order-by columns) for each SELECT in the statement
+    access_paths: list
+    endpoints: set = field(default_factory=set)
+    count: int = 0
+
+
+@dataclass
+class IndexInfo:
+    table: str
+    name: str
+    columns: tuple
+    kind: str  # "index", "unique" or "primary"
+
+
+@dataclass
+class Plan:
+    cost: float = None
+    indexes: set = field(default_factory=set)
+    full_scans: set = field(default_factory=set)
+    sorts: int = 0
+    detail: list = field(default_factory=list)
+
+    @property
+    def penalty(self):
+        return len(self.full_scans) + self.sorts
+
+
+def _table_column(element):
+    """The underlying table column of an ORM/Core column expression, if any"""
+    # Unwrap DESC/ASC modifiers and labels down to the column itself
+    while not isinstance(element, Column) and hasattr(element, "element"):
+        element = element.element
+    if isinstance(element, Column) and element.table is not None:
+        return element
+    return None
+
+
+def access_paths(statement):
+    """Columns each SELECT in a statement filters by equality and sorts by"""
+    paths = []
+    for select in visitors.iterate(statement):
+        if not isinstance(select, Select):
+            continue
+        filters = defaultdict(list)
+        if select.whereclause is not None:
+            for node in visitors.iterate(select.whereclause):
+                if not isinstance(node, BinaryExpression):
+                    continue
+                if node.operator not in EQUALITY_OPERATORS:
+                    continue
+                for side in (node.left, node.right):
+                    column = _table_column(side)
+                    if (
+                        column is not None
+                        and column.name not in filters[column.table.name]
+                    ):
+                        filters[column.table.name].append(column.name)
+
+        order = [_table_column(clause) for clause in select._order_by_clauses]
+        order_tables = {column.table.name for column in order if column is not None}
+        for table in set(filters) | order_tables:
+            sort_columns = []
+            if order_tables == {table} and all(column is not None for column in order):
+                sort_columns = [column.name for column in order]
+            paths.append((table, tuple(filters.get(table, [])), tuple(sort_columns)))
+    return paths
+
+
+class StatementCapture:
+    """Records distinct SELECT statements executed on an engine"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = {}
+        self.endpoint = None
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if executemany or not statement.lstrip().upper().startswith("SELECT"):
+            return
+        captured = self.statements.get(statement)
+        if captured is None:
+            compiled = getattr(context, "compiled", None)
+            paths = access_paths(compiled.statement) if compiled is not None else []
+            captured = self.statements[statement] = CapturedStatement(
+                statement, parameters, paths
+            )
+        captured.count += 1
+        if self.endpoint:
+            captured.endpoints.add(self.endpoint)
+
+
+def sample_arguments(db):
+    """Real values for URL arguments so parameterised pages are crawled too"""
+    from local_pages import get_locations
+    from models import BlogPost, ContactSubmission, Project
+
+    samples = {}
+    post = BlogPost.query.filter_by(published=True).first()
+    if post:
+        samples["slug"] = post.slug
+    project = db.session.query(Project.id).first()
+    if project:
+        samples["project_id"] = project.id
+    inquiry = db.session.query(ContactSubmission.id).first()
+    if inquiry:
+        samples["inquiry_id"] = inquiry.id
+        samples["inquiry_type"] = "contact"
+    try:
+        samples["city"] = next(iter(get_locations()["cities"]))
+    except (OSError, ValueError, StopIteration):
+        pass
+    return samples
+
+
+def crawl(app, db, capture, extra_paths=()):
+    """
+    GET every page the app serves, signed in as the first admin if one exists
+
+    Blog post views are not counted while crawling, so the report never
+    inflates the popular-posts ranking.
+    """
+    from models import AdminUser
+    from view_counter import view_counter
+
+    with app.app_context():
+        samples = sample_arguments(db)
+        admin = db.session.query(AdminUser.id).first()
+        db.session.remove()
+
+    paths = []
+    for rule in app.url_map.iter_rules():
+        if "GET" not in rule.methods or rule.endpoint in SKIP_ENDPOINTS:
+            continue
+        if rule.endpoint == "static" or "url_path" in rule.arguments:
+            continue
+        if not rule.arguments <= set(samples):
+            continue
+        with app.test_request_context():
+            paths.append(
+                (
+                    rule.endpoint,
+                    url_for(rule.endpoint, **{a: samples[a] for a in rule.arguments}),
+                )
+            )
+    paths.extend((path, path) for path in extra_paths)
+
+    client = app.test_client()
+    if admin:
+        with client.session_transaction() as session:
+            session["_user_id"] = f"admin:{admin.id}"
+
+    visited = []
+    # Page errors are summarised in the report instead of logged with tracebacks
+    app.logger.disabled = True
+    view_counter.enabled = False
+    try:
+        for endpoint, path in paths:
+            capture.endpoint = endpoint
+            response = client.get(path)
+            visited.append((path, response.status_code))
+    finally:
+        app.logger.disabled = False
+        view_counter.enabled = True
+        capture.endpoint = None
+    return visited
+
+
+def existing_indexes(engine):
+    """Indexes, unique constraints and primary keys per table, from the database"""
+    inspector = inspect(engine)
+    indexes = defaultdict(list)
+    for table in inspector.get_table_names():
+        pk = inspector.get_pk_constraint(table)
+        if pk.get("constrained_columns"):
+            indexes[table].append(
+                IndexInfo(
+                    table,
+                    pk.get("name") or f"{table}_pkey",
+                    tuple(pk["constrained_columns"]),
+                    "primary",
+                )
+            )
+        for constraint in inspector.get_unique_constraints(table):
+            columns = tuple(constraint["column_names"])
+            name = constraint.get("name") or f"{table}_{'_'.join(columns)}_key"
+            indexes[table].append(IndexInfo(table, name, columns, "unique"))
+        for index in inspector.get_indexes(table):
+            kind = "unique" if index.get("unique") else "index"
+            if any(i.name == index["name"] for i in indexes[table]):
+                continue
+            indexes[table].append(
+                IndexInfo(table, index["name"], tuple(index["column_names"]), kind)
+            )
+    return indexes
+
+
+def redundant_indexes(indexes):
+    """Plain indexes whose columns lead another index or constraint"""
+    redundant = []
+    for table_indexes in indexes.values():
+        for index in table_indexes:
+            if index.kind != "index":
+                continue
+            for other in table_indexes:
+                if other is index:
+                    continue
+                if other.columns[: len(index.columns)] != index.columns:
+                    continue
+                # Of two identical plain indexes, keep the first one
+                if other.columns == index.columns and other.kind == "index":
+                    if table_indexes.index(other) > table_indexes.index(index):
+                        continue
+                redundant.append((index, other))
+                break
+    return redundant
+
+
+def explain(connection, sql, parameters):
+    """Planner output for a statement on SQLite or PostgreSQL"""
+    plan = Plan()
+    if connection.dialect.name == "postgresql":
+        rows = connection.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {sql}", parameters
+        ).scalar()
+        root = (json.loads(rows) if isinstance(rows, str) else rows)[0]["Plan"]
+        plan.cost = root["Total Cost"]
+        nodes = [root]
+        while nodes:
+            node = nodes.pop()
+            nodes.extend(node.get("Plans", []))
+            node_type = node["Node Type"]
+            plan.detail.append(node_type)
+            if node_type == "Seq Scan":
+                plan.full_scans.add(node["Relation Name"])
+            elif node_type in ("Sort", "Incremental Sort"):
+                plan.sorts += 1
+            if node.get("Index Name"):
+                plan.indexes.add(node["Index Name"])
+        return plan
+
+    for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", parameters):
+        detail = row[-1]
+        plan.detail.append(detail)
+        words = detail.split()
+        if "USING" in words and "INDEX" in words:
+            plan.indexes.add(words[words.index("INDEX") + 1])
+        elif words[:1] == ["SCAN"] and len(words) > 1:
+            plan.full_scans.add(words[1])
+        if detail.startswith("USE TEMP B-TREE"):
+            plan.sorts += 1
+    return plan
+
+
+def index_name(table, columns):
+    return f"idx_{table}_{'_'.join(columns)}"
+
+
+def candidate_indexes(statements, indexes):
+    """Column lists that no existing index serves, with the statements needing them"""
+    candidates = defaultdict(list)
+    for captured in statements:
+        for table, filters, sort in captured.access_paths:
+            columns = filters + tuple(c for c in sort if c not in filters)
+            if not columns:
+                continue
+            served = any(
+                index.columns[: len(columns)] == columns
+                for index in indexes.get(table, [])
+            )
+            if not served:
+                candidates[(table, columns)].append(captured)
+    return candidates
+
+
+def evaluate_candidate(engine, table, columns, statements):
+    """
+    Explain the statements with and without a hypothetical index
+
+    On PostgreSQL the index is created inside a transaction that is rolled
+    back. The SQLite driver commits DDL on its own, so there the index is
+    dropped again explicitly.
+
+    Returns:
+        list: (statement, plan without, plan with) for every statement
+    """
+    preparer = engine.dialect.identifier_preparer
+    name = preparer.quote(index_name(table, columns))
+    ddl = "CREATE INDEX {} ON {} ({})".format(
+        name,
+        preparer.quote(table),
+        ", ".join(preparer.quote(column) for column in columns),
+    )
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            before = [explain(connection, s.sql, s.parameters) for s in statements]
+            connection.exec_driver_sql(ddl)
+            after = [explain(connection, s.sql, s.parameters) for s in statements]
+        finally:
+            transaction.rollback()
+            if connection.dialect.name == "sqlite":
+                with connection.begin():
+                    connection.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+    return list(zip(statements, before, after))
+
+
+def postgres_unscanned_indexes(engine):
+    """Index names PostgreSQL has never used since its statistics were reset"""
+    if engine.dialect.name != "postgresql":
+        return None
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(
+            "SELECT indexrelname FROM pg_stat_user_indexes WHERE idx_scan = 0"
+        )
+        return {row[0] for row in rows}
+
+
+def analyse(engine, statements):
+    """Build the advisor report from captured statements"""
+    indexes = existing_indexes(engine)
+
+    used = set()
+    with engine.connect() as connection:
+        for captured in statements:
+            used |= explain(connection, captured.sql, captured.parameters).indexes
+
+    missing = []
+    for (table, columns), needing in candidate_indexes(statements, indexes).items():
+        results = evaluate_candidate(engine, table, columns, needing)
+        improved = [
+            (captured, before, after)
+            for captured, before, after in results
+            if after.penalty < before.penalty
+            or (before.cost is not None and after.cost < before.cost * 0.9)
+        ]
+        if not improved:
+            continue
+        cost_before = sum((b.cost or 0) * c.count for c, b, _ in improved)
+        cost_after = sum((a.cost or 0) * c.count for c, _, a in improved)
+        missing.append(
+            {
+                "table": table,
+                "columns": list(columns),
+                "name": index_name(table, columns),
+                "statements": len(improved),
+                "executions": sum(c.count for c, _, _ in improved),
+                "endpoints": sorted({e for c, _, _ in improved for e in c.endpoints}),
+                "scans_removed": sum(
+                    len(b.full_scans) - len(a.full_scans) for _, b, a in improved
+                ),
+                "sorts_removed": sum(b.sorts - a.sorts for _, b, a in improved),
+                "cost_before": round(cost_before, 2) if cost_before else None,
+                "cost_after": round(cost_after, 2) if cost_before else None,
+                "makes_redundant": [
+                    index.name
+                    for index in indexes.get(table, [])
+                    if index.kind == "index"
+                    and columns[: len(index.columns)] == index.columns
+                ],
+            }
+        )
+    missing.sort(key=lambda m: (-m["executions"], m["table"]))
+
+    redundant = [
+        {
+            "table": index.table,
+            "name": index.name,
+            "columns": list(index.columns),
+            "covered_by": other.name,
+            "covered_by_kind": other.kind,
+        }
+        for index, other in redundant_indexes(indexes)
+    ]
+    redundant_names = {r["name"] for r in redundant}
+
+    unscanned = postgres_unscanned_indexes(engine)
+    unused = [
+        {"table": index.table, "name": index.name, "columns": list(index.columns)}
+        for table_indexes in indexes.values()
+        for index in table_indexes
+        if index.kind == "index"
+        and index.name not in used
+        and index.name not in redundant_names
+        and (unscanned is None or index.name in unscanned)
+    ]
+    return {"missing": missing, "redundant": redundant, "unused": unused}
+
+
+def print_report(report, visited, statements):
+    print(f"🔍 Crawled {len(visited)} pages, captured {len(statements)} statements")
+    errors = [f"{path} ({status})" for path, status in visited if status >= 500]
+    if errors:
+        print(f"   ⚠️ Server errors: {', '.join(errors)}")
+
+    print("\n📈 Missing indexes")
+    if not report["missing"]:
+        print("   ✅ None found")
+    for m in report["missing"]:
+        columns = ", ".join(f'"{c}"' for c in m["columns"])
+        print(f'   {m["table"]}: Index("{m["name"]}", {columns})')
+        savings = []
+        if m["scans_removed"]:
+            savings.append(f"{m['scans_removed']} full scans removed")
+        if m["sorts_removed"]:
+            savings.append(f"{m['sorts_removed']} sorts removed")
+        if m["cost_before"]:
+            pct = 100 * (1 - m["cost_after"] / m["cost_before"])
+            savings.append(
+                f"planner cost {m['cost_before']} -> {m['cost_after']} (-{pct:.0f}%)"
+            )
+        print(f"      {'; '.join(savings)}")
+        print(
+            f"      {m['executions']} executions from {', '.join(m['endpoints']) or '?'}"
+        )
+        if m["makes_redundant"]:
+            print(f"      would make {', '.join(m['makes_redundant'])} redundant")
+
+    print("\n♻️ Redundant indexes")
+    if not report["redundant"]:
+        print("   ✅ None found")
+    for r in report["redundant"]:
+        print(
+            f"   {r['table']}.{r['name']} ({', '.join(r['columns'])}) "
+            f"is covered by {r['covered_by_kind']} {r['covered_by']}"
+        )
+
+    print("\n💤 Indexes no crawled statement used")
+    if not report["unused"]:
+        print("   ✅ None found")
+    for u in report["unused"]:
+        print(f"   {u['table']}.{u['name']} ({', '.join(u['columns'])})")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Suggest index changes")
+    parser.add_argument(
+        "--path", action="append", default=[], help="Extra URL to crawl (repeatable)"
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    import routes  # noqa: F401  (registers the pages to crawl)
+    from app import app, db
+
+    with app.app_context():
+        engine = db.engine
+    with StatementCapture(engine) as capture:
+        visited = crawl(app, db, capture, args.path)
+
+    statements = list(capture.statements.values())
+    with app.app_context():
+        report = analyse(engine, statements)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, visited, statements)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
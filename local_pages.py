@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Local SEO landing pages for The Grey Canvas
+Builds /web-design/<city> pages from content/locations.json and pre-renders
+them to static files so they are served without template work per request.
+
+Usage: python local_pages.py [--out build/web-design] [--base-url URL]
+"""
+
+import json
+import logging
+import os
+import re
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import current_app, render_template
+from flask_wtf.csrf import generate_csrf
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = Path(__file__).resolve().parent
+LOCATIONS_FILE = ROOT_DIR / "content" / "locations.json"
+OUTPUT_DIR = Path(
+    os.environ.get("LOCAL_PAGES_DIR", ROOT_DIR / "build" / "web-design")
+)
+TEMPLATE = "web_design_city.html"
+SITE_URL = os.environ.get("SITE_URL", "https://thegreycanvas.co/")
+
+# Pre-rendered pages are shared by every visitor, so the newsletter form's
+# CSRF token is written as a placeholder and filled in when the page is served
+CSRF_PLACEHOLDER = "__CSRF_TOKEN_PLACEHOLDER__"
+SLUG_PATTERN = re.compile(r"^[a-z0-9]+(?:-[a-z0-9]+)*$")
+
+
+class LocationError(ValueError):
+    """Raised when the locations file is malformed"""
+
+
+_lock = threading.Lock()
+_locations = None
+_locations_mtime = None
+_pages = {}
+
+
+def load_locations(path=LOCATIONS_FILE):
+    """
+    Parse and validate the city/service table
+
+    Args:
+        path (Path): JSON file with "services" and "cities" lists
+
+    Returns:
+        dict: services list and cities keyed by slug, in file order
+    """
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as e:
+        raise LocationError(f"{Path(path).name}: {e}") from e
+
+    cities = {}
+    for city in data.get("cities", []):
+        slug = city.get("slug", "")
+        if not SLUG_PATTERN.match(slug):
+            raise LocationError(f"Invalid city slug '{slug}'")
+        if slug in cities:
+            raise LocationError(f"Duplicate city slug '{slug}'")
+        if not city.get("name"):
+            raise LocationError(f"City '{slug}' has no name")
+        cities[slug] = city
+
+    for slug, city in cities.items():
+        unknown = [name for name in city.get("nearby", []) if name not in cities]
+        if unknown:
+            raise LocationError(f"City '{slug}' lists unknown nearby {unknown}")
+
+    return {"services": data.get("services", []), "cities": cities}
+
+
+def get_locations():
+    """Return the parsed locations file, reloading it when it changes"""
+    global _locations, _locations_mtime
+
+    mtime = LOCATIONS_FILE.stat().st_mtime
+    with _lock:
+        if _locations is None or mtime != _locations_mtime:
+            _locations = load_locations()
+            _locations_mtime = mtime
+            _pages.clear()
+        return _locations
+
+
+def locations_updated_at():
+    """When the city/service table last changed, for sitemap lastmod"""
+    return datetime.fromtimestamp(LOCATIONS_FILE.stat().st_mtime)
+
+
+def render_city_page(slug):
+    """
+    Render one landing page with the CSRF placeholder in place of a token
+
+    Must run inside a request context for the city's URL so canonical links
+    and navigation state match the live page. Use render_shared_page from a
+    visitor's request, so their session never reaches the shared HTML.
+    """
+    locations = get_locations()
+    city = locations["cities"][slug]
+    nearby = [locations["cities"][name] for name in city.get("nearby", [])]
+    return render_template(
+        TEMPLATE,
+        city=city,
+        nearby=nearby,
+        services=locations["services"],
+        csrf_token=lambda: CSRF_PLACEHOLDER,
+    )
+
+
+def render_shared_page(slug, base_url=SITE_URL):
+    """
+    Render a city page in a fresh request context for its URL
+
+    The context has no cookies, so the page is rendered as an anonymous
+    visitor: a live visitor's flashed messages are neither consumed nor baked
+    into HTML every visitor is served.
+    """
+    with current_app.test_request_context(f"/web-design/{slug}", base_url=base_url):
+        return render_city_page(slug)
+
+
+def _write_page(path, html):
+    """Write a page atomically so a reader never sees a partial file"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(html, encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def build_pages(output_dir=OUTPUT_DIR, base_url=SITE_URL):
+    """
+    Pre-render every city page and remove pages for cities that were dropped
+
+    Args:
+        output_dir (Path): Directory the HTML files are written to
+        base_url (str): Scheme and host used while rendering
+
+    Returns:
+        list: Slugs that were written
+    """
+    output_dir = Path(output_dir)
+    cities = get_locations()["cities"]
+    written = []
+    for slug in cities:
+        html = render_shared_page(slug, base_url)
+        _write_page(output_dir / f"{slug}.html", html)
+        written.append(slug)
+
+    if output_dir.exists():
+        for path in output_dir.glob("*.html"):
+            if path.stem not in cities:
+                path.unlink()
+
+    with _lock:
+        _pages.clear()
+    return written
+
+
+def get_city_page(slug):
+    """
+    Pre-rendered HTML for a city, or None for an unknown slug
+
+    Pages missing from the build directory, or older than locations.json,
+    are rendered once and written back, so a deploy without the build step
+    still fills the cache and an edited city is not served from a stale file.
+    """
+    if slug not in get_locations()["cities"]:
+        return None
+    with _lock:
+        locations_mtime = _locations_mtime
+
+    path = OUTPUT_DIR / f"{slug}.html"
+    with _lock:
+        html = _pages.get(slug)
+    if html is not None:
+        return html
+
+    try:
+        html = path.read_text(encoding="utf-8")
+        if path.stat().st_mtime < locations_mtime:
+            html = None
+    except FileNotFoundError:
+        html = None
+
+    if html is None:
+        html = render_shared_page(slug)
+        try:
+            _write_page(path, html)
+        except OSError as e:
+            logger.warning(f"Could not cache landing page {slug}: {e}")
+
+    with _lock:
+        _pages[slug] = html
+    return html
+
+
+def personalise_page(html):
+    """Swap the CSRF placeholder for the visitor's token"""
+    return html.replace(CSRF_PLACEHOLDER, generate_csrf())
+
+
+def sitemap_pages():
+    """Sitemap entries for every city page"""
+    try:
+        cities = get_locations()["cities"]
+        lastmod = locations_updated_at()
+    except (OSError, LocationError) as e:
+        logger.error(f"Error loading locations for sitemap: {e}")
+        return []
+
+    return [
+        {
+            "url": f"/web-design/{slug}",
+            "priority": "0.6",
+            "changefreq": "monthly",
+            "lastmod": lastmod,
+        }
+        for slug in cities
+    ]
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pre-render local landing pages")
+    parser.add_argument("--out", default=str(OUTPUT_DIR), help="Output directory")
+    parser.add_argument(
+        "--base-url",
+        default=SITE_URL,
+        help="Site URL used while rendering",
+    )
+    args = parser.parse_args()
+
+    os.environ.setdefault("DB_POOL_PROFILE", "cli")
+    from app import app
+
+    with app.app_context():
+        try:
+            written = build_pages(Path(args.out), base_url=args.base_url)
+        except LocationError as e:
+            print(f"❌ Locations error: {e}")
+            return 1
+
+    print(f"✅ Rendered {len(written)} landing pages to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
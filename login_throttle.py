@@ -0,0 +1,283 @@
+"""
+Token-bucket throttling for admin logins
+Attempts are limited per client IP and per account before any password hash
+is computed. Buckets live in the database so every worker sees the same
+budget, and rejections are remembered in-process so a client that is already
+over its limit costs no query at all.
+
+Checking an attempt reserves a token from every bucket at once, before the
+password is hashed, so parallel attempts can never outrun the budget; if any
+bucket is empty none is charged, so one full bucket never drains the other.
+A successful login gets its tokens back.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import case, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from models import LoginThrottleBucket
+
+logger = logging.getLogger(__name__)
+
+# "database" shares buckets between workers; "memory" is a per-process stand-in
+THROTTLE_STORE = os.environ.get("LOGIN_THROTTLE_STORE", "database")
+# Buckets untouched for this long are full again and can be deleted
+PRUNE_AFTER_SECONDS = 86400
+
+
+@dataclass(frozen=True)
+class BucketLimit:
+    """Bucket capacity (burst) and refill rate in attempts per minute"""
+
+    capacity: float
+    per_minute: float
+
+    @property
+    def refill_per_second(self):
+        return self.per_minute / 60.0
+
+
+IP_LIMIT = BucketLimit(
+    capacity=float(os.environ.get("LOGIN_THROTTLE_IP_BURST", "10")),
+    per_minute=float(os.environ.get("LOGIN_THROTTLE_IP_PER_MINUTE", "5")),
+)
+ACCOUNT_LIMIT = BucketLimit(
+    capacity=float(os.environ.get("LOGIN_THROTTLE_ACCOUNT_BURST", "5")),
+    per_minute=float(os.environ.get("LOGIN_THROTTLE_ACCOUNT_PER_MINUTE", "2")),
+)
+
+
+def refill(tokens, updated_at, now, limit):
+    """Tokens available at `now` for a bucket last seen at `updated_at`"""
+    elapsed = max(0.0, now - updated_at)
+    return min(limit.capacity, tokens + elapsed * limit.refill_per_second)
+
+
+def retry_after(tokens, limit):
+    """Seconds until a bucket holding `tokens` has one token again"""
+    if limit.refill_per_second <= 0:
+        return PRUNE_AFTER_SECONDS
+    return max(1, int((1 - tokens) / limit.refill_per_second) + 1)
+
+
+class MemoryBucketStore:
+    """Per-process bucket store for development and single-worker setups"""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, buckets, now):
+        """
+        Take a token from every (key, limit) bucket, or from none
+
+        Returns:
+            tuple: (None, 0) if reserved, else (empty key, seconds to wait)
+        """
+        with self._lock:
+            available = [
+                refill(*self._buckets.get(key, (limit.capacity, now)), now, limit)
+                for key, limit in buckets
+            ]
+            for (key, limit), tokens in zip(buckets, available):
+                if tokens < 1:
+                    return key, retry_after(tokens, limit)
+            for (key, _), tokens in zip(buckets, available):
+                self._buckets[key] = (tokens - 1, now)
+        return None, 0
+
+    def refund(self, buckets, now):
+        """Give back the tokens a successful attempt reserved"""
+        with self._lock:
+            for key, limit in buckets:
+                if key in self._buckets:
+                    tokens = refill(*self._buckets[key], now, limit)
+                    self._buckets[key] = (min(limit.capacity, tokens + 1), now)
+
+
+class DatabaseBucketStore:
+    """Buckets in login_throttle_bucket, taken with conditional UPDATEs"""
+
+    @staticmethod
+    def _available(table, limit, now):
+        """SQL for the tokens a bucket holds at `now`, capped at its capacity"""
+        refilled = table.c.tokens + (now - table.c.updated_at) * limit.refill_per_second
+        return case((refilled > limit.capacity, limit.capacity), else_=refilled)
+
+    def _take(self, connection, key, limit, now):
+        """Take one token; returns 0, or seconds to wait if the bucket is empty"""
+        table = LoginThrottleBucket.__table__
+        available = self._available(table, limit, now)
+        # The WHERE is rechecked under the row lock, so concurrent takes
+        # can never spend the same token
+        taken = connection.execute(
+            update(table)
+            .where(table.c.key == key, available >= 1)
+            .values(tokens=available - 1, updated_at=now)
+            .returning(table.c.key)
+        ).first()
+        if taken is not None:
+            return 0
+
+        row = connection.execute(
+            select(table.c.tokens, table.c.updated_at).where(table.c.key == key)
+        ).first()
+        if row is not None:
+            return retry_after(refill(row.tokens, row.updated_at, now, limit), limit)
+
+        dialect = connection.dialect.name
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        created = connection.execute(
+            insert(table)
+            .values(key=key, tokens=limit.capacity - 1, updated_at=now)
+            .on_conflict_do_nothing(index_elements=[table.c.key])
+            .returning(table.c.key)
+        ).first()
+        if created is not None:
+            return 0
+        # Another attempt created the bucket first; take from that one
+        return self._take(connection, key, limit, now)
+
+    def reserve(self, buckets, now):
+        """
+        Take a token from every (key, limit) bucket, or from none
+
+        Returns:
+            tuple: (None, 0) if reserved, else (empty key, seconds to wait)
+        """
+        table = LoginThrottleBucket.__table__
+        # Own connection so throttling never commits or rolls back the request session
+        with db.engine.connect() as connection:
+            with connection.begin() as transaction:
+                for key, limit in buckets:
+                    wait = self._take(connection, key, limit, now)
+                    if wait:
+                        transaction.rollback()
+                        return key, wait
+
+                # Occasionally drop buckets that have long since refilled
+                if random.random() < 0.01:
+                    connection.execute(
+                        table.delete().where(
+                            table.c.updated_at < now - PRUNE_AFTER_SECONDS
+                        )
+                    )
+        return None, 0
+
+    def refund(self, buckets, now):
+        """Give back the tokens a successful attempt reserved"""
+        table = LoginThrottleBucket.__table__
+        with db.engine.begin() as connection:
+            for key, limit in buckets:
+                available = self._available(table, limit, now)
+                connection.execute(
+                    update(table)
+                    .where(table.c.key == key)
+                    .values(
+                        tokens=case(
+                            (available + 1 > limit.capacity, limit.capacity),
+                            else_=available + 1,
+                        ),
+                        updated_at=now,
+                    )
+                )
+
+
+class LoginThrottle:
+    """Checks every bucket for an attempt, remembering rejections locally"""
+
+    def __init__(self, store):
+        self.store = store
+        self.fallback = MemoryBucketStore()
+        self._blocked_until = {}
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def _locally_blocked(self, key, now):
+        with self._lock:
+            until = self._blocked_until.get(key)
+            if until is None:
+                return 0
+            if until <= now:
+                del self._blocked_until[key]
+                return 0
+            return int(until - now) + 1
+
+    def _block(self, key, until):
+        with self._lock:
+            self._blocked_until[key] = until
+            # Bound memory under a distributed attack; entries are hints only
+            if len(self._blocked_until) > 10000:
+                self._blocked_until.clear()
+
+    def check(self, buckets):
+        """
+        Reserve one token from each bucket for an attempt
+
+        Args:
+            buckets (list): (key, BucketLimit) pairs, e.g. per IP and per account
+
+        Returns:
+            int: 0 if the attempt may proceed, otherwise seconds to wait
+        """
+        now = time.time()
+        for key, _ in buckets:
+            wait = self._locally_blocked(key, now)
+            if wait:
+                self.rejected += 1
+                return wait
+
+        try:
+            empty, wait = self.store.reserve(buckets, now)
+        except SQLAlchemyError as e:
+            # Keep protecting this worker even if the shared store is down
+            logger.error(f"Login throttle store error, using local buckets: {e}")
+            empty, wait = self.fallback.reserve(buckets, now)
+
+        if wait:
+            self._block(empty, now + wait)
+            self.rejected += 1
+        return wait
+
+    def refund(self, buckets):
+        """Return the tokens reserved for an attempt that succeeded"""
+        now = time.time()
+        try:
+            self.store.refund(buckets, now)
+        except SQLAlchemyError as e:
+            logger.error(f"Login throttle store error, refund skipped: {e}")
+
+
+_throttle = LoginThrottle(
+    MemoryBucketStore() if THROTTLE_STORE == "memory" else DatabaseBucketStore()
+)
+
+
+def _buckets(ip_address, account_id):
+    buckets = [(f"ip:{ip_address or 'unknown'}", IP_LIMIT)]
+    if account_id is not None:
+        buckets.append((f"account:{account_id}", ACCOUNT_LIMIT))
+    return buckets
+
+
+def check_login_attempt(ip_address, account_id=None):
+    """
+    Seconds the caller must wait before another login attempt, or 0
+
+    Call before verifying a password so throttled attempts never hash. An
+    allowed attempt has already been charged to the client IP and account.
+    """
+    return _throttle.check(_buckets(ip_address, account_id))
+
+
+def refund_login_attempt(ip_address, account_id=None):
+    """Give a successful login its tokens back"""
+    _throttle.refund(_buckets(ip_address, account_id))
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Versioned schema migrations
+Migrations run once, from the deploy step, instead of every worker running
+db.create_all() and reflecting every table at import time. Boot only reads
+the schema version, one query, and compares it with the newest migration.
+
+DB_MIGRATE_AT_BOOT controls what a booting process does when the database
+is behind:
+- "check" (default): log an error and carry on
+- "auto": apply the pending migrations, one process at a time, stopping
+  before any in TABLE_REWRITES; for local development
+- "off": skip the check
+
+Usage:
+    python migrations.py status
+    python migrations.py upgrade [--to VERSION]
+
+Adding a migration: write a function taking the Flask-SQLAlchemy instance,
+append it to MIGRATIONS with the next version number, and use the helpers in
+schema_updates.py so it is safe to re-run. Never edit a migration once it has
+been deployed.
+"""
+
+import argparse
+import logging
+import os
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func
+from sqlalchemy import inspect, select, text
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+import schema_baseline
+from schema_updates import (
+    add_missing_columns,
+    backfill_blog_metadata,
+    create_index,
+    drop_index,
+)
+
+logger = logging.getLogger(__name__)
+
+MIGRATE_AT_BOOT = os.environ.get("DB_MIGRATE_AT_BOOT", "check").lower()
+# pg_advisory_lock key held while migrating, so concurrent boots take turns
+MIGRATION_LOCK_ID = 72_651_045
+
+# Kept out of the models' metadata so db.create_all() never touches it
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def baseline(db):
+    """Tables as of the move to migrations; adopts databases built by create_all"""
+    tables = schema_baseline.metadata.tables
+    schema_baseline.metadata.create_all(db.engine)
+    add_missing_columns(db, tables["blog_post"])
+    add_missing_columns(db, tables["contact_submission"])
+    add_missing_columns(db, tables["intake_submission"])
+
+
+def crawl_indexes(db):
+    """Indexes found missing or redundant by index_advisor.py"""
+    # Published posts newest first: /blog, the feeds and the sitemap
+    create_index(
+        db, "idx_blog_published_created_at", "blog_post", ["published", "created_at"]
+    )
+    drop_index(db, "idx_blog_published")
+    # Admin project lists order by creation date
+    create_index(db, "idx_project_created_at", "project", ["created_at"])
+    # A project's timeline, oldest event first
+    create_index(
+        db,
+        "idx_timeline_project_event_date",
+        "project_timeline_event",
+        ["project_id", "event_date"],
+    )
+    # Duplicates of the unique constraints' own indexes
+    drop_index(db, "idx_blog_slug")
+    drop_index(db, "idx_newsletter_email")
+    drop_index(db, "idx_user_email")
+
+
+def partition_submissions(db):
+    """Monthly partitions for the submission tables on Postgres"""
+    from submission_retention import SUBMISSION_TABLES, partition_table
+
+    for table in SUBMISSION_TABLES:
+        partition_table(db, table)
+
+
+def intake_link_triggers(db):
+    """Enforce project.intake_submission_id now intake_submission is partitioned"""
+    from submission_retention import link_intakes_to_projects
+
+    link_intakes_to_projects(db)
+
+
+MIGRATIONS = [
+    (1, "baseline", baseline),
+    (2, "backfill_blog_metadata", backfill_blog_metadata),
+    (3, "crawl_indexes", crawl_indexes),
+    (4, "partition_submissions", partition_submissions),
+    (5, "intake_link_triggers", intake_link_triggers),
+]
+HEAD = MIGRATIONS[-1][0]
+# Rewrite tables on Postgres under an exclusive lock: only from the deploy step
+TABLE_REWRITES = {4}
+
+
+def current_version(db):
+    """Newest applied migration, or 0 for a database that predates migrations"""
+    with db.engine.connect() as connection:
+        try:
+            return (
+                connection.execute(
+                    select(func.max(schema_migrations.c.version))
+                ).scalar()
+                or 0
+            )
+        except SQLAlchemyError:
+            connection.rollback()
+            if inspect(connection).has_table(schema_migrations.name):
+                raise
+            return 0
+
+
+@contextmanager
+def migration_lock(db):
+    """
+    Serialise migrations across processes on Postgres
+
+    SQLite deployments are single-host development setups; there every step is
+    idempotent and a second process recording the same version is ignored.
+    """
+    if db.engine.dialect.name != "postgresql":
+        yield
+        return
+    with db.engine.connect() as connection:
+        connection.execute(
+            text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID}
+        )
+        connection.commit()
+        try:
+            yield
+        finally:
+            connection.execute(
+                text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID}
+            )
+            connection.commit()
+
+
+def upgrade(db, target=HEAD):
+    """
+    Apply pending migrations up to target
+
+    Returns:
+        list: Versions applied by this call
+    """
+    applied = []
+    with migration_lock(db):
+        schema_migrations.create(db.engine, checkfirst=True)
+        # Another process may have migrated while this one waited for the lock
+        version = current_version(db)
+        for number, name, migrate in MIGRATIONS:
+            if number <= version or number > target:
+                continue
+            logger.info(f"Applying migration {number}: {name}")
+            migrate(db)
+            db.session.commit()
+            try:
+                with db.engine.begin() as connection:
+                    connection.execute(
+                        schema_migrations.insert().values(
+                            version=number, name=name, applied_at=datetime.utcnow()
+                        )
+                    )
+            except IntegrityError:
+                logger.info(f"Migration {number} was recorded by another process")
+            applied.append(number)
+    return applied
+
+
+def check_schema(db):
+    """Boot-time schema check, see DB_MIGRATE_AT_BOOT"""
+    if MIGRATE_AT_BOOT == "off":
+        return None
+    version = current_version(db)
+    if version > HEAD:
+        logger.warning(
+            f"Database schema is at version {version}, newer than this code ({HEAD})"
+        )
+    elif version < HEAD:
+        rewrites = sorted(n for n in TABLE_REWRITES if version < n <= HEAD)
+        if db.engine.dialect.name != "postgresql":
+            rewrites = []  # the rewrites are Postgres-only
+        target = rewrites[0] - 1 if rewrites else HEAD
+        if MIGRATE_AT_BOOT == "auto" and target > version:
+            logger.warning(
+                f"Database schema is at version {version}, migrating to {target} at "
+                "boot; run 'python migrations.py upgrade' in the deploy step instead"
+            )
+            upgrade(db, target)
+            version = target
+        if version == HEAD:
+            return HEAD
+        logger.error(
+            f"Database schema is at version {version} but the code expects {HEAD}; "
+            "run 'python migrations.py upgrade'"
+        )
+    return version
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply or inspect schema migrations")
+    parser.add_argument("command", choices=["status", "upgrade"])
+    parser.add_argument(
+        "--to", type=int, default=HEAD, help="Stop after this migration version"
+    )
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.environ.setdefault("DB_POOL_PROFILE", "cli")
+    # This command does the migrating; importing the app must not
+    os.environ["DB_MIGRATE_AT_BOOT"] = "off"
+    from app import app, db
+
+    with app.app_context():
+        version = current_version(db)
+        if args.command == "status":
+            for number, name, _ in MIGRATIONS:
+                mark = "✅" if number <= version else "⏳"
+                print(f"{mark} {number:>4}  {name}")
+            print(f"Schema version {version}, latest {HEAD}")
+            return
+
+        try:
+            applied = upgrade(db, args.to)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            print(f"❌ Migration failed: {e}")
+            sys.exit(1)
+        if applied:
+            print(f"✅ Applied migrations {', '.join(map(str, applied))}")
+        else:
+            print(f"✅ Schema already at version {version}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
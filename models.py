@@ -3,12 +3,14 @@ from datetime import datetime, timedelta
 
 from flask_dance.consumer.storage.sqla import OAuthConsumerMixin
 from flask_login import UserMixin
-from sqlalchemy import UniqueConstraint, Index
+from sqlalchemy import UniqueConstraint, Index, event, inspect
 from sqlalchemy.orm import validates
 from werkzeug.security import check_password_hash, generate_password_hash
+import json
 import re
 
 from app import db
+from post_enrichment import enrich_post
 
 
 # Authentication models for Replit Auth
@@ -25,14 +27,15 @@ class User(UserMixin, db.Model):
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
 
-    __table_args__ = (
-        Index("idx_user_email", "email"),
-        Index("idx_user_created_at", "created_at"),
-    )
+    __table_args__ = (Index("idx_user_created_at", "created_at"),)
 
     def __repr__(self):
         return f"<User {self.id}>"
 
+    def get_id(self):
+        """Session ID, prefixed so the user loader reads only the users table"""
+        return f"user:{self.id}"
+
     @validates("email")
     def validate_email(self, key, address):
         """Validate email format"""
@@ -184,6 +187,10 @@ class AdminUser(UserMixin, db.Model):
     def __repr__(self):
         return f"<AdminUser {self.username}>"
 
+    def get_id(self):
+        """Session ID, prefixed so the user loader reads only the admin table"""
+        return f"admin:{self.id}"
+
 
 class ContactSubmission(db.Model):
     __tablename__ = "contact_submission"
@@ -194,7 +201,11 @@ class ContactSubmission(db.Model):
     subject = db.Column(db.String(200), nullable=False)
     message = db.Column(db.Text, nullable=False)
     submitted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    # Spam filter verdict: None (clean), quarantined, or an admin label spam/ham
+    spam_score = db.Column(db.Float, nullable=True)
+    spam_status = db.Column(db.String(20), nullable=True)
 
+    # Partitioned by month on submitted_at on Postgres, see submission_retention.py
     __table_args__ = (
         Index("idx_contact_submitted_at", "submitted_at"),
         Index("idx_contact_email", "email"),
@@ -241,7 +252,11 @@ class IntakeSubmission(db.Model):
     project_description = db.Column(db.Text, nullable=False)
     additional_notes = db.Column(db.Text, nullable=True)
     submitted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    # Spam filter verdict: None (clean), quarantined, or an admin label spam/ham
+    spam_score = db.Column(db.Float, nullable=True)
+    spam_status = db.Column(db.String(20), nullable=True)
 
+    # Partitioned by month on submitted_at on Postgres, see submission_retention.py
     __table_args__ = (
         Index("idx_intake_submitted_at", "submitted_at"),
         Index("idx_intake_email", "email"),
@@ -292,10 +307,16 @@ class BlogPost(db.Model):
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
 
+    # Derived from content at write time by post_enrichment.py
+    rendered_content = db.Column(db.Text, nullable=True)
+    table_of_contents = db.Column(db.Text, nullable=True)
+    search_text = db.Column(db.Text, nullable=True)
+    word_count = db.Column(db.Integer, nullable=True)
+    reading_time_minutes = db.Column(db.Integer, nullable=True)
+
     __table_args__ = (
-        Index("idx_blog_published", "published"),
+        Index("idx_blog_published_created_at", "published", "created_at"),
         Index("idx_blog_created_at", "created_at"),
-        Index("idx_blog_slug", "slug"),
     )
 
     @validates("title", "content")
@@ -328,6 +349,74 @@ class BlogPost(db.Model):
     def format_date(self):
         return self.created_at.strftime("%B %d, %Y")
 
+    def get_table_of_contents(self):
+        if self.table_of_contents:
+            return json.loads(self.table_of_contents)
+        return []
+
+
+@event.listens_for(BlogPost, "before_insert")
+def enrich_new_blog_post(mapper, connection, target):
+    """Precompute presentation fields for new posts"""
+    enrich_post(target)
+
+
+@event.listens_for(BlogPost, "before_update")
+def enrich_updated_blog_post(mapper, connection, target):
+    """Recompute presentation fields when the content or summaries change"""
+    attrs = inspect(target).attrs
+    changed = any(
+        attrs[name].history.has_changes()
+        for name in ("content", "excerpt", "meta_description")
+    )
+    if changed or target.rendered_content is None:
+        enrich_post(target)
+
+
+class BlogPostViewCount(db.Model):
+    """Aggregated view counter per blog post, written by view_counter.py"""
+
+    __tablename__ = "blog_post_view_count"
+    post_id = db.Column(
+        db.Integer,
+        db.ForeignKey("blog_post.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    view_count = db.Column(db.BigInteger, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (Index("idx_blog_view_count", "view_count"),)
+
+    def __repr__(self):
+        return f"<BlogPostViewCount {self.post_id}: {self.view_count}>"
+
+
+class SpamTokenCount(db.Model):
+    """Naive Bayes training counts: submissions per class containing a token"""
+
+    __tablename__ = "spam_token_count"
+    token = db.Column(db.String(64), primary_key=True)
+    spam_count = db.Column(db.Integer, default=0, nullable=False)
+    ham_count = db.Column(db.Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<SpamTokenCount {self.token}: {self.spam_count}/{self.ham_count}>"
+
+
+class LoginThrottleBucket(db.Model):
+    """Token bucket shared by all workers for admin login throttling"""
+
+    __tablename__ = "login_throttle_bucket"
+    key = db.Column(db.String(200), primary_key=True)
+    tokens = db.Column(db.Float, nullable=False)
+    # Epoch seconds of the last refill, compared against time.time()
+    updated_at = db.Column(db.Float, nullable=False)
+
+    __table_args__ = (Index("idx_login_throttle_updated_at", "updated_at"),)
+
+    def __repr__(self):
+        return f"<LoginThrottleBucket {self.key}: {self.tokens:.2f}>"
+
 
 # Project Progress Tracking Models
 class Project(db.Model):
@@ -364,7 +453,10 @@ class Project(db.Model):
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
 
-    # Relationship to intake submission
+    __table_args__ = (Index("idx_project_created_at", "created_at"),)
+
+    # Relationship to intake submission; on Postgres the database-level foreign
+    # key is dropped when intake_submission is partitioned
     intake_submission_id = db.Column(
         db.Integer, db.ForeignKey("intake_submission.id"), nullable=True
     )
@@ -430,6 +522,10 @@ class ProjectTimelineEvent(db.Model):
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index("idx_timeline_project_event_date", "project_id", "event_date"),
+    )
+
     def __repr__(self):
         return f"<ProjectTimelineEvent {self.title}>"
 
@@ -456,10 +552,7 @@ class NewsletterSubscription(db.Model):
     subscribed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     is_active = db.Column(db.Boolean, default=True, nullable=False)
 
-    __table_args__ = (
-        Index("idx_newsletter_email", "email"),
-        Index("idx_newsletter_active", "is_active"),
-    )
+    __table_args__ = (Index("idx_newsletter_active", "is_active"),)
 
     @validates("email")
     def validate_email(self, key, address):
@@ -470,3 +563,18 @@ class NewsletterSubscription(db.Model):
 
     def __repr__(self):
         return f"<NewsletterSubscription {self.email}>"
+
+
+class FormSubmissionKey(db.Model):
+    """Idempotency key of a saved contact/intake submission, kept briefly"""
+
+    __tablename__ = "form_submission_key"
+    key = db.Column(db.String(64), primary_key=True)
+    form = db.Column(db.String(20), nullable=False)
+    # Epoch seconds, compared against time.time() when pruning
+    created_at = db.Column(db.Float, nullable=False)
+
+    __table_args__ = (Index("idx_form_submission_key_created_at", "created_at"),)
+
+    def __repr__(self):
+        return f"<FormSubmissionKey {self.form}:{self.key}>"
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Shared cache for OIDC discovery documents and JWKS
+Documents are stored on disk so every worker on an instance reuses one fetch,
+expire according to the issuer's Cache-Control header, and are refreshed by a
+background thread before they expire so logins never wait on the issuer.
+
+The cache directory decides which keys verify logins, so it is created 0700
+and ignored (documents are then kept in memory only) unless it is a real
+directory owned by this user that nobody else can write to. The refresh
+thread starts with the web process's first request, so CLIs that import the
+app never touch the network.
+
+Usage: python oidc_cache.py [--issuer URL] [--refresh]
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import stat
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import jwt
+import requests
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path(
+    os.environ.get("OIDC_CACHE_DIR", Path(__file__).resolve().parent / "cache" / "oidc")
+)
+DEFAULT_TTL = int(os.environ.get("OIDC_CACHE_DEFAULT_SECONDS", "3600"))
+MIN_TTL = 60
+MAX_TTL = 86400
+FETCH_TIMEOUT = float(os.environ.get("OIDC_FETCH_TIMEOUT", "10"))
+# Refresh when this share of the TTL is left, so a slow issuer never blocks a login
+REFRESH_AHEAD = 0.2
+# Unknown key IDs trigger at most one forced JWKS refetch per interval
+FORCED_REFRESH_INTERVAL = 60
+
+_MAX_AGE = re.compile(r"(?:^|,)\s*(?:s-maxage|max-age)\s*=\s*(\d+)", re.IGNORECASE)
+
+
+class OIDCCacheError(RuntimeError):
+    """Raised when a document is neither cached nor fetchable"""
+
+
+def parse_cache_control(header):
+    """TTL in seconds from a Cache-Control header, clamped to sane bounds"""
+    if not header:
+        return DEFAULT_TTL
+    directives = header.lower()
+    if "no-store" in directives or "no-cache" in directives:
+        return MIN_TTL
+    match = _MAX_AGE.search(header)
+    if not match:
+        return DEFAULT_TTL
+    return max(MIN_TTL, min(MAX_TTL, int(match.group(1))))
+
+
+class DocumentCache:
+    """JSON documents cached in memory and in a directory shared by workers"""
+
+    def __init__(self, cache_dir=CACHE_DIR, fetch=None):
+        self.cache_dir = Path(cache_dir)
+        self._fetch = fetch or self._http_fetch
+        self._memory = {}
+        self._lock = threading.Lock()
+        self._disk_usable = None
+
+    @staticmethod
+    def _http_fetch(url):
+        """Fetch a JSON document, returning (body, ttl)"""
+        response = requests.get(url, timeout=FETCH_TIMEOUT)
+        response.raise_for_status()
+        return response.json(), parse_cache_control(
+            response.headers.get("Cache-Control")
+        )
+
+    def _path(self, url):
+        return self.cache_dir / (hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+    def _private_dir(self):
+        """Whether the cache directory exists, is ours and is closed to others"""
+        if self._disk_usable is None:
+            self._disk_usable = self._check_dir()
+        return self._disk_usable
+
+    def _check_dir(self):
+        try:
+            self.cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+            info = self.cache_dir.lstat()
+        except OSError as e:
+            logger.warning(f"OIDC cache directory unavailable: {e}")
+            return False
+        if (
+            not stat.S_ISDIR(info.st_mode)
+            or info.st_uid != os.getuid()
+            or info.st_mode & 0o077
+        ):
+            logger.warning(
+                f"Ignoring OIDC cache directory {self.cache_dir}: it must be a "
+                f"directory owned by this user with mode 0700"
+            )
+            return False
+        return True
+
+    def _read_disk(self, url):
+        if not self._private_dir():
+            return None
+        try:
+            entry = json.loads(self._path(url).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    def _write_disk(self, entry):
+        if not self._private_dir():
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(entry, handle)
+            os.replace(tmp_path, self._path(entry["url"]))
+        except OSError as e:
+            logger.warning(f"Could not write OIDC cache file: {e}")
+
+    def entry(self, url):
+        """Newest cached entry from memory or disk, fresh or not"""
+        with self._lock:
+            entry = self._memory.get(url)
+        disk = self._read_disk(url)
+        if disk and (entry is None or disk["fetched_at"] > entry["fetched_at"]):
+            entry = disk
+            with self._lock:
+                self._memory[url] = entry
+        return entry
+
+    def refresh(self, url):
+        """Fetch a document now and store it for every worker"""
+        body, ttl = self._fetch(url)
+        now = time.time()
+        entry = {
+            "url": url,
+            "body": body,
+            "fetched_at": now,
+            "expires_at": now + ttl,
+        }
+        self._write_disk(entry)
+        with self._lock:
+            self._memory[url] = entry
+        return entry
+
+    def get(self, url):
+        """
+        Return a document, fetching only when no fresh copy exists
+
+        A stale copy is served if the issuer cannot be reached, since keys
+        rarely rotate and a failed login is worse than a slightly old key set.
+        """
+        entry = self.entry(url)
+        if entry and entry["expires_at"] > time.time():
+            return entry["body"]
+        try:
+            return self.refresh(url)["body"]
+        except (requests.RequestException, ValueError) as e:
+            if entry:
+                logger.warning(f"Serving stale OIDC document for {url}: {e}")
+                return entry["body"]
+            raise OIDCCacheError(f"Could not fetch {url}: {e}") from e
+
+
+class IssuerKeys:
+    """Discovery document and signing keys for one OIDC issuer"""
+
+    def __init__(self, issuer_url, documents=None):
+        self.issuer_url = issuer_url.rstrip("/")
+        self.documents = documents or DocumentCache()
+        self._key_sets = {}
+        self._last_forced_refresh = 0.0
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    @property
+    def discovery_url(self):
+        return f"{self.issuer_url}/.well-known/openid-configuration"
+
+    def discovery(self):
+        return self.documents.get(self.discovery_url)
+
+    def jwks_url(self):
+        return self.discovery()["jwks_uri"]
+
+    def _key_set(self, jwks):
+        # PyJWKSet parsing builds key objects; reuse them while the JWKS is unchanged
+        cache_key = json.dumps(jwks, sort_keys=True)
+        key_set = self._key_sets.get(cache_key)
+        if key_set is None:
+            key_set = jwt.PyJWKSet.from_dict(jwks)
+            self._key_sets = {cache_key: key_set}
+        return key_set
+
+    def signing_key(self, token):
+        """
+        Signing key for a JWT, refetching the JWKS once if its kid is unknown
+
+        Returns:
+            jwt.PyJWK: Key whose .key is passed to jwt.decode
+        """
+        kid = jwt.get_unverified_header(token).get("kid")
+        url = self.jwks_url()
+        key = self._find_key(self.documents.get(url), kid)
+        if key is not None:
+            return key
+
+        # The issuer may have rotated keys since the cached JWKS was fetched
+        if time.time() - self._last_forced_refresh > FORCED_REFRESH_INTERVAL:
+            self._last_forced_refresh = time.time()
+            try:
+                key = self._find_key(self.documents.refresh(url)["body"], kid)
+            except (requests.RequestException, ValueError) as e:
+                logger.warning(f"JWKS refresh for unknown key failed: {e}")
+            if key is not None:
+                return key
+        raise jwt.InvalidTokenError(f"No signing key found for kid {kid!r}")
+
+    def _find_key(self, jwks, kid):
+        keys = self._key_set(jwks).keys
+        if kid is None:
+            # Without a kid only an unambiguous single-key set can be used
+            return keys[0] if len(keys) == 1 else None
+        for key in keys:
+            if key.key_id == kid:
+                return key
+        return None
+
+    def refresh_due(self):
+        """Refresh documents nearing expiry; returns seconds until the next check"""
+        next_check = DEFAULT_TTL * REFRESH_AHEAD
+        for url_source in (lambda: self.discovery_url, self.jwks_url):
+            try:
+                url = url_source()
+                entry = self.documents.entry(url)
+                now = time.time()
+                if entry:
+                    ttl = entry["expires_at"] - entry["fetched_at"]
+                    refresh_at = entry["expires_at"] - ttl * REFRESH_AHEAD
+                if not entry or now >= refresh_at:
+                    entry = self.documents.refresh(url)
+                    ttl = entry["expires_at"] - entry["fetched_at"]
+                    refresh_at = entry["expires_at"] - ttl * REFRESH_AHEAD
+                next_check = min(next_check, max(refresh_at - now, MIN_TTL / 2))
+            except (
+                requests.RequestException,
+                ValueError,
+                KeyError,
+                OIDCCacheError,
+            ) as e:
+                logger.warning(f"OIDC cache refresh failed: {e}")
+                next_check = MIN_TTL
+        # Jitter keeps workers from refreshing the shared files in lockstep
+        return next_check * random.uniform(0.9, 1.1)
+
+    def start(self):
+        """Prefetch in the background and keep documents fresh for this worker"""
+        with self._thread_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="oidc-cache-refresh", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._stop.wait(self.refresh_due())
+
+
+_issuers = {}
+_issuers_lock = threading.Lock()
+
+
+def get_issuer(issuer_url):
+    """Shared IssuerKeys instance for an issuer URL"""
+    with _issuers_lock:
+        issuer = _issuers.get(issuer_url)
+        if issuer is None:
+            issuer = _issuers[issuer_url] = IssuerKeys(issuer_url)
+        return issuer
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or warm the OIDC cache")
+    parser.add_argument(
+        "--issuer",
+        default=os.environ.get("ISSUER_URL", "https://replit.com/oidc"),
+        help="OIDC issuer URL (point at a local issuer for testing)",
+    )
+    parser.add_argument(
+        "--refresh", action="store_true", help="Refetch even if cached copies are fresh"
+    )
+    args = parser.parse_args()
+
+    issuer = get_issuer(args.issuer)
+    try:
+        urls = [issuer.discovery_url]
+        if args.refresh:
+            issuer.documents.refresh(urls[0])
+        urls.append(issuer.jwks_url())
+        if args.refresh:
+            issuer.documents.refresh(urls[1])
+        else:
+            issuer.documents.get(urls[1])
+    except (OIDCCacheError, requests.RequestException, KeyError) as e:
+        print(f"❌ Could not load OIDC documents: {e}")
+        return 1
+
+    now = time.time()
+    for url in urls:
+        entry = issuer.documents.entry(url)
+        remaining = int(entry["expires_at"] - now)
+        print(f"✅ {url} - expires in {remaining}s")
+    keys = issuer._key_set(issuer.documents.get(urls[1])).keys
+    print(f"   {len(keys)} signing keys: {', '.join(k.key_id or '?' for k in keys)}")
+    print(f"   Cache directory: {issuer.documents.cache_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
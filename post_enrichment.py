@@ -0,0 +1,84 @@
+"""
+Write-time enrichment for blog posts
+Derives reading time, word count, table of contents, excerpt and a plain-text
+search body from post HTML so pages never parse content per request.
+"""
+
+import json
+import math
+import re
+
+from bs4 import BeautifulSoup
+
+WORDS_PER_MINUTE = 200
+EXCERPT_LENGTH = 200
+META_DESCRIPTION_LENGTH = 155
+TOC_HEADINGS = ["h2", "h3"]
+
+
+def slugify_heading(text):
+    """Turn heading text into a URL fragment"""
+    anchor = re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+    return anchor or "section"
+
+
+def truncate_words(text, length):
+    """Cut text at a word boundary, adding an ellipsis when shortened"""
+    if len(text) <= length:
+        return text
+    cut = text[: length - 1].rsplit(" ", 1)[0].rstrip(" ,;:.-")
+    return f"{cut}…"
+
+
+def enrich_content(html):
+    """
+    Analyse post HTML
+
+    Args:
+        html (str): BlogPost.content
+
+    Returns:
+        dict: rendered_content with heading anchors, table_of_contents,
+        search_text, word_count and reading_time_minutes
+    """
+    soup = BeautifulSoup(html or "", "html.parser")
+
+    toc = []
+    used_anchors = set()
+    for heading in soup.find_all(TOC_HEADINGS):
+        text = " ".join(heading.get_text(" ").split())
+        if not text:
+            continue
+        anchor = heading.get("id") or slugify_heading(text)
+        base, suffix = anchor, 2
+        while anchor in used_anchors:
+            anchor = f"{base}-{suffix}"
+            suffix += 1
+        used_anchors.add(anchor)
+        heading["id"] = anchor
+        toc.append({"level": int(heading.name[1]), "text": text, "anchor": anchor})
+
+    search_text = " ".join(soup.get_text(" ").split())
+    word_count = len(search_text.split())
+
+    return {
+        "rendered_content": str(soup),
+        "table_of_contents": json.dumps(toc),
+        "search_text": search_text,
+        "word_count": word_count,
+        "reading_time_minutes": max(1, math.ceil(word_count / WORDS_PER_MINUTE)),
+    }
+
+
+def enrich_post(post):
+    """Store derived fields on a BlogPost before it is written"""
+    for field, value in enrich_content(post.content).items():
+        setattr(post, field, value)
+
+    # Only fill editorial fields the author left empty
+    if not post.excerpt:
+        post.excerpt = truncate_words(post.search_text, EXCERPT_LENGTH)
+    if not post.meta_description:
+        post.meta_description = truncate_words(
+            post.excerpt or post.search_text, META_DESCRIPTION_LENGTH
+        )
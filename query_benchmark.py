@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the prebuilt statements in repository.py
+Times each hot query both ways, the inline Model.query form it replaced and
+the repository call, against the configured database, and reports the
+per-call overhead saved. Both sides of a row run the same SQL, except the
+"merged" row, which compares the dashboard's six separate COUNTs with the
+two single-scan statements that replaced them.
+
+Usage:
+    python query_benchmark.py [--iterations N]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DB_POOL_PROFILE", "cli")
+
+from sqlalchemy import or_
+
+from app import app, db
+from models import AdminUser, BlogPost, ContactSubmission, IntakeSubmission
+from repository import (
+    _submission_counts,
+    admin_by_login_url,
+    published_post,
+    submission_counts,
+    user_by_id,
+)
+from spam_filter import SPAM_STATUSES
+
+
+def inline_dashboard_counts(since):
+    """The six count queries the dashboard used to run"""
+
+    def inbox(model):
+        return model.query.filter(
+            or_(model.spam_status.is_(None), ~model.spam_status.in_(SPAM_STATUSES))
+        )
+
+    return (
+        inbox(ContactSubmission).count(),
+        inbox(IntakeSubmission).count(),
+        ContactSubmission.query.filter(
+            ContactSubmission.spam_status.in_(SPAM_STATUSES)
+        ).count(),
+        IntakeSubmission.query.filter(
+            IntakeSubmission.spam_status.in_(SPAM_STATUSES)
+        ).count(),
+        inbox(ContactSubmission)
+        .filter(ContactSubmission.submitted_at >= since)
+        .count(),
+        inbox(IntakeSubmission).filter(IntakeSubmission.submitted_at >= since).count(),
+    )
+
+
+def rebuilt_dashboard_counts(since):
+    """The repository's count statements, built afresh on every call"""
+    return {
+        kind: db.session.execute(_submission_counts(model), {"since": since}).one()
+        for kind, model in (
+            ("contact", ContactSubmission),
+            ("intake", IntakeSubmission),
+        )
+    }
+
+
+def cases():
+    """(name, inline callable, repository callable) for each hot query"""
+    post = BlogPost.query.filter_by(published=True).first()
+    admin = AdminUser.query.first()
+    since = datetime.utcnow() - timedelta(days=7)
+    found = []
+
+    if post:
+        found.append(
+            (
+                "blog post by slug",
+                lambda: BlogPost.query.filter_by(
+                    slug=post.slug, published=True
+                ).first(),
+                lambda: published_post(post.slug),
+            )
+        )
+    if admin:
+        url_path = admin.custom_login_url
+        found.append(
+            (
+                "admin by login URL",
+                lambda: AdminUser.query.filter_by(custom_login_url=url_path).first(),
+                lambda: admin_by_login_url(url_path),
+            )
+        )
+        # Both sides start from an empty identity map, as a new request does
+        found.append(
+            (
+                "load_user (cache miss)",
+                lambda: (db.session.expunge_all(), db.session.get(AdminUser, admin.id)),
+                lambda: (
+                    db.session.expunge_all(),
+                    user_by_id(AdminUser, admin.id),
+                ),
+            )
+        )
+    found.append(
+        (
+            "dashboard counts",
+            lambda: rebuilt_dashboard_counts(since),
+            lambda: submission_counts(since),
+        )
+    )
+    found.append(
+        (
+            "dashboard counts merged",
+            lambda: inline_dashboard_counts(since),
+            lambda: submission_counts(since),
+        )
+    )
+    return found
+
+
+def per_call_us(function, iterations):
+    function()  # warm the compiled cache
+    best = min(timeit.repeat(function, number=iterations, repeat=5))
+    return best / iterations * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the hot query layer")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    with app.app_context():
+        print(f"⏱️  {args.iterations} calls each, best of 5, {db.engine.dialect.name}")
+        print(f"{'query':<26}{'inline µs':>12}{'repository µs':>16}{'saved':>10}")
+        for name, inline, prebuilt in cases():
+            before = per_call_us(inline, args.iterations)
+            after = per_call_us(prebuilt, args.iterations)
+            saved = (before - after) / before * 100
+            print(f"{name:<26}{before:>12.1f}{after:>16.1f}{saved:>9.0f}%")
+
+
+if __name__ == "__main__":
+    main()
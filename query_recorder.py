@@ -0,0 +1,171 @@
+"""
+Per-request SQL instrumentation
+Counts and times every statement a request issues, reports the totals in a
+Server-Timing header alongside template render time, logs requests slower
+than SLOW_REQUEST_MS, and in development warns when one request runs the
+same statement over and over (the classic N+1 query).
+
+The Server-Timing header describes the backend, so it is only sent in debug
+mode or to signed-in admins; anonymous visitors never see it.
+"""
+
+import logging
+import os
+import time
+from collections import Counter
+
+from flask import (
+    before_render_template,
+    g,
+    has_request_context,
+    request,
+    template_rendered,
+)
+from flask_login import current_user
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "1").lower() not in (
+    "0",
+    "false",
+    "off",
+)
+SLOW_REQUEST_MS = float(os.environ.get("SLOW_REQUEST_MS", "500"))
+# The N+1 detector runs in debug mode, or everywhere when this is set
+N_PLUS_ONE_DETECT = os.environ.get("N_PLUS_ONE_DETECT", "").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+# Identical statements per request before the N+1 warning fires
+N_PLUS_ONE_THRESHOLD = int(os.environ.get("N_PLUS_ONE_THRESHOLD", "5"))
+
+
+class RequestQueries:
+    """Statements, database time and render time for one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.db_seconds = 0.0
+        self.render_seconds = 0.0
+        self.statements = Counter()
+        self.slowest = (0.0, None)
+        self._render_started = []
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.db_seconds += seconds
+        self.statements[statement] += 1
+        if seconds > self.slowest[0]:
+            self.slowest = (seconds, statement)
+
+    def repeated(self, threshold=N_PLUS_ONE_THRESHOLD):
+        """Statements run at least `threshold` times, most repeated first"""
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+    def server_timing(self, total_seconds):
+        return ", ".join(
+            [
+                f'db;desc="{self.count} SQL";dur={self.db_seconds * 1000:.1f}',
+                f"render;dur={self.render_seconds * 1000:.1f}",
+                f"total;dur={total_seconds * 1000:.1f}",
+            ]
+        )
+
+
+def current_queries():
+    """The recorder for the active request, or None outside a request"""
+    if not has_request_context():
+        return None
+    return g.get("_request_queries")
+
+
+def _one_line(statement, limit=200):
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= limit else statement[:limit] + "..."
+
+
+def record_engine(engine):
+    """Time the statements requests run on an engine"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if current_queries() is not None:
+            conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        queries = current_queries()
+        started = conn.info.get("query_started")
+        if queries is None or not started:
+            return
+        queries.record(statement, time.perf_counter() - started.pop())
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        # A failed statement never reaches after_cursor_execute
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_started"):
+            connection.info["query_started"].pop()
+
+
+def init_query_recorder(app, engine):
+    """Attach the recorder to an app and the engine its requests use"""
+    record_engine(engine)
+
+    def render_started(sender, template, context, **extra):
+        queries = current_queries()
+        if queries is not None:
+            queries._render_started.append(time.perf_counter())
+
+    def render_finished(sender, template, context, **extra):
+        queries = current_queries()
+        if queries is not None and queries._render_started:
+            started = queries._render_started.pop()
+            # Only count the outermost render; includes are part of it
+            if not queries._render_started:
+                queries.render_seconds += time.perf_counter() - started
+
+    before_render_template.connect(render_started, app, weak=False)
+    template_rendered.connect(render_finished, app, weak=False)
+
+    @app.before_request
+    def start_query_recorder():
+        g._request_queries = RequestQueries()
+
+    @app.after_request
+    def report_queries(response):
+        queries = current_queries()
+        if queries is None:
+            return response
+        total = time.perf_counter() - queries.started
+        if SERVER_TIMING and (app.debug or current_user.is_authenticated):
+            response.headers["Server-Timing"] = queries.server_timing(total)
+
+        if total * 1000 >= SLOW_REQUEST_MS:
+            slowest_seconds, slowest = queries.slowest
+            logger.warning(
+                f"Slow request {request.method} {request.path} "
+                f"({request.endpoint}): {total * 1000:.0f}ms total, "
+                f"{queries.count} queries in {queries.db_seconds * 1000:.0f}ms, "
+                f"render {queries.render_seconds * 1000:.0f}ms"
+                + (
+                    f"; slowest {slowest_seconds * 1000:.0f}ms: {_one_line(slowest)}"
+                    if slowest
+                    else ""
+                )
+            )
+
+        if app.debug or N_PLUS_ONE_DETECT:
+            for statement, count in queries.repeated():
+                logger.warning(
+                    f"Possible N+1 in {request.endpoint}: statement ran {count} "
+                    f"times: {_one_line(statement)}"
+                )
+        return response
@@ -0,0 +1,178 @@
+"""
+Read-replica routing for read-only pages
+When DATABASE_REPLICA_URL is set, SELECTs issued by views marked with
+@use_read_replica go to the replica; everything else, and anything in a
+session that has already written, stays on the primary.
+
+Don't mark views whose output is cached (the feeds, the sitemap): a commit
+invalidates the cache, and a rebuild from a replica that has not caught up
+would keep the old data cached with nothing left to clear it.
+
+Two guards keep replica reads from looking stale:
+- a visitor whose request wrote to the database reads from the primary for
+  REPLICA_READ_AFTER_WRITE_SECONDS afterwards (tracked in their session
+  cookie), so a form post or project update is visible on the next page
+- the replica's replay lag is checked every few seconds, and the primary is
+  used while it exceeds REPLICA_MAX_LAG_SECONDS or the replica is unreachable
+
+For local testing point DATABASE_REPLICA_URL at a second SQLite file or
+Postgres database holding a copy of the primary's data.
+"""
+
+import logging
+import os
+import threading
+import time
+from functools import wraps
+
+from flask import g, has_request_context
+from flask import session as http_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+
+logger = logging.getLogger(__name__)
+
+REPLICA_URL = os.environ.get("DATABASE_REPLICA_URL")
+REPLICA_BIND = "replica"
+READ_AFTER_WRITE_SECONDS = float(
+    os.environ.get("REPLICA_READ_AFTER_WRITE_SECONDS", "10")
+)
+MAX_LAG_SECONDS = float(os.environ.get("REPLICA_MAX_LAG_SECONDS", "5"))
+LAG_CHECK_SECONDS = 5.0
+PRIMARY_UNTIL_KEY = "_read_primary_until"
+
+# Zero when the replica has replayed everything it received
+POSTGRES_LAG_QUERY = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+
+class ReplicaHealth:
+    """Cached replay lag of the replica, refreshed at most every few seconds"""
+
+    def __init__(self, check_interval=LAG_CHECK_SECONDS):
+        self.check_interval = check_interval
+        self.lag = None
+        self.healthy = True
+        self.checked_at = 0.0
+        self.routed = 0
+        self.kept_on_primary = 0
+        self._lock = threading.Lock()
+
+    def usable(self, engine):
+        now = time.monotonic()
+        if now - self.checked_at >= self.check_interval and self._lock.acquire(
+            blocking=False
+        ):
+            try:
+                self._check(engine)
+                self.checked_at = now
+            finally:
+                self._lock.release()
+        return self.healthy and (self.lag or 0) <= MAX_LAG_SECONDS
+
+    def _check(self, engine):
+        try:
+            with engine.connect() as connection:
+                if connection.dialect.name == "postgresql":
+                    self.lag = float(
+                        connection.exec_driver_sql(POSTGRES_LAG_QUERY).scalar()
+                    )
+                else:
+                    connection.exec_driver_sql("SELECT 1")
+                    self.lag = 0.0
+            if not self.healthy:
+                logger.info("Read replica is reachable again")
+            self.healthy = True
+        except SQLAlchemyError as e:
+            if self.healthy:
+                logger.error(f"Read replica unavailable, using primary: {e}")
+            self.healthy = False
+
+    def status(self):
+        return {
+            "configured": bool(REPLICA_URL),
+            "healthy": self.healthy,
+            "lag_seconds": self.lag,
+            "max_lag_seconds": MAX_LAG_SECONDS,
+            "routed_reads": self.routed,
+            "kept_on_primary": self.kept_on_primary,
+        }
+
+
+health = ReplicaHealth()
+
+
+def use_read_replica(view):
+    """
+    Let a read-only view's SELECTs go to the replica when that is safe
+
+    Only for views whose output is not cached, see the module docstring.
+    """
+
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        g.read_replica = True
+        return view(*args, **kwargs)
+
+    return wrapped
+
+
+def _recently_wrote():
+    # Read past SecureCookieSession.get so public pages don't gain Vary: Cookie
+    cookie = http_session._get_current_object()
+    return dict.get(cookie, PRIMARY_UNTIL_KEY, 0) > time.time()
+
+
+class RoutingSession(Session):
+    """Session that sends reads from replica-enabled views to the replica"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and REPLICA_URL
+            and not self._flushing
+            and getattr(clause, "is_select", False)
+            and getattr(clause, "_for_update_arg", None) is None
+            and has_request_context()
+            and g.get("read_replica")
+            and not self.info.get("wrote")
+        ):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                if not _recently_wrote() and health.usable(replica):
+                    health.routed += 1
+                    return replica
+                health.kept_on_primary += 1
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_write(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _start_staleness_window(session):
+    if session.info.pop("wrote", False) and has_request_context():
+        # This visitor reads from the primary until the replica has caught up
+        http_session[PRIMARY_UNTIL_KEY] = time.time() + READ_AFTER_WRITE_SECONDS
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _discard_write(session):
+    session.info.pop("wrote", None)
+
+
+def replica_binds():
+    """SQLALCHEMY_BINDS entries for the replica, if one is configured"""
+    return {REPLICA_BIND: REPLICA_URL} if REPLICA_URL else {}
+
+
+def get_replica_status():
+    return health.status()
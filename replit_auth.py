@@ -1,10 +1,14 @@
+import copy
 import os
+import threading
+import time
 import uuid
+from collections import OrderedDict
+from datetime import datetime
 from functools import wraps
 from urllib.parse import urlencode
 
 import jwt
-import requests
 from flask import g, redirect, render_template, request, session, url_for
 from flask_dance.consumer import (
     OAuth2ConsumerBlueprint,
@@ -12,68 +16,128 @@ from flask_dance.consumer import (
     oauth_error,
 )
 from flask_dance.consumer.storage import BaseStorage
-from flask_login import LoginManager, current_user, login_user, logout_user
-from jwt import PyJWKClient
+from flask_login import current_user, login_user, logout_user
 from oauthlib.oauth2.rfc6749.errors import InvalidGrantError
-from sqlalchemy.exc import NoResultFound
 from werkzeug.local import LocalProxy
 
-from app import app, db
+from app import app, db, login_manager
 from models import OAuth, User
+from oidc_cache import get_issuer
 
-# Cache for JWK clients
-_jwk_clients = {}
+# Per-worker OAuth token cache; other workers see a refresh within the TTL
+TOKEN_CACHE_TTL = float(os.environ.get("OAUTH_TOKEN_CACHE_SECONDS", "300"))
+TOKEN_CACHE_SIZE = int(os.environ.get("OAUTH_TOKEN_CACHE_SIZE", "512"))
 
-login_manager = LoginManager(app)
+# Share the app's LoginManager; identity.load_identity resolves both user types
 login_manager.login_view = "replit_auth.login"
 login_manager.login_message = "Please log in to access the admin panel."
 
 
-@login_manager.user_loader
-def load_user(user_id):
-    return User.query.get(user_id)
+class TokenCache:
+    """Per-worker cache of OAuth tokens keyed by (user_id, browser_session_key, provider)"""
+
+    def __init__(self, ttl=TOKEN_CACHE_TTL, max_size=TOKEN_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return (hit, token); a cached None means "no token stored" """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(key, None)
+                return False, None
+            self._entries.move_to_end(key)
+            return True, copy.deepcopy(entry[1])
+
+    def put(self, key, token):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, copy.deepcopy(token))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+_token_cache = TokenCache()
 
 
 class UserSessionStorage(BaseStorage):
+    """OAuth token storage with a write-through per-worker cache"""
+
+    @staticmethod
+    def cache_key(blueprint):
+        """Cache key for the current browser session, or None without a Replit user"""
+        user = current_user._get_current_object()
+        if not isinstance(user, User):
+            return None
+        return (user.id, g.browser_session_key, blueprint.name)
 
     def get(self, blueprint):
-        try:
-            token = (
-                db.session.query(OAuth)
-                .filter_by(
-                    user_id=current_user.get_id(),
-                    browser_session_key=g.browser_session_key,
-                    provider=blueprint.name,
-                )
-                .one()
-                .token
-            )
-        except NoResultFound:
-            token = None
+        key = self.cache_key(blueprint)
+        if key is None:
+            return None
+
+        hit, token = _token_cache.get(key)
+        if hit:
+            return token
+
+        oauth = (
+            db.session.query(OAuth)
+            .filter_by(user_id=key[0], browser_session_key=key[1], provider=key[2])
+            .populate_existing()
+            .one_or_none()
+        )
+        token = dict(oauth.token) if oauth is not None else None
+        _token_cache.put(key, token)
         return token
 
     def set(self, blueprint, token):
-        db.session.query(OAuth).filter_by(
-            user_id=current_user.get_id(),
-            browser_session_key=g.browser_session_key,
-            provider=blueprint.name,
-        ).delete()
-        new_model = OAuth()
-        new_model.user_id = current_user.get_id()
-        new_model.browser_session_key = g.browser_session_key
-        new_model.provider = blueprint.name
-        new_model.token = token
-        db.session.add(new_model)
+        key = self.cache_key(blueprint)
+        if key is None:
+            return
+
+        # Drop the cached token first so a failed write never leaves it behind
+        _token_cache.invalidate(key)
+        updated = (
+            db.session.query(OAuth)
+            .filter_by(user_id=key[0], browser_session_key=key[1], provider=key[2])
+            .update({"token": token, "created_at": datetime.utcnow()})
+        )
+        if not updated:
+            new_model = OAuth()
+            new_model.user_id = key[0]
+            new_model.browser_session_key = key[1]
+            new_model.provider = key[2]
+            new_model.token = token
+            db.session.add(new_model)
         db.session.commit()
+        _token_cache.put(key, token)
 
     def delete(self, blueprint):
+        key = self.cache_key(blueprint)
+        if key is None:
+            return
+
+        _token_cache.invalidate(key)
         db.session.query(OAuth).filter_by(
-            user_id=current_user.get_id(),
-            browser_session_key=g.browser_session_key,
-            provider=blueprint.name,
+            user_id=key[0], browser_session_key=key[1], provider=key[2]
         ).delete()
         db.session.commit()
 
+    def invalidate(self, blueprint):
+        """Forget the cached token so the next read goes to the database"""
+        key = self.cache_key(blueprint)
+        if key is not None:
+            _token_cache.invalidate(key)
+
 
 def make_replit_blueprint():
     try:
@@ -82,6 +146,7 @@ def make_replit_blueprint():
         raise SystemExit("the REPL_ID environment variable must be set")
 
     issuer_url = os.environ.get("ISSUER_URL", "https://replit.com/oidc")
+    issuer = get_issuer(issuer_url)
 
     replit_bp = OAuth2ConsumerBlueprint(
         "replit_auth",
@@ -110,6 +175,9 @@ def make_replit_blueprint():
 
     @replit_bp.before_app_request
     def set_applocal_session():
+        # Warm the discovery/JWKS cache in the serving process only, so the
+        # first login does not fetch it and CLIs never do
+        issuer.start()
         if "_browser_session_key" not in session:
             session["_browser_session_key"] = uuid.uuid4().hex
         session.modified = True
@@ -157,22 +225,8 @@ def logged_in(blueprint, token):
         # Get issuer URL for OIDC verification
         issuer_url = os.environ.get("ISSUER_URL", "https://replit.com/oidc")
 
-        # Get or create JWK client for this issuer
-        if issuer_url not in _jwk_clients:
-            # Fetch OIDC configuration to get JWKS URI
-            config_response = requests.get(
-                f"{issuer_url}/.well-known/openid-configuration", timeout=10
-            )
-            config_response.raise_for_status()
-            config = config_response.json()
-
-            # Create JWK client
-            _jwk_clients[issuer_url] = PyJWKClient(config["jwks_uri"])
-
-        jwk_client = _jwk_clients[issuer_url]
-
-        # Get the signing key for the JWT
-        signing_key = jwk_client.get_signing_key_from_jwt(token["id_token"])
+        # Discovery and JWKS come from the shared cache, prefetched at startup
+        signing_key = get_issuer(issuer_url).signing_key(token["id_token"])
 
         # Verify the JWT signature and claims
         user_claims = jwt.decode(
@@ -215,25 +269,57 @@ def require_login(f):
         # Check if token is expired and refresh if needed
         if hasattr(g, "flask_dance_replit") and g.flask_dance_replit.token:
             expires_in = g.flask_dance_replit.token.get("expires_in", 0)
-            if expires_in < 0:
-                refresh_token_url = (
-                    os.environ.get("ISSUER_URL", "https://replit.com/oidc") + "/token"
-                )
-                try:
-                    token = g.flask_dance_replit.refresh_token(
-                        token_url=refresh_token_url, client_id=os.environ["REPL_ID"]
-                    )
-                    g.flask_dance_replit.token = token
-                except InvalidGrantError:
-                    # If the refresh token is invalid, the user needs to re-login
-                    session["next_url"] = get_next_navigation_url(request)
-                    return redirect(url_for("replit_auth.login"))
+            if expires_in < 0 and not refresh_token(g.flask_dance_replit):
+                # If the refresh token is invalid, the user needs to re-login
+                session["next_url"] = get_next_navigation_url(request)
+                return redirect(url_for("replit_auth.login"))
 
         return f(*args, **kwargs)
 
     return decorated_function
 
 
+def refresh_token(oauth_session):
+    """
+    Refresh an expired token, retrying once with the stored copy
+
+    Another worker may have rotated the refresh token after this one cached
+    it, so a rejected grant reloads the token from the database: if the other
+    worker already refreshed it, that token is used, otherwise the refresh is
+    retried once with it.
+
+    Returns:
+        bool: False when the user has to log in again
+    """
+    token_url = os.environ.get("ISSUER_URL", "https://replit.com/oidc") + "/token"
+    blueprint = oauth_session.blueprint
+    token = oauth_session.token
+    for attempt in range(2):
+        try:
+            refreshed = oauth_session.refresh_token(
+                token_url=token_url,
+                refresh_token=token.get("refresh_token"),
+                client_id=os.environ["REPL_ID"],
+            )
+        except InvalidGrantError:
+            blueprint.storage.invalidate(blueprint)
+            if attempt:
+                return False
+            # Read storage itself: oauth_session.token still caches the
+            # token that was just rejected
+            token = blueprint.token
+            if not token:
+                return False
+            oauth_session.token = token
+            if token.get("expires_in", 0) >= 0:
+                return True
+            continue
+        # Through the blueprint, so storage and every worker see the new token
+        blueprint.token = refreshed
+        return True
+    return False
+
+
 def get_next_navigation_url(request):
     is_navigation_url = (
         request.headers.get("Sec-Fetch-Mode") == "navigate"
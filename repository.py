@@ -0,0 +1,102 @@
+"""
+Prebuilt statements for the hottest queries
+Model.query.filter_by(...) builds a new statement and computes its cache key
+on every call. The statements here are built once at import with bind
+parameters, so a call only binds values and executes; SQLAlchemy's compiled
+cache is hit directly. query_benchmark.py measures the difference.
+
+Statements are module-level and never modified per call. To add one, build
+it here with bindparam() for every per-call value and wrap it in a function.
+"""
+
+from sqlalchemy import bindparam, case, func, or_, select
+
+from app import db
+from models import AdminUser, BlogPost, ContactSubmission, IntakeSubmission, User
+from spam_filter import SPAM_STATUSES
+
+PUBLISHED_POST_BY_SLUG = (
+    select(BlogPost)
+    .where(
+        BlogPost.slug == bindparam("slug"),
+        BlogPost.published == True,  # noqa: E712
+    )
+    .limit(1)
+)
+
+RELATED_POSTS = (
+    select(BlogPost)
+    .where(
+        BlogPost.id != bindparam("post_id"),
+        BlogPost.published == True,  # noqa: E712
+        BlogPost.tags.contains(bindparam("tag")),
+    )
+    .limit(3)
+)
+
+ADMIN_BY_LOGIN_URL = (
+    select(AdminUser)
+    .where(AdminUser.custom_login_url == bindparam("url_path"))
+    .limit(1)
+)
+
+USER_BY_ID = {
+    model: select(model).where(model.id == bindparam("id"))
+    for model in (AdminUser, User)
+}
+
+
+def _submission_counts(model):
+    """Inbox, spam and last-week counts for a submission table in one scan"""
+    is_spam = model.spam_status.in_(SPAM_STATUSES)
+    in_inbox = or_(model.spam_status.is_(None), ~is_spam)
+    recent = model.submitted_at >= bindparam("since")
+    return select(
+        func.count(case((in_inbox, 1))).label("inbox"),
+        func.count(case((is_spam, 1))).label("spam"),
+        func.count(case((in_inbox & recent, 1))).label("recent_inbox"),
+        func.count(case((is_spam & recent, 1))).label("recent_spam"),
+    )
+
+
+SUBMISSION_COUNTS = {
+    "contact": _submission_counts(ContactSubmission),
+    "intake": _submission_counts(IntakeSubmission),
+}
+
+
+def published_post(slug):
+    """The published blog post with this slug, or None"""
+    return db.session.execute(PUBLISHED_POST_BY_SLUG, {"slug": slug}).scalar()
+
+
+def related_posts(post):
+    """Up to three other published posts sharing the post's first tag"""
+    if not post.tags:
+        return []
+    params = {"post_id": post.id, "tag": post.tags.split(",")[0]}
+    return db.session.execute(RELATED_POSTS, params).scalars().all()
+
+
+def admin_by_login_url(url_path):
+    """The admin whose custom login URL this is, or None"""
+    return db.session.execute(ADMIN_BY_LOGIN_URL, {"url_path": url_path}).scalar()
+
+
+def user_by_id(model, pk):
+    """Load an AdminUser or User by primary key, or None"""
+    return db.session.execute(USER_BY_ID[model], {"id": pk}).scalar()
+
+
+def submission_counts(since):
+    """
+    Submission counts for the admin dashboards
+
+    Returns:
+        dict: {"contact": row, "intake": row}, each row having inbox, spam,
+        recent_inbox and recent_spam, the recent ones counted from `since`
+    """
+    return {
+        kind: db.session.execute(statement, {"since": since}).one()
+        for kind, statement in SUBMISSION_COUNTS.items()
+    }
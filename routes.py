@@ -3,6 +3,7 @@ from datetime import datetime, timedelta
 from urllib.parse import urljoin, urlparse
 
 from flask import (
+    abort,
     flash,
     jsonify,
     make_response,
@@ -16,12 +17,25 @@ from flask_login import current_user
 from flask_mail import Message
 from markupsafe import escape
 from sqlalchemy import or_
-from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.exc import IntegrityError, OperationalError, SQLAlchemyError
 from sqlalchemy.orm import joinedload
 
+import repository
 from admin_auth import admin_auth
 from app import app, db, mail
+from app_cache import cache
+from db_pool import get_pool_metrics
+from feed import get_feed
+from form_idempotency import issue_submission_key, submission_keys
+from form_rate_limit import (
+    RATE_LIMIT_MESSAGE,
+    charge_submission,
+    get_rate_limit_metrics,
+    too_many_submissions,
+)
 from forms import ContactForm, IntakeForm, NewsletterForm
+from fragment_cache import fragments
+from local_pages import get_city_page, personalise_page, sitemap_pages
 from models import (
     AdminUser,
     BlogPost,
@@ -33,7 +47,17 @@ from models import (
     ProjectTimelineEvent,
     User,
 )
+from read_replica import get_replica_status, use_read_replica
 from replit_auth import make_replit_blueprint, require_login
+from single_flight import flights, single_flight
+from spam_filter import (
+    SPAM_STATUSES,
+    issue_form_token,
+    label_submission,
+    score_submission,
+)
+from submission_queue import submission_queue
+from view_counter import get_popular_posts, record_view
 
 # Register the authentication blueprints
 app.register_blueprint(make_replit_blueprint(), url_prefix="/auth")
@@ -102,10 +126,62 @@ def company():
     return render_template("company.html")
 
 
+def screen_submission(submission, form, kind):
+    """Score a new submission and quarantine it if it looks like spam"""
+    verdict = score_submission(
+        submission, form.website.data, form.form_started.data
+    )
+    submission.spam_score = verdict.score
+    if verdict.is_spam:
+        submission.spam_status = "quarantined"
+        logging.info(f"Quarantined {kind} submission: {verdict.reason}")
+    return verdict.is_spam
+
+
+CONTACT_SUCCESS = "Thank you for your message! We'll get back to you soon."
+INTAKE_SUCCESS = "Thank you! Your intake form has been submitted. We'll review it and get back to you soon."
+
+
+def submission_accepted(message, endpoint):
+    """Success response shared by a new submission and any replay of it"""
+    flash(message, "success")
+    return redirect(url_for(endpoint))
+
+
+def spool_during_outage(kind, submission, submission_key=None, messages=()):
+    """Keep a submission the database could not take; False if that fails too"""
+    if submission is None:
+        return False
+    logging.warning(f"Database unavailable, spooling {kind} submission")
+    return submission_queue.spool_submission(
+        kind, submission, submission_key, messages
+    )
+
+
+def prepare_form(form):
+    """Fill the per-render hidden fields of a form about to be displayed"""
+    if not form.form_started.data:
+        form.form_started.data = issue_form_token()
+    if not form.submission_key.data:
+        form.submission_key.data = issue_submission_key()
+
+
 @app.route("/contact", methods=["GET", "POST"])
 def contact():
     form = ContactForm()
     if form.validate_on_submit():
+        submission_key = form.submission_key.data
+        if submission_keys.is_replay("contact", submission_key):
+            logging.info("Ignored repeated contact submission")
+            return submission_accepted(CONTACT_SUCCESS, "contact")
+        wait = charge_submission("contact", form.email.data)
+        if wait:
+            flash(RATE_LIMIT_MESSAGE, "error")
+            prepare_form(form)
+            return too_many_submissions(
+                render_template("contact.html", form=form), wait
+            )
+        contact_submission = msg = None
         try:
             # Save to database with escaped data
             contact_submission = ContactSubmission()
@@ -118,12 +194,11 @@ def contact():
             )
             contact_submission.subject = escape(form.subject.data)
             contact_submission.message = escape(form.message.data)
+            quarantined = screen_submission(contact_submission, form, "contact")
 
-            db.session.add(contact_submission)
-            db.session.commit()
-
-            # Send email if configured
-            if app.config.get("MAIL_DEFAULT_SENDER"):
+            # Send email if configured; quarantined spam never reaches the inbox
+            msg = None
+            if app.config.get("MAIL_DEFAULT_SENDER") and not quarantined:
                 msg = Message(
                     subject=f"Contact Form: {form.subject.data}",
                     recipients=[app.config["MAIL_DEFAULT_SENDER"]],
@@ -139,12 +214,36 @@ def contact():
                     {form.message.data}
                     """,
                 )
+
+            if submission_queue.enqueue(
+                "contact", contact_submission, submission_key, msg
+            ):
+                # Spooled; the row and email follow in the next group commit
+                return submission_accepted(CONTACT_SUCCESS, "contact")
+
+            submission_keys.add("contact", submission_key)
+            db.session.add(contact_submission)
+            db.session.commit()
+            submission_keys.committed("contact", submission_key)
+            if msg is not None:
                 mail.send(msg)
 
-            flash("Thank you for your message! We'll get back to you soon.", "success")
-            return redirect(url_for("contact"))
+            return submission_accepted(CONTACT_SUCCESS, "contact")
+        except OperationalError as e:
+            db.session.rollback()
+            if spool_during_outage(
+                "contact", contact_submission, submission_key, [msg]
+            ):
+                return submission_accepted(CONTACT_SUCCESS, "contact")
+            logging.error(f"Database error saving contact submission: {e}")
+            flash("Sorry, there was a database error. Please try again.", "error")
         except SQLAlchemyError as e:
             db.session.rollback()
+            # A concurrent post of the same form won the race to save it
+            if isinstance(e, IntegrityError) and submission_keys.is_replay(
+                "contact", submission_key
+            ):
+                return submission_accepted(CONTACT_SUCCESS, "contact")
             logging.error(f"Database error saving contact submission: {e}")
             flash("Sorry, there was a database error. Please try again.", "error")
         except Exception as e:
@@ -152,6 +251,7 @@ def contact():
             logging.error(f"Unexpected error saving contact submission: {e}")
             flash("Sorry, there was an unexpected error. Please try again.", "error")
 
+    prepare_form(form)
     return render_template("contact.html", form=form)
 
 
@@ -199,6 +299,18 @@ def overview():
 def intake():
     form = IntakeForm()
     if form.validate_on_submit():
+        submission_key = form.submission_key.data
+        if submission_keys.is_replay("intake", submission_key):
+            logging.info("Ignored repeated intake submission")
+            return submission_accepted(INTAKE_SUCCESS, "intake")
+        wait = charge_submission("intake", form.email.data)
+        if wait:
+            flash(RATE_LIMIT_MESSAGE, "error")
+            prepare_form(form)
+            return too_many_submissions(
+                render_template("intake.html", form=form), wait
+            )
+        intake_submission = msg = None
         try:
             # Save to database with escaped data
             intake_submission = IntakeSubmission()
@@ -223,12 +335,11 @@ def intake():
                 if form.additional_notes.data
                 else None
             )
+            quarantined = screen_submission(intake_submission, form, "intake")
 
-            db.session.add(intake_submission)
-            db.session.commit()
-
-            # Send email if configured
-            if app.config.get("MAIL_DEFAULT_SENDER"):
+            # Send email if configured; quarantined spam never reaches the inbox
+            msg = None
+            if app.config.get("MAIL_DEFAULT_SENDER") and not quarantined:
                 msg = Message(
                     subject="New Client Intake Form Submission",
                     recipients=[app.config["MAIL_DEFAULT_SENDER"]],
@@ -250,15 +361,36 @@ def intake():
                     {form.additional_notes.data}
                     """,
                 )
+
+            if submission_queue.enqueue(
+                "intake", intake_submission, submission_key, msg
+            ):
+                # Spooled; the row and email follow in the next group commit
+                return submission_accepted(INTAKE_SUCCESS, "intake")
+
+            submission_keys.add("intake", submission_key)
+            db.session.add(intake_submission)
+            db.session.commit()
+            submission_keys.committed("intake", submission_key)
+            if msg is not None:
                 mail.send(msg)
 
-            flash(
-                "Thank you! Your intake form has been submitted. We'll review it and get back to you soon.",
-                "success",
-            )
-            return redirect(url_for("intake"))
+            return submission_accepted(INTAKE_SUCCESS, "intake")
+        except OperationalError as e:
+            db.session.rollback()
+            if spool_during_outage(
+                "intake", intake_submission, submission_key, [msg]
+            ):
+                return submission_accepted(INTAKE_SUCCESS, "intake")
+            logging.error(f"Database error saving intake submission: {e}")
+            flash("Sorry, there was a database error. Please try again.", "error")
         except SQLAlchemyError as e:
             db.session.rollback()
+            # A concurrent post of the same form won the race to save it
+            if isinstance(e, IntegrityError) and submission_keys.is_replay(
+                "intake", submission_key
+            ):
+                return submission_accepted(INTAKE_SUCCESS, "intake")
             logging.error(f"Database error saving intake submission: {e}")
             flash("Sorry, there was a database error. Please try again.", "error")
         except Exception as e:
@@ -266,10 +398,12 @@ def intake():
             logging.error(f"Unexpected error saving intake submission: {e}")
             flash("Sorry, there was an unexpected error. Please try again.", "error")
 
+    prepare_form(form)
     return render_template("intake.html", form=form)
 
 
 @app.route("/blog")
+@use_read_replica
 def blog():
     page = request.args.get("page", 1, type=int)
     # Optimized query with selective column loading and index usage
@@ -286,34 +420,60 @@ def blog():
                 BlogPost.author,
                 BlogPost.tags,
                 BlogPost.featured_image,
+                BlogPost.reading_time_minutes,
             )
         )
         .paginate(page=page, per_page=5, error_out=False)
     )
 
     # Set cache headers for better performance
-    response = make_response(render_template("blog.html", posts=posts))
+    response = make_response(
+        render_template("blog.html", posts=posts, popular_posts=get_popular_posts())
+    )
     response.headers["Cache-Control"] = "public, max-age=300"  # 5 minutes cache
     return response
 
 
+def feed_response(kind, content_type):
+    """Serve a cached feed with ETag/Last-Modified so polls can get a 304"""
+    body, etag, last_modified = get_feed(kind, app.config["SITE_URL"])
+
+    response = make_response(body)
+    response.headers["Content-Type"] = content_type
+    response.headers["Cache-Control"] = "public, max-age=300"  # 5 minutes cache
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    return response.make_conditional(request)
+
+
+@app.route("/blog/feed.xml")
+def blog_feed():
+    """Atom feed of published blog posts"""
+    return feed_response("atom", "application/atom+xml; charset=utf-8")
+
+
+@app.route("/blog/rss.xml")
+def blog_rss():
+    """RSS 2.0 feed of published blog posts"""
+    return feed_response("rss", "application/rss+xml; charset=utf-8")
+
+
 @app.route("/blog/<slug>")
+@use_read_replica
 def blog_post(slug):
-    post = BlogPost.query.filter_by(slug=slug, published=True).first_or_404()
-    # Get related posts (same tags)
-    related_posts = []
-    if post.tags:
-        related_posts = (
-            BlogPost.query.filter(
-                BlogPost.id != post.id,
-                BlogPost.published == True,
-                BlogPost.tags.contains(post.tags.split(",")[0]),
-            )
-            .limit(3)
-            .all()
-        )
+    post = repository.published_post(slug)
+    if post is None:
+        abort(404)
 
-    return render_template("blog_post.html", post=post, related_posts=related_posts)
+    # Buffered in memory; flushed to the database by the view counter thread
+    record_view(post.id)
+
+    return render_template(
+        "blog_post.html",
+        post=post,
+        related_posts=repository.related_posts(post),
+        popular_posts=get_popular_posts(),
+    )
 
 
 @app.route("/admin")
@@ -326,51 +486,88 @@ def admin_login():
 
 @app.route("/admin/dashboard")
 @require_login
+@use_read_replica
 def admin_dashboard():
     """Enhanced admin dashboard for managing inquiries"""
-    from datetime import datetime, timedelta
+    # Quarantined and confirmed spam stay out of the inbox unless asked for
+    show_spam = request.args.get("view") == "spam"
+    return render_template("admin_dashboard.html", **dashboard_data(show_spam))
+
+
+# Columns of either submission table the dashboard cards show
+INQUIRY_FIELDS = (
+    "id",
+    "name",
+    "business_name",
+    "contact_name",
+    "email",
+    "phone",
+    "subject",
+    "project_description",
+    "website_type",
+    "budget",
+    "timeline",
+    "spam_score",
+    "submitted_at",
+)
 
-    # Get submission counts
-    contact_count = ContactSubmission.query.count()
-    intake_count = IntakeSubmission.query.count()
 
-    # Get recent submissions (last 7 days)
-    week_ago = datetime.utcnow() - timedelta(days=7)
-    recent_contacts = ContactSubmission.query.filter(
-        ContactSubmission.submitted_at >= week_ago
-    ).count()
-    recent_intakes = IntakeSubmission.query.filter(
-        IntakeSubmission.submitted_at >= week_ago
-    ).count()
-    recent_count = recent_contacts + recent_intakes
-
-    # Get all submissions for the dashboard
-    contact_submissions = ContactSubmission.query.order_by(
-        ContactSubmission.submitted_at.desc()
-    ).all()
-    intake_submissions = IntakeSubmission.query.order_by(
-        IntakeSubmission.submitted_at.desc()
-    ).all()
+@single_flight()
+def dashboard_data(show_spam):
+    """
+    Counts and inquiries for the admin dashboard
 
-    # Combine and prepare all inquiries with type information
-    all_inquiries = []
-    for submission in contact_submissions:
-        submission.type = "contact"
-        all_inquiries.append(submission)
-    for submission in intake_submissions:
-        submission.type = "intake"
-        all_inquiries.append(submission)
+    Concurrent refreshes share one load, so inquiries are returned as plain
+    dicts of the columns the dashboard shows rather than ORM rows.
+    """
+    from datetime import datetime, timedelta
 
-    # Sort by submission date (newest first)
-    all_inquiries.sort(key=lambda x: x.submitted_at, reverse=True)
+    def inbox(model):
+        is_spam = model.spam_status.in_(SPAM_STATUSES)
+        if show_spam:
+            return is_spam
+        return or_(model.spam_status.is_(None), ~is_spam)
+
+    def inquiries(model, kind):
+        columns = [
+            getattr(model, name) for name in INQUIRY_FIELDS if hasattr(model, name)
+        ]
+        rows = (
+            db.session.query(*columns)
+            .filter(inbox(model))
+            .order_by(model.submitted_at.desc())
+        )
+        return [
+            {**dict.fromkeys(INQUIRY_FIELDS), **row._asdict(), "type": kind}
+            for row in rows
+        ]
 
-    return render_template(
-        "admin_dashboard.html",
-        contact_count=contact_count,
-        intake_count=intake_count,
-        recent_count=recent_count,
-        all_inquiries=all_inquiries,
+    # Submission counts, including the last 7 days, in one query per table
+    week_ago = datetime.utcnow() - timedelta(days=7)
+    counts = repository.submission_counts(week_ago)
+    contact, intake = counts["contact"], counts["intake"]
+    if show_spam:
+        contact_count, intake_count = contact.spam, intake.spam
+        recent_count = contact.recent_spam + intake.recent_spam
+    else:
+        contact_count, intake_count = contact.inbox, intake.inbox
+        recent_count = contact.recent_inbox + intake.recent_inbox
+    spam_count = contact.spam + intake.spam
+
+    # Combine both kinds, newest first
+    all_inquiries = inquiries(ContactSubmission, "contact") + inquiries(
+        IntakeSubmission, "intake"
     )
+    all_inquiries.sort(key=lambda inquiry: inquiry["submitted_at"], reverse=True)
+
+    return {
+        "contact_count": contact_count,
+        "intake_count": intake_count,
+        "recent_count": recent_count,
+        "spam_count": spam_count,
+        "show_spam": show_spam,
+        "all_inquiries": all_inquiries,
+    }
 
 
 # API routes for inquiry management
@@ -390,6 +587,8 @@ def get_inquiry_details(inquiry_type, inquiry_id):
                 "subject": inquiry.subject,
                 "message": inquiry.message,
                 "submitted_at": inquiry.submitted_at.isoformat(),
+                "spam_score": inquiry.spam_score,
+                "spam_status": inquiry.spam_status,
             }
         elif inquiry_type == "intake":
             inquiry = IntakeSubmission.query.get_or_404(inquiry_id)
@@ -406,6 +605,8 @@ def get_inquiry_details(inquiry_type, inquiry_id):
                 "project_description": inquiry.project_description,
                 "additional_notes": inquiry.additional_notes,
                 "submitted_at": inquiry.submitted_at.isoformat(),
+                "spam_score": inquiry.spam_score,
+                "spam_status": inquiry.spam_status,
             }
         else:
             return jsonify({"error": "Invalid inquiry type"}), 400
@@ -428,16 +629,50 @@ def mark_inquiry_complete(inquiry_type, inquiry_id):
         else:
             return jsonify({"error": "Invalid inquiry type"}), 400
 
-        # For now, we'll just add a note or we could add a status field to the models
-        # Since we don't have a status field, we'll just return success
-        # In a future update, we could add a status field to track inquiry states
+        # A handled inquiry is genuine; train the spam filter on it as ham
+        label_submission(inquiry, "ham")
+        db.session.commit()
 
         return jsonify({"success": True, "message": "Inquiry marked as complete"})
     except Exception as e:
+        db.session.rollback()
         logging.error(f"Error marking inquiry complete: {e}")
         return jsonify({"error": "Failed to mark inquiry complete"}), 500
 
 
+@app.route("/admin/inquiry/<inquiry_type>/<int:inquiry_id>/spam", methods=["POST"])
+@require_login
+def mark_inquiry_spam(inquiry_type, inquiry_id):
+    """Move an inquiry to the spam view and train the spam filter on it"""
+    return label_inquiry(inquiry_type, inquiry_id, "spam")
+
+
+@app.route("/admin/inquiry/<inquiry_type>/<int:inquiry_id>/not-spam", methods=["POST"])
+@require_login
+def mark_inquiry_not_spam(inquiry_type, inquiry_id):
+    """Release a quarantined inquiry back to the inbox"""
+    return label_inquiry(inquiry_type, inquiry_id, "ham")
+
+
+def label_inquiry(inquiry_type, inquiry_id, label):
+    """Apply an admin spam/ham label to an inquiry"""
+    try:
+        if inquiry_type == "contact":
+            inquiry = ContactSubmission.query.get_or_404(inquiry_id)
+        elif inquiry_type == "intake":
+            inquiry = IntakeSubmission.query.get_or_404(inquiry_id)
+        else:
+            return jsonify({"error": "Invalid inquiry type"}), 400
+
+        label_submission(inquiry, label)
+        db.session.commit()
+        return jsonify({"success": True})
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logging.error(f"Database error labelling inquiry {inquiry_id}: {e}")
+        return jsonify({"error": "Database error occurred"}), 500
+
+
 @app.route("/admin/inquiry/<inquiry_type>/<int:inquiry_id>/delete", methods=["DELETE", "POST"])
 @require_login
 def delete_inquiry(inquiry_type, inquiry_id):
@@ -489,6 +724,9 @@ def delete_inquiry(inquiry_type, inquiry_id):
 
         logging.info(f"Attempting to delete inquiry: {inquiry_name} ({inquiry_email})")
 
+        # Deleting an inquiry nobody confirmed as genuine counts as spam
+        if inquiry.spam_status != "ham":
+            label_submission(inquiry, "spam")
         db.session.delete(inquiry)
         db.session.commit()
 
@@ -758,19 +996,18 @@ def add_timeline_event(project_id):
 def admin_console():
     """Admin console with optimized queries and error handling"""
     try:
-        # Get submission counts efficiently
-        contact_count = ContactSubmission.query.count()
-        intake_count = IntakeSubmission.query.count()
-
-        # Get recent submissions (last 7 days)
+        # Submission counts, including the last 7 days, in one query per table
         week_ago = datetime.utcnow() - timedelta(days=7)
-        recent_contacts = ContactSubmission.query.filter(
-            ContactSubmission.submitted_at >= week_ago
-        ).count()
-        recent_intakes = IntakeSubmission.query.filter(
-            IntakeSubmission.submitted_at >= week_ago
-        ).count()
-        recent_count = recent_contacts + recent_intakes
+        counts = repository.submission_counts(week_ago)
+        contact, intake = counts["contact"], counts["intake"]
+        contact_count = contact.inbox + contact.spam
+        intake_count = intake.inbox + intake.spam
+        recent_count = (
+            contact.recent_inbox
+            + contact.recent_spam
+            + intake.recent_inbox
+            + intake.recent_spam
+        )
 
         # Get recent submissions for activity feed with optimized queries
         contact_submissions = (
@@ -830,403 +1067,27 @@ def admin_submissions():
     )
 
 
-@app.route("/admin/add-first-post")
+@app.route("/admin/import-content", methods=["POST"])
 @require_login
-def add_first_post():
-    """Add your first blog post to the database"""
-    # Check if the post already exists
-    existing_post = BlogPost.query.filter_by(
-        slug="why-small-businesses-need-websites"
-    ).first()
-    if existing_post:
-        flash("First blog post already exists!", "info")
-        return redirect(url_for("blog"))
-
-    # Create the first blog post with safe assignment
-    first_post = BlogPost()
-    first_post.title = (
-        "Why Small Businesses in Texas Need a Professional Website in 2025"
-    )
-    first_post.slug = "why-small-businesses-need-websites"
-    first_post.content = """<h2>The Digital Landscape Has Changed</h2>
-<p>In 2025, your website isn't just a digital business card—it's your storefront, your salesperson, and your credibility all rolled into one. For small businesses in Texas, especially in the DFW area, having a professional website is no longer optional.</p>
-
-<h2>Local Competition is Fierce</h2>
-<p>Whether you're a contractor in Dallas, a real estate agent in Fort Worth, or a freelancer in Arlington, your competitors are online. When potential customers search for services in your area, you need to be there.</p>
-
-<h3>Key Benefits of a Professional Website:</h3>
-<ul>
-<li><strong>24/7 Availability:</strong> Your website works while you sleep, answering questions and generating leads.</li>
-<li><strong>Credibility:</strong> A professional website builds trust before the first phone call.</li>
-<li><strong>Local SEO:</strong> Show up when customers search for services "near me".</li>
-<li><strong>Cost-Effective Marketing:</strong> More affordable than traditional advertising with better targeting.</li>
-<li><strong>Mobile Accessibility:</strong> Reach customers on their phones, tablets, and computers.</li>
-</ul>
-
-<h2>What Texas Small Businesses Need</h2>
-<p>Your website should reflect your business's personality while serving your customers' needs. This means:</p>
-
-<blockquote>
-"A website that looks professional, loads fast, and makes it easy for customers to contact you or learn about your services."
-</blockquote>
-
-<h3>Essential Features for Small Business Websites:</h3>
-<ol>
-<li><strong>Clear Contact Information:</strong> Make it easy to reach you</li>
-<li><strong>Service Descriptions:</strong> Tell people exactly what you do</li>
-<li><strong>Customer Reviews:</strong> Build```python
- social proof</li>
-<li><strong>Mobile Optimization:</strong> Most customers will find you on their phone</li>
-<li><strong>Fast Loading:</strong> Don't lose customers to slow pages</li>
-</ol>
-
-<h2>Ready to Get Started?</h2>
-<p>Building a website doesn't have to be overwhelming. Whether you're ready to DIY or want professional help, the important thing is to start. Your future customers are searching for you right now—make sure they can find you.</p>
-
-<p>Need help getting your small business online? I specialize in creating professional, affordable websites for Texas entrepreneurs. Let's chat about bringing your business to the digital world.</p>"""
-    first_post.excerpt = "In 2025, your website isn't just a digital business card—it's your storefront, your salesperson, and your credibility all rolled into one. Learn why Texas small businesses need a professional online presence."
-    first_post.tags = (
-        "small business, Texas, web design, DFW, local SEO, professional website"
-    )
-    first_post.meta_description = "Discover why small businesses in Texas need professional websites in 2025. Learn the key benefits and essential features for success in the digital marketplace."
-    first_post.published = True
-
-    try:
-        db.session.add(first_post)
-        db.session.commit()
-        flash("First blog post added successfully!", "success")
-    except SQLAlchemyError as e:
-        db.session.rollback()
-        logging.error(f"Database error adding first blog post: {e}")
-        flash("Database error adding blog post. Please try again.", "error")
-    except Exception as e:
-        db.session.rollback()
-        logging.error(f"Unexpected error adding first blog post: {e}")
-        flash("Unexpected error adding blog post. Please try again.", "error")
-
-    return redirect(url_for("blog"))
-
-
-@app.route("/add-featured-post")
-def add_featured_post():
-    """Add a new featured blog post to the database"""
-    # Check if the post already exists
-    existing_post = BlogPost.query.filter_by(slug="future-of-web-design-2025").first()
-    if existing_post:
-        # Update existing post with featured image
-        existing_post.featured_image = "https://hosting.photobucket.com/ffe76a37-34ae-4a9f-949c-780379ff74c1/e492cf05-51b9-4103-b275-9fde5aaf7461.jpeg?width=590&height=370&fit=bounds"
-        try:
-            db.session.commit()
-            flash("Featured blog post updated with image!", "success")
-        except SQLAlchemyError as e:
-            db.session.rollback()
-            logging.error(f"Database error updating blog post: {e}")
-            flash("Database error updating blog post. Please try again.", "error")
-        return redirect(url_for("blog"))
-
-    # Create the new featured blog post
-    featured_post = BlogPost()
-    featured_post.title = (
-        "Will AI Take My Web Designer's Job? A No-Nonsense Guide for Small Businesses"
-    )
-    featured_post.slug = "future-of-web-design-2025"
-    featured_post.content = """<h2>Will <span style="color: #E0218A;">AI</span> Take My <span style="color: #E0218A;">Web Designer</span>'s Job? A <span style="color: #E0218A;">No</span>-Nonsense Guide for <span style="color: #E0218A;">Small</span> <span style="color: #7A7A7A;">Businesses</span></h2>
-
-<p>Let's talk about the elephant in the room: Artificial Intelligence. You've seen it everywhere. It writes, it creates art, and now, it builds websites. As a small business owner in Texas, you're probably wondering, "Can I just use AI to build my website? Is it cheaper? Is it better?"</p>
-
-<p>These are the right questions to ask. And as a developer who is constantly learning and adapting, I've spent a lot of time exploring these tools myself.</p>
-
-<p>So, let's have an honest conversation about AI in web design and development—the good, the bad, and how it can actually help your business thrive without replacing the human touch.</p>
-
-<h2><span style="color: #E0218A;">The Pros</span>: Where AI Shines (and Saves You Money)</h2>
-
-<p>AI is an incredible tool, and when used correctly, it can make the development process faster and more efficient.</p>
-
-<p><span style="color: #E0218A;">Speed & Efficiency</span>: AI can generate code snippets, design mockups, and even write first drafts of content in a fraction of the time it would take a human. For you, this means a quicker turnaround time on your project.</p>
-
-<p><span style="color: #E0218A;">Cost-Effectiveness</span>: By automating repetitive tasks, I can spend more time on the things that really matter—like your brand strategy and custom features—which gives you more value for your investment.</p>
-
-<p><span style="color: #E0218A;">Data-Driven Design</span>: AI can analyze data to suggest layouts and color schemes that are proven to convert, taking some of the guesswork out of the design process.</p>
-
-<h2><span style="color: #E0218A;">The Cons</span>: Where a Human Is Still Essential</h2>
-
-<p>Here is the honest truth: AI is a brilliant assistant, but it's a terrible artist. It can't capture the heart of your brand.</p>
-
-<p><span style="color: #E0218A;">Lack</span> of Originality: AI models are trained on existing data, which means they often produce designs that feel generic or derivative. Your business is unique; your website should be too.</p>
-
-<p>No Strategic "<span style="color: #E0218A;">Why</span>": AI can build a page, but it can't understand your business goals, your target audience's pain points, or the story you want to tell. It can't build a customer journey that feels empathetic and authentic.</p>
-
-<p>The "<span style="color: #E0218A;">Good Enough</span>" Trap: AI often produces work that is technically correct but lacks soul. It can't make the intuitive design choices that create a truly memorable user experience.</p>
-
-<h2><span style="color: #E0218A;">The</span> <span style="color: #7A7A7A;">Grey</span> <span style="color: #E0218A;">Canvas Approach</span>: AI as a Co-Pilot, Not the Pilot</h2>
-
-<p>At The Grey Canvas, I use AI as a powerful co-pilot. It helps me work faster and smarter, but it never takes the driver's seat. I use it to automate the boring stuff so I can pour my energy into the parts of your project that require a human touch: the strategy, the creativity, and the collaborative partnership we build together.</p>
-
-<h2>Top AI Tools in My Toolkit (2025)</h2>
-
-<p>For those who are curious, here are some of the cost-efficient tools that are making waves in the development world.</p>
-
-<h3>Top 10 AI Tools for <span style="color: #E0218A;">Front</span>-<span style="color: #E0218A;">End</span> & <span style="color: #E0218A;">Web</span> <span style="color: #7A7A7A;">Design</span>:</h3>
-
-<ol>
-<li><strong>GitHub Copilot</strong>: An AI pair programmer that suggests code and entire functions right in the editor.</li>
-<li><strong>v0.dev by Vercel</strong>: Generates React components and UI layouts based on text prompts.</li>
-<li><strong>Midjourney & DALL-E 3</strong>: For creating custom graphics, icons, and background textures.</li>
-<li><strong>Uizard</strong>: Quickly turns hand-drawn sketches into digital wireframes and mockups.</li>
-<li><strong>Khroma</strong>: An AI color tool that generates endless color palettes based on your preferences.</li>
-<li><strong>Canva Magic Design</strong>: Instantly creates branded templates and mockups from a single image.</li>
-<li><strong>Galileo AI</strong>: Creates high-fidelity UI designs from a simple text description.</li>
-<li><strong>Fronty</strong>: Converts images into clean HTML and CSS code.</li>
-<li><strong>ChatGPT-4o</strong>: Excellent for brainstorming content ideas, writing meta descriptions, and generating placeholder text.</li>
-<li><strong>Jasper.ai</strong>: A powerful AI copywriter for crafting compelling headlines and website content.</li>
-</ol>
-
-<h3>Top 10 AI Tools for <span style="color: #E0218A;">Back</span>-<span style="color: #E0218A;">End</span> <span style="color: #7A7A7A;">Development</span>:</h3>
-
-<ol>
-<li><strong>CodeWhisperer (Amazon)</strong>: A real-time code suggestion tool that's great for server-side logic.</li>
-<li><strong>Tabnine</strong>: An AI assistant that learns your coding patterns to provide personalized suggestions.</li>
-<li><strong>Mutable.ai</strong>: An AI-powered tool that helps refactor and improve existing codebases.</li>
-<li><strong>AskCodi</strong>: A developer's toolkit that can explain code, generate documentation, and write tests.</li>
-<li><strong>Replit AI</strong>: A coding assistant built directly into the Replit development environment.</li>
-<li><strong>Mintlify</strong>: Automatically generates beautiful, easy-to-read documentation for your code.</li>
-<li><strong>Adrenaline</strong>: An AI that can help debug code and explain complex errors.</li>
-<li><strong>Bugasura</strong>: An AI-powered bug tracker that helps manage and prioritize issues.</li>
-<li><strong>CodePal</strong>: Offers code generation, unit testing, and a "code reviewer" feature.</li>
-<li><strong>Akkio</strong>: A no-code AI platform that can be used to build and deploy data models for your application.</li>
-</ol>
-
-<h2>How You Can Leverage AI for Your Business (Even if You're Not a Coder)</h2>
-
-<p>You don't need to be a developer to make AI work for you. Here are a few simple tips:</p>
-
-<p>Use AI for <span style="color: #E0218A;">Inspiration</span>, Not <span style="color: #E0218A;">Imitation</span>: Use tools like Midjourney or Canva to brainstorm visual ideas for your brand, but always bring them to a designer to refine and make them unique.</p>
-
-<p>Draft Content with AI: Use ChatGPT or Jasper.ai to create a first draft of your "About Us" page or a blog post, then edit it to add your personal voice and story.</p>
-
-<p>Work with a Developer Who Understands AI: The best approach is to partner with a professional who knows how to leverage these tools to your advantage, saving you time and money while still delivering a high-quality, custom product.</p>
-
-<h2>The <span style="color: #E0218A;">Final</span> Word</h2>
-
-<p>AI is a powerful tool, but it's just that—a tool. It can't replace the empathy, strategy, and creative spark that comes from a true human partnership. At The Grey Canvas, I'm committed to using the best of both worlds to build you a website that is not only technically excellent but also deeply authentic to your brand.</p>
-
-<p>Ready to build something with heart and purpose? Let's start your project today.</p>"""
-    featured_post.excerpt = "The honest truth about AI in web design: where it shines, where it fails, and how The Grey Canvas uses AI as a co-pilot (not the pilot) to deliver authentic, strategic websites for Texas small businesses."
-    featured_post.tags = "web design trends, 2025, AI design, mobile-first, UX design, small business, Texas, future of web"
-    featured_post.meta_description = "Will AI replace web designers? Get the honest truth about AI in web design, including 20 top AI tools and how to leverage AI for your small business without losing the human touch."
-    featured_post.featured_image = "https://hosting.photobucket.com/ffe76a37-34ae-4a9f-949c-780379ff74c1/e492cf05-51b9-4103-b275-9fde5aaf7461.jpeg?width=590&height=370&fit=bounds"
-    featured_post.published = True
+def import_blog_content():
+    """Import blog posts from the content directory"""
+    from content_import import ContentError, import_content
 
     try:
-        db.session.add(featured_post)
-        db.session.commit()
-        flash("Featured blog post added successfully!", "success")
-    except SQLAlchemyError as e:
-        db.session.rollback()
-        logging.error(f"Database error adding featured blog post: {e}")
-        flash("Database error adding blog post. Please try again.", "error")
-    except Exception as e:
-        db.session.rollback()
-        logging.error(f"Unexpected error adding featured blog post: {e}")
-        flash("Unexpected error adding blog post. Please try again.", "error")
-
-    return redirect(url_for("blog"))
-
-
-@app.route("/add-frontend-blog-post")
-def add_frontend_blog_post():
-    """Add the new frontend development blog post"""
-    # Check if the post already exists
-    existing_post = BlogPost.query.filter_by(
-        slug="frontend-has-changed-why-next-project-wont-start-create-react-app"
-    ).first()
-    if existing_post:
-        flash("Frontend blog post already exists!", "info")
-        return redirect(url_for("blog"))
-
-    # Create the new blog post
-    frontend_post = BlogPost()
-    frontend_post.title = "The Frontend Has Changed: Why Your Next Project Won't Start with create-react-app"
-    frontend_post.slug = "frontend-has-changed-why-next-project-wont-start-create-react-app"
-    frontend_post.content = """<p>For years, my process for starting a new web project was almost muscle memory: pop open a terminal, run create-react-app, and start building. It was the standard, the path of least resistance. But as I look at the landscape in 2025, I've realized that era is definitively over. Building a production-grade application with a library like React in isolation just isn't how we do things anymore.</p>
-
-<p>We've entered the age of the meta-framework, and it's a shift that has fundamentally changed how we build for the web.</p>
-
-<h2>The End of Duct-Tape Engineering</h2>
-<p>Let's be honest: create-react-app was just the starting line. To get to production, we had to become amateur infrastructure engineers, duct-taping together a router, a server-side rendering solution, a build tool, and a dozen other packages. We spent countless hours wrestling with Webpack configs, all to solve problems that every single team was also trying to solve.</p>
-
-<p>The industry has moved on. A revolution in build tooling, led by lightning-fast tools like Vite and now Turbopack, made the old, slow processes feel archaic. Meta-frameworks like Next.js, SvelteKit, and Nuxt harnessed this power, giving us integrated systems that handle the hard parts—routing, data-fetching, rendering strategies—right out of the box. Add in the rise of utility-first styling with Tailwind CSS and copy-pasteable components from libraries like shadcn/ui, and the entire development experience has been transformed.</p>
-
-<p>This evolution has led to two huge shifts that define frontend development today.</p>
-
-<h2>Shift 1: The Philosophical Divide</h2>
-<p>The first big shift is a clear split in philosophy. The question is no longer just "Which framework is most popular?" but "Which philosophy aligns with my business goals?"</p>
-
-<p>On one side, you have the "Ecosystem-First" incumbents, led by React and its meta-framework Next.js. Their value isn't just in the technology itself, but in the massive, stable ecosystem around it. You get a huge talent pool, a library for everything, and the enterprise-grade stability that big companies need. It's the safe, predictable, and powerful choice.</p>
-
-<p>On the other side are the "Performance-First" challengers like Qwik and SolidJS. They offer objectively mind-blowing performance by rethinking architecture from the ground up.</p>
-
-<p>Qwik introduces "resumability," which all but eliminates the hydration step, allowing massive applications to become interactive almost instantly. For an e-commerce site where milliseconds matter, this is a game-changer.</p>
-
-<p>SolidJS uses fine-grained reactivity to achieve performance that rivals vanilla JavaScript, making it perfect for highly interactive dashboards and real-time apps.</p>
-
-<p>Choosing between them is a strategic decision: do you prioritize the stability and vast resources of the ecosystem, or the raw performance that can provide a direct competitive advantage?</p>
-
-<h2>Shift 2: The Dawn of the "Managed Frontend"</h2>
-<p>The second shift is just as profound: the rise of the "Managed Frontend" or "Frontend Cloud." Platforms like Vercel and Netlify have created a new paradigm. They aren't just hosting providers; they are integrated platforms that are deeply aware of the framework you're using.</p>
-
-<p>When I push a Next.js app to Vercel, the platform automatically knows how to build it, deploy API routes as serverless functions, and distribute static pages across a global CDN. It creates preview deployments for every pull request, closing the feedback loop and killing the need for a traditional staging server.</p>
-
-<p>This abstracts away almost all the DevOps complexity. It allows my team and me to focus entirely on what we do best: building great user experiences and delivering business value. It's a massive leap in productivity for the entire industry.</p>
-
-<h2>The Takeaway</h2>
-<p>The frontend world has matured. We've moved from using simple libraries to adopting integrated, opinionated systems that make us more productive and our applications more performant. The "best" framework is the one that best fits your project's unique needs—be it the ecosystem of Next.js, the instant-on speed of Qwik, or the raw power of SolidJS. By understanding these shifts, we can make smarter, more strategic decisions that set our projects up for success.</p>
-
-<h3>Resources for Further Reading:</h3>
-
-<h4>Frameworks & Meta-Frameworks:</h4>
-<ul>
-<li><a href="https://nextjs.org" target="_blank" rel="noopener noreferrer">Next.js (React)</a></li>
-<li><a href="https://nuxt.com" target="_blank" rel="noopener noreferrer">Nuxt (Vue)</a></li>
-<li><a href="https://kit.svelte.dev" target="_blank" rel="noopener noreferrer">SvelteKit (Svelte)</a></li>
-<li><a href="https://qwik.builder.io" target="_blank" rel="noopener noreferrer">Qwik</a></li>
-<li><a href="https://start.solidjs.com" target="_blank" rel="noopener noreferrer">SolidStart (SolidJS)</a></li>
-<li><a href="https://angular.io" target="_blank" rel="noopener noreferrer">Angular</a></li>
-</ul>
-
-<h4>Build Tools:</h4>
-<ul>
-<li><a href="https://vitejs.dev" target="_blank" rel="noopener noreferrer">Vite</a></li>
-<li><a href="https://turbo.build/pack" target="_blank" rel="noopener noreferrer">Turbopack</a></li>
-</ul>
-
-<h4>Styling & UI:</h4>
-<ul>
-<li><a href="https://tailwindcss.com" target="_blank" rel="noopener noreferrer">Tailwind CSS</a></li>
-<li><a href="https://ui.shadcn.com" target="_blank" rel="noopener noreferrer">shadcn/ui</a></li>
-</ul>
-
-<h4>Deployment Platforms (Managed Frontend):</h4>
-<ul>
-<li><a href="https://vercel.com" target="_blank" rel="noopener noreferrer">Vercel</a></li>
-<li><a href="https://netlify.com" target="_blank" rel="noopener noreferrer">Netlify</a></li>
-</ul>"""
-    frontend_post.excerpt = "For years, starting a web project meant running create-react-app. But in 2025, that era is over. Discover how meta-frameworks, managed frontends, and the philosophical divide between ecosystem-first and performance-first approaches are reshaping how we build for the web."
-    frontend_post.tags = "frontend development, React, Next.js, Qwik, SolidJS, meta-frameworks, web development, 2025, Vercel, Netlify, build tools"
-    frontend_post.meta_description = "Why create-react-app is dead in 2025. Explore meta-frameworks like Next.js, Qwik performance solutions, and managed frontend platforms."
-    frontend_post.featured_image = "https://hosting.photobucket.com/ffe76a37-34ae-4a9f-949c-780379ff74c1/e4e81bd3-3ea4-4b1e-9d8e-59560dedd1c6.jpeg?width=960&height=720&fit=bounds"
-    frontend_post.published = True
-
-    try:
-        db.session.add(frontend_post)
-        db.session.commit()
-        flash("Frontend development blog post added successfully!", "success")
-    except SQLAlchemyError as e:
-        db.session.rollback()
-        logging.error(f"Database error adding frontend blog post: {e}")
-        flash("Database error adding blog post. Please try again.", "error")
-    except Exception as e:
-        db.session.rollback()
-        logging.error(f"Unexpected error adding frontend blog post: {e}")
-        flash("Unexpected error adding blog post. Please try again.", "error")
-
-    return redirect(url_for("blog"))
-
-
-@app.route("/update-frontend-blog-image")
-def update_frontend_blog_image():
-    """Update the existing frontend blog post with the new image"""
-    # Find the existing blog post
-    existing_post = BlogPost.query.filter_by(
-        slug="frontend-has-changed-why-next-project-wont-start-create-react-app"
-    ).first()
-
-    if not existing_post:
-        flash("Frontend blog post not found!", "error")
-        return redirect(url_for("blog"))
-
-    # Update the content without the image at the top (image will be shown via featured_image field)
-    updated_content = """<p>For years, my process for starting a new web project was almost muscle memory: pop open a terminal, run create-react-app, and start building. It was the standard, the path of least resistance. But as I look at the landscape in 2025, I've realized that era is definitively over. Building a production-grade application with a library like React in isolation just isn't how we do things anymore.</p>
-
-<p>We've entered the age of the meta-framework, and it's a shift that has fundamentally changed how we build for the web.</p>
-
-<h2>The End of Duct-Tape Engineering</h2>
-<p>Let's be honest: create-react-app was just the starting line. To get to production, we had to become amateur infrastructure engineers, duct-taping together a router, a server-side rendering solution, a build tool, and a dozen other packages. We spent countless hours wrestling with Webpack configs, all to solve problems that every single team was also trying to solve.</p>
-
-<p>The industry has moved on. A revolution in build tooling, led by lightning-fast tools like Vite and now Turbopack, made the old, slow processes feel archaic. Meta-frameworks like Next.js, SvelteKit, and Nuxt harnessed this power, giving us integrated systems that handle the hard parts—routing, data-fetching, rendering strategies—right out of the box. Add in the rise of utility-first styling with Tailwind CSS and copy-pasteable components from libraries like shadcn/ui, and the entire development experience has been transformed.</p>
-
-<p>This evolution has led to two huge shifts that define frontend development today.</p>
-
-<h2>Shift 1: The Philosophical Divide</h2>
-<p>The first big shift is a clear split in philosophy. The question is no longer just "Which framework is most popular?" but "Which philosophy aligns with my business goals?"</p>
-
-<p>On one side, you have the "Ecosystem-First" incumbents, led by React and its meta-framework Next.js. Their value isn't just in the technology itself, but in the massive, stable ecosystem around it. You get a huge talent pool, a library for everything, and the enterprise-grade stability that big companies need. It's the safe, predictable, and powerful choice.</p>
-
-<p>On the other side are the "Performance-First" challengers like Qwik and SolidJS. They offer objectively mind-blowing performance by rethinking architecture from the ground up.</p>
-
-<p>Qwik introduces "resumability," which all but eliminates the hydration step, allowing massive applications to become interactive almost instantly. For an e-commerce site where milliseconds matter, this is a game-changer.</p>
-
-<p>SolidJS uses fine-grained reactivity to achieve performance that rivals vanilla JavaScript, making it perfect for highly interactive dashboards and real-time apps.</p>
-
-<p>Choosing between them is a strategic decision: do you prioritize the stability and vast resources of the ecosystem, or the raw performance that can provide a direct competitive advantage?</p>
-
-<h2>Shift 2: The Dawn of the "Managed Frontend"</h2>
-<p>The second shift is just as profound: the rise of the "Managed Frontend" or "Frontend Cloud." Platforms like Vercel and Netlify have created a new paradigm. They aren't just hosting providers; they are integrated platforms that are deeply aware of the framework you're using.</p>
-
-<p>When I push a Next.js app to Vercel, the platform automatically knows how to build it, deploy API routes as serverless functions, and distribute static pages across a global CDN. It creates preview deployments for every pull request, closing the feedback loop and killing the need for a traditional staging server.</p>
-
-<p>This abstracts away almost all the DevOps complexity. It allows my team and me to focus entirely on what we do best: building great user experiences and delivering business value. It's a massive leap in productivity for the entire industry.</p>
-
-<h2>The Takeaway</h2>
-<p>The frontend world has matured. We've moved from using simple libraries to adopting integrated, opinionated systems that make us more productive and our applications more performant. The "best" framework is the one that best fits your project's unique needs—be it the ecosystem of Next.js, the instant-on speed of Qwik, or the raw power of SolidJS. By understanding these shifts, we can make smarter, more strategic decisions that set our projects up for success.</p>
-
-<h3>Resources for Further Reading:</h3>
-
-<h4>Frameworks & Meta-Frameworks:</h4>
-<ul>
-<li><a href="https://nextjs.org" target="_blank" rel="noopener noreferrer">Next.js (React)</a></li>
-<li><a href="https://nuxt.com" target="_blank" rel="noopener noreferrer">Nuxt (Vue)</a></li>
-<li><a href="https://kit.svelte.dev" target="_blank" rel="noopener noreferrer">SvelteKit (Svelte)</a></li>
-<li><a href="https://qwik.builder.io" target="_blank" rel="noopener noreferrer">Qwik</a></li>
-<li><a href="https://start.solidjs.com" target="_blank" rel="noopener noreferrer">SolidStart (SolidJS)</a></li>
-<li><a href="https://angular.io" target="_blank" rel="noopener noreferrer">Angular</a></li>
-</ul>
-
-<h4>Build Tools:</h4>
-<ul>
-<li><a href="https://vitejs.dev" target="_blank" rel="noopener noreferrer">Vite</a></li>
-<li><a href="https://turbo.build/pack" target="_blank" rel="noopener noreferrer">Turbopack</a></li>
-</ul>
-
-<h4>Styling & UI:</h4>
-<ul>
-<li><a href="https://tailwindcss.com" target="_blank" rel="noopener noreferrer">Tailwind CSS</a></li>
-<li><a href="https://ui.shadcn.com" target="_blank" rel="noopener noreferrer">shadcn/ui</a></li>
-</ul>
-
-<h4>Deployment Platforms (Managed Frontend):</h4>
-<ul>
-<li><a href="https://vercel.com" target="_blank" rel="noopener noreferrer">Vercel</a></li>
-<li><a href="https://netlify.com" target="_blank" rel="noopener noreferrer">Netlify</a></li>
-</ul>"""
-
-    existing_post.content = updated_content
-    existing_post.featured_image = "https://hosting.photobucket.com/ffe76a37-34ae-4a9f-949c-780379ff74c1/e4e81bd3-3ea4-4b1e-9d8e-59560dedd1c6.jpeg?width=960&height=720&fit=bounds"
-    existing_post.updated_at = datetime.utcnow()
-
-    try:
-        db.session.commit()
-        flash("Frontend blog post updated with image successfully!", "success")
+        result = import_content()
+        flash(
+            f"Blog content imported: {len(result['created'])} created, "
+            f"{len(result['updated'])} updated, {len(result['unchanged'])} unchanged.",
+            "success",
+        )
+    except ContentError as e:
+        logging.error(f"Invalid blog content file: {e}")
+        flash(f"Content error: {e}", "error")
     except SQLAlchemyError as e:
-        db.session.rollback()
-        logging.error(f"Database error updating frontend blog post: {e}")
-        flash("Database error updating blog post. Please try again.", "error")
-    except Exception as e:
-        db.session.rollback()
-        logging.error(f"Unexpected error updating frontend blog post: {e}")
-        flash("Unexpected error updating blog post. Please try again.", "error")
+        logging.error(f"Database error importing blog content: {e}")
+        flash("Database error importing blog content. Please try again.", "error")
 
-    return redirect(url_for("blog"))
+    return redirect(url_for("admin_console"))
 
 
 @app.route("/robots.txt")
@@ -1317,14 +1178,20 @@ Disallow: /
     return response
 
 
-@app.route("/sitemap.xml")
-def sitemap():
+@app.route("/web-design/<city>")
+def web_design_city(city):
+    """Local landing page served from the pre-rendered page cache"""
+    html = get_city_page(city)
+    if html is None:
+        abort(404)
+    return personalise_page(html)
+
+
+@single_flight(cross_process=True)
+def render_sitemap(base_url):
     """Generate comprehensive XML sitemap for enhanced SEO and search engine crawling"""
     from datetime import datetime, timedelta
 
-    # Use request URL to get the actual domain (supports both dev and production)
-    base_url = request.url_root.rstrip("/")
-
     # Static pages with optimized priorities and change frequencies for better crawling
     static_pages = [
         # High priority pages - main business pages
@@ -1424,6 +1291,9 @@ def sitemap():
         },
     ]
 
+    # Local landing pages generated from content/locations.json
+    static_pages.extend(sitemap_pages())
+
     try:
         # Get all published blog posts with error handling
         blog_posts =(
@@ -1478,6 +1348,20 @@ def sitemap():
         sitemap_xml += "  </url>\n"
 
     sitemap_xml += "</urlset>"
+    return sitemap_xml
+
+
+@app.route("/sitemap.xml")
+def sitemap():
+    """XML sitemap, rebuilt when a blog post changes or after an hour"""
+    # The canonical site URL, so a spoofed Host can never reach the shared cache
+    base_url = app.config["SITE_URL"]
+    sitemap_xml = cache.get_or_set(
+        "sitemap",
+        lambda: render_sitemap(base_url),
+        ttl=3600,
+        tags=[BlogPost.__tablename__],
+    )
 
     # Create response with proper headers for search engines
     response = make_response(sitemap_xml)
@@ -1487,12 +1371,28 @@ def sitemap():
 
 
 @app.route("/download-sitemap")
+@use_read_replica
 def download_sitemap():
     """Download XML sitemap as a file for local use or SEO tools"""
     from datetime import datetime
 
-    # Use request URL to get the actual domain (supports both dev and production)
-    base_url = request.url_root.rstrip("/")
+    base_url = app.config["SITE_URL"]
+    sitemap_xml = render_download_sitemap(base_url)
+
+    # Create downloadable response with proper headers
+    response = make_response(sitemap_xml)
+    response.headers["Content-Type"] = "application/xml; charset=utf-8"
+    response.headers["Content-Disposition"] = (
+        f'attachment; filename=the-grey-canvas-sitemap-{datetime.now().strftime("%Y%m%d")}.xml'
+    )
+    response.headers["Cache-Control"] = "no-cache"  # Don't cache downloads
+    return response
+
+
+@single_flight()
+def render_download_sitemap(base_url):
+    """XML sitemap for download, with every static page listed"""
+    from datetime import datetime
 
     # Static pages with optimized priorities and change frequencies
     static_pages = [
@@ -1593,6 +1493,9 @@ def download_sitemap():
         },
     ]
 
+    # Local landing pages generated from content/locations.json
+    static_pages.extend(sitemap_pages())
+
     try:
         # Get all published blog posts with error handling
         blog_posts = (
@@ -1647,23 +1550,31 @@ def download_sitemap():
         sitemap_xml += "  </url>\n"
 
     sitemap_xml += "</urlset>"
-
-    # Create downloadable response with proper headers
-    response = make_response(sitemap_xml)
-    response.headers["Content-Type"] = "application/xml; charset=utf-8"
-    response.headers["Content-Disposition"] = (
-        f'attachment; filename=the-grey-canvas-sitemap-{datetime.now().strftime("%Y%m%d")}.xml'
-    )
-    response.headers["Cache-Control"] = "no-cache"  # Don't cache downloads
-    return response
+    return sitemap_xml
 
 
 @app.route("/admin/export-data")
 @require_login
+@use_read_replica
 def export_data():
     """Export all data as XML"""
     from datetime import datetime
 
+    response = make_response(render_data_export())
+    response.headers["Content-Type"] = "application/xml"
+    response.headers["Content-Disposition"] = (
+        f'attachment; filename=grey_canvas_data_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xml'
+    )
+    return response
+
+
+# The export holds PII, so other workers wait their turn rather than read it
+# back from disk
+@single_flight(cross_process=True, handoff=False)
+def render_data_export():
+    """Every submission and blog post as one XML document"""
+    from datetime import datetime
+
     # Get all data from database
     contact_submissions = ContactSubmission.query.all()
     intake_submissions = IntakeSubmission.query.all()
@@ -1732,13 +1643,7 @@ def export_data():
     xml_data += "  </blog_posts>\n"
 
     xml_data += "</grey_canvas_data>"
-
-    response = make_response(xml_data)
-    response.headers["Content-Type"] = "application/xml"
-    response.headers["Content-Disposition"] = (
-        f'attachment; filename=grey_canvas_data_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xml'
-    )
-    return response
+    return xml_data
 
 
 @app.route("/admin/backup")
@@ -1867,12 +1772,67 @@ def backup_status():
     return jsonify(status)
 
 
+@app.route("/admin/metrics")
+@require_login
+def admin_metrics():
+    """Operational counters for this worker as JSON"""
+    return jsonify(
+        {
+            "form_rate_limit": get_rate_limit_metrics(),
+            "form_idempotency": {"replays": submission_keys.replays},
+            "submission_queue": submission_queue.metrics(),
+            "db_pool": get_pool_metrics(db.engine),
+            "read_replica": get_replica_status(),
+            "cache": cache.metrics(),
+            "fragment_cache": fragments.metrics(),
+            "single_flight": flights.metrics(),
+        }
+    )
+
+
+def newsletter_messages(email):
+    """Welcome email and admin notification for a new subscriber, if mail is set up"""
+    if not app.config.get("MAIL_DEFAULT_SENDER"):
+        return []
+    msg = Message(
+        subject="Welcome to The Grey Canvas Newsletter!",
+        recipients=[email],
+        body=f"""
+        Welcome to The Grey Canvas Newsletter!
+
+        Thank you for subscribing to my newsletter. You'll receive:
+        - Web design tips and trends
+        - Small business digital marketing insights
+        - Latest projects and case studies
+        - Special offers and announcements
+
+        I promise no spam - just pixels, stories, and the occasional existential crisis!
+
+        Best regards,
+        Krysta McAlister
+        The Grey Canvas Co.
+        """,
+    )
+    # Send notification to admin
+    admin_msg = Message(
+        subject="New Newsletter Subscription",
+        recipients=[app.config["MAIL_DEFAULT_SENDER"]],
+        body=f"New newsletter subscription from: {email}",
+    )
+    return [msg, admin_msg]
+
+
 @app.route("/newsletter/subscribe", methods=["POST"])
 def newsletter_subscribe():
     """Handle newsletter subscription from footer form"""
     form = NewsletterForm()
 
     if form.validate_on_submit():
+        wait = charge_submission("newsletter", form.email.data)
+        if wait:
+            # The footer form has no page of its own; show it on the home page
+            flash(RATE_LIMIT_MESSAGE, "error")
+            return too_many_submissions(render_template("index.html"), wait)
         try:
             # Check if email already exists
             existing_subscription = NewsletterSubscription.query.filter_by(
@@ -1898,34 +1858,8 @@ def newsletter_subscribe():
                 db.session.commit()
 
                 # Send welcome email if configured
-                if app.config.get("MAIL_DEFAULT_SENDER"):
-                    msg = Message(
-                        subject="Welcome to The Grey Canvas Newsletter!",
-                        recipients=[form.email.data] if form.email.data else [],
-                        body=f"""
-                        Welcome to The Grey Canvas Newsletter!
-
-                        Thank you for subscribing to my newsletter. You'll receive:
-                        - Web design tips and trends
-                        - Small business digital marketing insights
-                        - Latest projects and case studies
-                        - Special offers and announcements
-
-                        I promise no spam - just pixels, stories, and the occasional existential crisis!
-
-                        Best regards,
-                        Krysta McAlister
-                        The Grey Canvas Co.
-                        """,
-                    )
-                    # Send notification to admin
-                    admin_msg = Message(
-                        subject="New Newsletter Subscription",
-                        recipients=[app.config["MAIL_DEFAULT_SENDER"]],
-                        body=f"New newsletter subscription from: {form.email.data}",
-                    )
-                    mail.send(msg)
-                    mail.send(admin_msg)
+                for message in newsletter_messages(form.email.data):
+                    mail.send(message)
 
                 flash(
                     "Thank you for subscribing! Check your email for a welcome message.",
@@ -1935,6 +1869,24 @@ def newsletter_subscribe():
         except IntegrityError:
             db.session.rollback()
             flash("You are already subscribed to our newsletter!", "info")
+        except OperationalError as e:
+            db.session.rollback()
+            subscription = NewsletterSubscription(email=form.email.data)
+            if spool_during_outage(
+                "newsletter",
+                subscription,
+                messages=newsletter_messages(form.email.data),
+            ):
+                flash(
+                    "Thank you for subscribing! Check your email for a welcome message.",
+                    "success",
+                )
+            else:
+                logging.error(f"Database error saving newsletter subscription: {e}")
+                flash(
+                    "Sorry, there was an error subscribing you to our newsletter. Please try again.",
+                    "error",
+                )
         except SQLAlchemyError as e:
             db.session.rollback()
             logging.error(f"Database error saving newsletter subscription: {e}")
@@ -0,0 +1,241 @@
+"""
+Frozen schema for migration 1 (baseline)
+A copy of the tables as models.py declared them when the app moved to
+versioned migrations. The baseline migration creates these rather than the
+live models, so it keeps doing the same thing however the models change
+later; later schema changes are migrations of their own.
+
+Never edit these definitions.
+"""
+
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    UniqueConstraint,
+)
+
+metadata = MetaData()
+
+Table(
+    "admin_users",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("username", String(80), nullable=False, unique=True),
+    Column("email", String(120), nullable=False, unique=True),
+    Column("password_hash", String(256), nullable=False),
+    Column("custom_login_url", String(200), nullable=False, unique=True),
+    Column("active_status", Boolean),
+    Column("login_attempts", Integer),
+    Column("last_login", DateTime),
+    Column("locked_until", DateTime),
+    Column("password_updated_at", DateTime),
+    Column("require_password_change", Boolean),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+)
+
+Table(
+    "blog_post",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("title", String(200), nullable=False),
+    Column("slug", String(200), nullable=False, unique=True),
+    Column("content", Text, nullable=False),
+    Column("excerpt", Text),
+    Column("author", String(100), nullable=False),
+    Column("published", Boolean, nullable=False),
+    Column("featured_image", String(500)),
+    Column("tags", String(500)),
+    Column("meta_description", String(160)),
+    Column("created_at", DateTime, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+    Column("rendered_content", Text),
+    Column("table_of_contents", Text),
+    Column("search_text", Text),
+    Column("word_count", Integer),
+    Column("reading_time_minutes", Integer),
+    Index("idx_blog_created_at", "created_at"),
+    Index("idx_blog_published", "published"),
+    Index("idx_blog_slug", "slug"),
+)
+
+Table(
+    "contact_submission",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("email", String(120), nullable=False),
+    Column("phone", String(20)),
+    Column("subject", String(200), nullable=False),
+    Column("message", Text, nullable=False),
+    Column("submitted_at", DateTime, nullable=False),
+    Column("spam_score", Float),
+    Column("spam_status", String(20)),
+    Index("idx_contact_email", "email"),
+    Index("idx_contact_submitted_at", "submitted_at"),
+)
+
+Table(
+    "form_submission_key",
+    metadata,
+    Column("key", String(64), primary_key=True),
+    Column("form", String(20), nullable=False),
+    Column("created_at", Float, nullable=False),
+    Index("idx_form_submission_key_created_at", "created_at"),
+)
+
+Table(
+    "intake_submission",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("business_name", String(100), nullable=False),
+    Column("contact_name", String(100), nullable=False),
+    Column("email", String(120), nullable=False),
+    Column("phone", String(20)),
+    Column("website_type", String(50), nullable=False),
+    Column("timeline", String(50), nullable=False),
+    Column("budget", String(50), nullable=False),
+    Column("project_description", Text, nullable=False),
+    Column("additional_notes", Text),
+    Column("submitted_at", DateTime, nullable=False),
+    Column("spam_score", Float),
+    Column("spam_status", String(20)),
+    Index("idx_intake_business_name", "business_name"),
+    Index("idx_intake_email", "email"),
+    Index("idx_intake_submitted_at", "submitted_at"),
+)
+
+Table(
+    "login_throttle_bucket",
+    metadata,
+    Column("key", String(200), primary_key=True),
+    Column("tokens", Float, nullable=False),
+    Column("updated_at", Float, nullable=False),
+    Index("idx_login_throttle_updated_at", "updated_at"),
+)
+
+Table(
+    "newsletter_subscription",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("email", String(120), nullable=False, unique=True),
+    Column("subscribed_at", DateTime, nullable=False),
+    Column("is_active", Boolean, nullable=False),
+    Index("idx_newsletter_active", "is_active"),
+    Index("idx_newsletter_email", "email"),
+)
+
+Table(
+    "spam_token_count",
+    metadata,
+    Column("token", String(64), primary_key=True),
+    Column("spam_count", Integer, nullable=False),
+    Column("ham_count", Integer, nullable=False),
+)
+
+Table(
+    "users",
+    metadata,
+    Column("id", String(100), primary_key=True),
+    Column("email", String(120), unique=True),
+    Column("first_name", String(50)),
+    Column("last_name", String(50)),
+    Column("profile_image_url", String(500)),
+    Column("created_at", DateTime, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+    Index("idx_user_created_at", "created_at"),
+    Index("idx_user_email", "email"),
+)
+
+Table(
+    "blog_post_view_count",
+    metadata,
+    Column(
+        "post_id",
+        Integer,
+        ForeignKey("blog_post.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column("view_count", BigInteger, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+    Index("idx_blog_view_count", "view_count"),
+)
+
+Table(
+    "flask_dance_oauth",
+    metadata,
+    Column(
+        "user_id",
+        String(100),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    ),
+    Column("browser_session_key", String(255), nullable=False),
+    Column("id", Integer, primary_key=True),
+    Column("provider", String(50), nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Column("token", JSON, nullable=False),
+    UniqueConstraint(
+        "user_id",
+        "browser_session_key",
+        "provider",
+        name="uq_user_browser_session_key_provider",
+    ),
+    Index("idx_oauth_provider", "provider"),
+    Index("idx_oauth_user_id", "user_id"),
+)
+
+Table(
+    "project",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("client_name", String(100), nullable=False),
+    Column("project_name", String(200), nullable=False),
+    Column("project_type", String(50), nullable=False),
+    Column("status", String(50), nullable=False),
+    Column("budget", String(50)),
+    Column("timeline", String(50)),
+    Column("description", Text),
+    Column("client_email", String(120), nullable=False),
+    Column("client_phone", String(20)),
+    Column("inquiry_date", DateTime),
+    Column("start_date", DateTime),
+    Column("expected_completion", DateTime),
+    Column("actual_completion", DateTime),
+    Column("progress_percentage", Integer),
+    Column("current_phase", String(100)),
+    Column("next_milestone", String(200)),
+    Column("website_url", String(500)),
+    Column("notes", Text),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+    Column("intake_submission_id", Integer, ForeignKey("intake_submission.id")),
+)
+
+Table(
+    "project_timeline_event",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("project_id", Integer, ForeignKey("project.id"), nullable=False),
+    Column("event_type", String(50), nullable=False),
+    Column("title", String(200), nullable=False),
+    Column("description", Text),
+    Column("event_date", DateTime),
+    Column("created_by", String(100)),
+    Column("old_status", String(50)),
+    Column("new_status", String(50)),
+    Column("file_url", String(500)),
+    Column("is_milestone", Boolean),
+    Column("created_at", DateTime),
+)
@@ -0,0 +1,118 @@
+"""
+Idempotent schema operations used by the versioned migrations in migrations.py
+Each helper checks what already exists first, so a migration can be re-run
+safely after a partial failure and the baseline can adopt databases created
+by the old db.create_all() boot path.
+"""
+
+import logging
+
+from sqlalchemy import inspect, text
+
+logger = logging.getLogger(__name__)
+
+
+def add_missing_columns(db, model):
+    """
+    Add nullable columns declared on the model but missing from its table
+
+    Args:
+        db: Flask-SQLAlchemy instance
+        model: Declarative model class, or a Table
+
+    Returns:
+        list: Names of the columns that were added
+    """
+    table = getattr(model, "__table__", model)
+    inspector = inspect(db.engine)
+    if not inspector.has_table(table.name):
+        return []
+
+    existing = {column["name"] for column in inspector.get_columns(table.name)}
+    # Several workers may boot at once; let Postgres skip columns another added
+    if_not_exists = "IF NOT EXISTS " if db.engine.dialect.name == "postgresql" else ""
+    added = []
+    with db.engine.begin() as connection:
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=db.engine.dialect)
+            connection.execute(
+                text(
+                    f"ALTER TABLE {table.name} ADD COLUMN {if_not_exists}"
+                    f'"{column.name}" {column_type}'
+                )
+            )
+            added.append(column.name)
+
+    if added:
+        logger.info(f"Added columns to {table.name}: {', '.join(added)}")
+    return added
+
+
+def create_index(db, name, table_name, columns):
+    """
+    Create an index if it does not exist, without blocking writes on Postgres
+
+    Postgres builds it with CREATE INDEX CONCURRENTLY, which cannot run in a
+    transaction, so the statement runs on an autocommit connection. A build
+    that failed part way leaves an invalid index behind; that is dropped and
+    rebuilt.
+
+    Returns:
+        bool: True if the index was created
+    """
+    engine = db.engine
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        if engine.dialect.name == "postgresql":
+            valid = connection.execute(
+                text(
+                    "SELECT i.indisvalid FROM pg_index i "
+                    "JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"
+                ),
+                {"name": name},
+            ).scalar()
+            if valid:
+                return False
+            if valid is not None:
+                logger.warning(f"Rebuilding invalid index {name}")
+                connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+            connection.execute(
+                text(
+                    f"CREATE INDEX CONCURRENTLY {name} ON {table_name} ({column_list})"
+                )
+            )
+        else:
+            if name in {i["name"] for i in inspect(connection).get_indexes(table_name)}:
+                return False
+            connection.execute(
+                text(f"CREATE INDEX {name} ON {table_name} ({column_list})")
+            )
+
+    logger.info(f"Created index {name} on {table_name} ({', '.join(columns)})")
+    return True
+
+
+def drop_index(db, name):
+    """Drop an index if it exists, without blocking reads and writes on Postgres"""
+    concurrently = "CONCURRENTLY " if db.engine.dialect.name == "postgresql" else ""
+    with db.engine.connect().execution_options(
+        isolation_level="AUTOCOMMIT"
+    ) as connection:
+        connection.execute(text(f"DROP INDEX {concurrently}IF EXISTS {name}"))
+    logger.info(f"Dropped index {name} if it existed")
+
+
+def backfill_blog_metadata(db):
+    """Enrich blog posts written before write-time enrichment existed"""
+    from models import BlogPost
+    from post_enrichment import enrich_post
+
+    posts = BlogPost.query.filter(BlogPost.rendered_content.is_(None)).all()
+    for post in posts:
+        enrich_post(post)
+    if posts:
+        db.session.commit()
+        logger.info(f"Backfilled metadata for {len(posts)} blog posts")
+    return len(posts)
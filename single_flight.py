@@ -0,0 +1,188 @@
+"""
+Single-flight coalescing for expensive computations
+When several threads ask for the same result at once, the first one computes
+it and the rest wait and share its return value (or its exception), so a
+crawler burst on a cold cache costs one computation instead of one per
+thread. Calls are identical when the function and its arguments match.
+
+With cross_process=True the computing thread also holds a per-host file lock
+under CACHE_DIR, so workers on the host take turns. A worker that waited on
+the lock reuses the result the holder just handed off instead of computing
+it again; pass handoff=False for results that must not touch the disk (data
+exports) and the lock only serialises the work.
+
+Shared results go to every waiter, so return plain data or detached rows and
+treat them as read-only.
+"""
+
+import fcntl
+import logging
+import os
+import pickle
+import threading
+import time
+from functools import wraps
+from hashlib import sha256
+from pathlib import Path
+
+from app_cache import CACHE_DIR, MISSING
+
+logger = logging.getLogger(__name__)
+
+FLIGHT_DIR = Path(CACHE_DIR) / "flights"
+# Past this a waiting worker stops queueing on the lock and computes anyway
+LOCK_TIMEOUT_SECONDS = float(os.environ.get("SINGLE_FLIGHT_LOCK_TIMEOUT", "60"))
+LOCK_POLL_SECONDS = 0.05
+
+
+class _Call:
+    """One in-flight computation and the threads waiting on it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces identical concurrent calls within this worker"""
+
+    def __init__(self, directory=FLIGHT_DIR):
+        self.directory = Path(directory)
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.followers = 0
+        self.handoffs = 0
+        self.lock_timeouts = 0
+
+    def do(self, key, function, cross_process=False, handoff=True):
+        """Result of function(), shared with any identical call in flight"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.followers += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            if cross_process:
+                call.result = self._locked(key, function, handoff)
+            else:
+                call.result = function()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _path(self, key, suffix):
+        return self.directory / f"{sha256(key.encode()).hexdigest()}{suffix}"
+
+    def _locked(self, key, function, handoff):
+        """Run function() under the host-wide lock for key"""
+        waiting_since = time.time()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self._path(key, ".lock"), "a") as lock_file:
+            locked = self._acquire(lock_file, key)
+            try:
+                if locked and handoff:
+                    result = self._read_handoff(key, waiting_since)
+                    if result is not MISSING:
+                        self.handoffs += 1
+                        return result
+                result = function()
+                if locked and handoff:
+                    self._write_handoff(key, result)
+                return result
+            finally:
+                if locked:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _acquire(self, lock_file, key):
+        deadline = time.monotonic() + LOCK_TIMEOUT_SECONDS
+        while True:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    self.lock_timeouts += 1
+                    logger.warning(
+                        f"Single-flight lock for {key} still held after "
+                        f"{LOCK_TIMEOUT_SECONDS:.0f}s, computing without it"
+                    )
+                    return False
+                time.sleep(LOCK_POLL_SECONDS)
+
+    def _read_handoff(self, key, waiting_since):
+        """The last holder's result if it finished after we started waiting"""
+        try:
+            with open(self._path(key, ".pkl"), "rb") as handle:
+                finished_at, result = pickle.load(handle)
+        except FileNotFoundError:
+            return MISSING
+        except (OSError, pickle.PickleError, EOFError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable single-flight handoff: {e}")
+            return MISSING
+        return result if finished_at >= waiting_since else MISSING
+
+    def _write_handoff(self, key, result):
+        path = self._path(key, ".pkl")
+        temporary = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(temporary, "wb") as handle:
+                pickle.dump((time.time(), result), handle)
+            os.replace(temporary, path)
+        except (OSError, pickle.PickleError, TypeError, AttributeError) as e:
+            temporary.unlink(missing_ok=True)
+            logger.warning(f"Could not hand off single-flight result for {key}: {e}")
+
+    def metrics(self):
+        with self._lock:
+            in_flight = len(self._calls)
+        return {
+            "in_flight": in_flight,
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "handoffs": self.handoffs,
+            "lock_timeouts": self.lock_timeouts,
+        }
+
+
+flights = SingleFlight()
+
+
+def single_flight(cross_process=False, handoff=True):
+    """
+    Decorator coalescing concurrent calls with the same arguments
+
+    Args:
+        cross_process: Also take turns with the other workers on this host
+        handoff: Let workers that waited on the lock reuse the result
+    """
+
+    def decorator(function):
+        name = f"{function.__module__}.{function.__qualname__}"
+
+        @wraps(function)
+        def wrapped(*args, **kwargs):
+            key = f"{name}:{args!r}:{sorted(kwargs.items())!r}"
+            return flights.do(
+                key, lambda: function(*args, **kwargs), cross_process, handoff
+            )
+
+        return wrapped
+
+    return decorator
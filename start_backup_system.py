@@ -10,6 +10,8 @@ import sys
 from threading import Thread
 from pathlib import Path
 
+os.environ.setdefault("DB_POOL_PROFILE", "background")
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -0,0 +1,621 @@
+"""
+Write-behind group commit for contact and intake submissions
+When FORM_WRITE_BEHIND is enabled, a validated submission is appended to a
+local spool and the visitor is answered as soon as the spool is on disk.
+A background thread gathers whatever arrived in the last few milliseconds
+and fsyncs it as one spool file; a second thread saves every spooled batch
+in a single transaction, so a burst of posts costs one database commit
+instead of one each.
+
+The same spool is the fallback when the database is unreachable: contact,
+intake and newsletter posts that hit an OperationalError are spooled instead
+of lost, and the commit thread drains them once the database is back.
+
+Spool files are deleted only after their rows are committed, each file in
+its own transaction. If a file fails for any reason other than the database
+being unreachable, its records are retried one at a time and any that still
+fail are moved to a dead-letter file, so one bad record never holds up the
+rest. Files left by a worker that died are adopted by another worker, and
+idempotency keys stop a replayed batch from saving a submission twice.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from flask_mail import Message
+from sqlalchemy import DateTime, inspect
+from sqlalchemy.exc import IntegrityError, InterfaceError, OperationalError
+
+from app import app, db, mail
+from form_idempotency import submission_keys
+from models import (
+    ContactSubmission,
+    FormSubmissionKey,
+    IntakeSubmission,
+    NewsletterSubscription,
+)
+
+logger = logging.getLogger(__name__)
+
+WRITE_BEHIND = os.environ.get("FORM_WRITE_BEHIND", "").lower() in ("1", "true", "yes")
+SPOOL_DIR = Path(
+    os.environ.get(
+        "FORM_SPOOL_DIR", Path(__file__).resolve().parent / "spool" / "submissions"
+    )
+)
+# How long the flusher waits after the first item to gather a batch
+GROUP_COMMIT_MS = float(os.environ.get("FORM_WRITE_BEHIND_INTERVAL_MS", "5"))
+MAX_BATCH = int(os.environ.get("FORM_WRITE_BEHIND_MAX_BATCH", "200"))
+# A request waits this long for the spool before saving synchronously instead
+ACK_TIMEOUT = 2.0
+RETRY_SECONDS = 5.0
+DEAD_LETTER_DIR = "dead-letter"
+
+# Errors meaning the database is unreachable; the spool waits them out
+UNAVAILABLE = (OperationalError, InterfaceError)
+
+SUBMISSION_MODELS = {
+    "contact": ContactSubmission,
+    "intake": IntakeSubmission,
+    "newsletter": NewsletterSubscription,
+}
+
+
+def encode_submission(submission):
+    """Column values of an unsaved submission as JSON-safe data"""
+    values = {}
+    for column in inspect(type(submission)).columns:
+        if column.primary_key:
+            continue
+        value = getattr(submission, column.key)
+        if value is None and column.default is not None:
+            # Fix defaults such as submitted_at at acknowledgement time
+            value = column.default.arg(None) if column.default.is_callable else None
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        if value is not None:
+            values[column.key] = str(value) if hasattr(value, "__html__") else value
+    return values
+
+
+def decode_submission(kind, values):
+    """Rebuild an unsaved submission from encode_submission() output"""
+    model = SUBMISSION_MODELS[kind]
+    columns = inspect(model).columns
+    values = dict(values)
+    for key, value in values.items():
+        if isinstance(columns[key].type, DateTime) and isinstance(value, str):
+            values[key] = datetime.fromisoformat(value)
+    return model(**values)
+
+
+def encode_messages(messages):
+    return [
+        {
+            "subject": message.subject,
+            "recipients": list(message.recipients),
+            "body": message.body,
+        }
+        for message in messages
+        if message is not None
+    ]
+
+
+def spool_record(kind, submission, submission_key=None, messages=()):
+    return {
+        "kind": kind,
+        "key": submission_key,
+        "values": encode_submission(submission),
+        "mail": encode_messages(messages),
+    }
+
+
+class SubmissionSpool:
+    """Directory of fsynced NDJSON files, one per batch"""
+
+    def __init__(self, directory=SPOOL_DIR):
+        self.directory = Path(directory)
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def write(self, records, directory=None):
+        """Durably write records as a new spool file and return its path"""
+        directory = self.directory if directory is None else directory
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._sequence += 1
+            name = f"{_writer_prefix()}-{time.time_ns()}-{self._sequence}"
+        tmp_path = directory / f"{name}.tmp"
+        path = directory / f"{name}.ndjson"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            for record in records:
+                handle.write(json.dumps(record) + "\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, path)
+        # Make the rename itself durable
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+        return path
+
+    def dead_letter(self, records):
+        """Set aside records that can never be saved, for a person to look at"""
+        return self.write(records, self.directory / DEAD_LETTER_DIR)
+
+    def dead_letter_files(self):
+        directory = self.directory / DEAD_LETTER_DIR
+        if not directory.exists():
+            return []
+        return sorted(directory.glob("*.ndjson"))
+
+    def read(self, path):
+        records = []
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    logger.error(f"Skipping corrupt line in spool file {path.name}")
+        return records
+
+    def remove(self, path):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    def files(self):
+        if not self.directory.exists():
+            return []
+        return sorted(self.directory.glob("*.ndjson"))
+
+    def depth(self):
+        """Records waiting in the spool across every worker on this instance"""
+        count = 0
+        for path in self.files():
+            try:
+                with open(path, "rb") as handle:
+                    count += sum(1 for _ in handle)
+            except FileNotFoundError:
+                pass
+        return count
+
+    def adopt(self, path):
+        """Claim another worker's file by renaming it; None if someone else did"""
+        sequence = "-".join(path.name.split("-")[-2:])
+        owned = path.with_name(f"{_writer_prefix()}-{sequence}")
+        try:
+            os.rename(path, owned)
+        except FileNotFoundError:
+            return None
+        return owned
+
+    @staticmethod
+    def _writer(path):
+        """(pid, token) of the process that wrote a spool file"""
+        fields = path.name.split("-")
+        # Files from before writers were tagged with a process token
+        token = fields[1] if len(fields) == 4 else None
+        return int(fields[0]), token
+
+    def orphans(self):
+        """Spool files whose writer is gone and that nobody is committing"""
+        orphaned = []
+        for path in self.files():
+            pid, token = self._writer(path)
+            if pid == os.getpid() or not _process_alive(pid, token):
+                orphaned.append(path)
+        return orphaned
+
+    def remove_abandoned(self):
+        """
+        Delete half-written .tmp files whose writer died before renaming them
+
+        Nothing in them was acknowledged yet, and records being rewritten or
+        dead-lettered are still in their original spool file, so no
+        submission is lost.
+
+        Returns:
+            int: Files removed
+        """
+        removed = 0
+        for directory in (self.directory, self.directory / DEAD_LETTER_DIR):
+            if not directory.exists():
+                continue
+            for path in directory.glob("*.tmp"):
+                pid, token = self._writer(path)
+                if pid != os.getpid() and not _process_alive(pid, token):
+                    logger.warning(f"Removing abandoned spool file {path.name}")
+                    self.remove(path)
+                    removed += 1
+        return removed
+
+
+def _process_token(pid):
+    """
+    Boot id and start time of a process, or None if it is not running
+
+    A PID alone is reused after a restart, often by an unrelated process in
+    a fresh container; the start time and boot id tell the two apart.
+    """
+    try:
+        with open(f"/proc/{pid}/stat", encoding="utf-8") as handle:
+            # The command name may hold spaces; start time is field 22
+            start_time = handle.read().rsplit(")", 1)[1].split()[19]
+        with open("/proc/sys/kernel/random/boot_id", encoding="utf-8") as handle:
+            boot_id = handle.read().strip().replace("-", "")[:12]
+    except (OSError, IndexError):
+        return None
+    return f"{boot_id}.{start_time}"
+
+
+_own_tokens = {}
+
+
+def _writer_prefix():
+    """pid-token prefix naming this process in spool file names"""
+    pid = os.getpid()
+    if pid not in _own_tokens:
+        # "0" where /proc is unavailable, which falls back to a PID check
+        _own_tokens[pid] = _process_token(pid) or "0"
+    return f"{pid}-{_own_tokens[pid]}"
+
+
+def _process_alive(pid, token=None):
+    """Whether the process that wrote a spool file is still running"""
+    if token not in (None, "0") and os.path.exists("/proc/self/stat"):
+        return _process_token(pid) == token
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class _Pending:
+    __slots__ = ("record", "done", "ok")
+
+    def __init__(self, record):
+        self.record = record
+        self.done = threading.Event()
+        self.ok = False
+
+
+class SubmissionQueue:
+    """In-process queue flushed to the spool and database in group commits"""
+
+    def __init__(self, spool, enabled=WRITE_BEHIND, interval_ms=GROUP_COMMIT_MS):
+        self.spool = spool
+        self.enabled = enabled
+        self.interval = interval_ms / 1000.0
+        self._items = []
+        self._uncommitted = []
+        self._cond = threading.Condition()
+        self._spooled = threading.Event()
+        self._threads = []
+        self._stop = threading.Event()
+        self.batches = 0
+        self.committed = 0
+        self.degraded = 0
+        self.dead_lettered = 0
+
+    def enqueue(self, kind, submission, submission_key=None, message=None):
+        """
+        Hand a validated submission to the group committer
+
+        Returns:
+            bool: True once the submission is durably spooled; False if
+            write-behind is off or the spool failed, in which case the caller
+            saves it synchronously
+        """
+        if not self.enabled:
+            return False
+        self.start()
+        entry = _Pending(spool_record(kind, submission, submission_key, [message]))
+        with self._cond:
+            self._items.append(entry)
+            self._cond.notify()
+
+        if not entry.done.wait(ACK_TIMEOUT):
+            with self._cond:
+                if entry in self._items:
+                    self._items.remove(entry)
+                    logger.warning("Submission spool is slow, saving synchronously")
+                    return False
+            # Already being written; the outcome is moments away
+            entry.done.wait()
+        if entry.ok:
+            submission_keys.committed(kind, submission_key)
+        return entry.ok
+
+    def spool_submission(self, kind, submission, submission_key=None, messages=()):
+        """
+        Save a submission to the spool while the database is unavailable
+
+        The record is written and fsynced before returning, and replayed by
+        the commit thread once the database answers again. Emails in
+        `messages` are sent after the replay.
+
+        Returns:
+            bool: True if the submission is safely on disk
+        """
+        self.start()
+        record = spool_record(kind, submission, submission_key, messages)
+        try:
+            path = self.spool.write([record])
+        except OSError as e:
+            logger.error(f"Could not spool {kind} submission: {e}")
+            return False
+        with self._cond:
+            self._uncommitted.append(path)
+        self.degraded += 1
+        submission_keys.committed(kind, submission_key)
+        return True
+
+    def start(self):
+        """Start the spool and commit threads once per worker"""
+        with self._cond:
+            if self._threads:
+                return
+            self._threads = [
+                threading.Thread(target=target, name=name, daemon=True)
+                for target, name in (
+                    (self._spool_loop, "submission-spool"),
+                    (self._commit_loop, "submission-group-commit"),
+                )
+            ]
+            for thread in self._threads:
+                thread.start()
+        atexit.register(self.stop)
+        logger.info(f"Submission spool started - {self.spool.directory}")
+
+    def stop(self):
+        """Spool and commit whatever is queued before the worker exits"""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=ACK_TIMEOUT * 2)
+
+    def _spool_loop(self):
+        """Write queued submissions to the spool in batches and acknowledge them"""
+        while True:
+            with self._cond:
+                if not self._items and not self._stop.is_set():
+                    self._cond.wait()
+                stopping = self._stop.is_set()
+            if not stopping:
+                # Give concurrent requests a moment to join this batch
+                self._stop.wait(self.interval)
+            try:
+                self._flush_queue()
+            except Exception as e:
+                logger.error(f"Submission spool loop error: {e}")
+            if stopping:
+                return
+
+    def _flush_queue(self):
+        while True:
+            with self._cond:
+                batch = self._items[:MAX_BATCH]
+                del self._items[:MAX_BATCH]
+            if not batch:
+                return
+            try:
+                path = self.spool.write([entry.record for entry in batch])
+            except OSError as e:
+                logger.error(f"Could not write submission spool: {e}")
+                path = None
+            for entry in batch:
+                entry.ok = path is not None
+                entry.done.set()
+            if path is not None:
+                with self._cond:
+                    self._uncommitted.append(path)
+                self._spooled.set()
+
+    def _adopt_orphans(self):
+        """Take over files left by a worker that died before committing them"""
+        self.spool.remove_abandoned()
+        for path in self.spool.orphans():
+            with self._cond:
+                if path in self._uncommitted:
+                    continue
+            owned = self.spool.adopt(path)
+            if owned is not None:
+                logger.info(f"Replaying orphaned submission spool {path.name}")
+                with self._cond:
+                    self._uncommitted.append(owned)
+
+    def _commit_loop(self):
+        """Save spooled batches, retrying after database errors"""
+        self._adopt_orphans()
+        while True:
+            if not self._spooled.wait(RETRY_SECONDS):
+                self._adopt_orphans()
+            self._spooled.clear()
+            stopping = self._stop.is_set()
+            with self._cond:
+                paths = list(self._uncommitted)
+            if paths:
+                try:
+                    self.commit_files(paths)
+                except Exception as e:
+                    logger.error(f"Submission group commit loop error: {e}")
+            if stopping:
+                return
+            if self._uncommitted and not self._spooled.is_set():
+                # The database is unavailable; back off before retrying
+                self._stop.wait(RETRY_SECONDS)
+
+    def commit_files(self, paths):
+        """
+        Save each spool file in its own transaction
+
+        Returns:
+            bool: False if the database went away before every file was saved
+        """
+        for path in paths:
+            try:
+                records = self.spool.read(path)
+            except FileNotFoundError:
+                self._forget(path)
+                continue
+            with app.app_context():
+                try:
+                    saved, rejected, pending = self._save(records)
+                except UNAVAILABLE as e:
+                    db.session.rollback()
+                    logger.error(f"Database unavailable for submission commit: {e}")
+                    return False
+            if rejected:
+                self.spool.dead_letter(rejected)
+                self.dead_lettered += len(rejected)
+            if pending:
+                # Keep only the records not yet saved, so none is replayed
+                remaining = self.spool.write(pending)
+                with self._cond:
+                    self._uncommitted.append(remaining)
+            self.spool.remove(path)
+            self._forget(path)
+            self.batches += 1
+            self.committed += len(saved)
+            with app.app_context():
+                for record in saved:
+                    self._send_mail(record)
+            if pending:
+                return False
+        return True
+
+    def _forget(self, path):
+        with self._cond:
+            if path in self._uncommitted:
+                self._uncommitted.remove(path)
+
+    def _save(self, records):
+        """
+        Insert records in one transaction, or one at a time if that fails
+
+        Records already saved are skipped. UNAVAILABLE errors before anything
+        is saved propagate so the whole file is retried later.
+
+        Returns:
+            tuple: (saved, rejected, pending) records; rejected ones can never
+            be saved and carry the error, pending ones were not tried because
+            the database went away part way through
+        """
+        saved_keys = self._saved_keys(records)
+        records = [record for record in records if record.get("key") not in saved_keys]
+        try:
+            for record in records:
+                self._add(record)
+            db.session.commit()
+            return records, [], []
+        except UNAVAILABLE:
+            raise
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(
+                f"Group commit of {len(records)} submissions failed, "
+                f"saving one at a time: {e}"
+            )
+
+        saved, rejected = [], []
+        for index, record in enumerate(records):
+            try:
+                self._add(record)
+                db.session.commit()
+                saved.append(record)
+            except UNAVAILABLE:
+                db.session.rollback()
+                return saved, rejected, records[index:]
+            except Exception as e:
+                db.session.rollback()
+                if isinstance(e, IntegrityError) and self._saved_keys([record]):
+                    # Another worker saved it meanwhile
+                    logger.info(f"Skipped duplicate {record['kind']} submission")
+                    continue
+                logger.error(
+                    f"Moving {record['kind']} submission that cannot be saved "
+                    f"to the dead-letter spool: {e!r}"
+                )
+                rejected.append({**record, "error": repr(e)})
+        return saved, rejected, []
+
+    def _saved_keys(self, records):
+        """Idempotency keys of these records that are already committed"""
+        keys = [record["key"] for record in records if record.get("key")]
+        if not keys:
+            return set()
+        return {
+            key
+            for (key,) in db.session.query(FormSubmissionKey.key).filter(
+                FormSubmissionKey.key.in_(keys)
+            )
+        }
+
+    def _add(self, record):
+        if record["kind"] == "newsletter":
+            email = record["values"]["email"]
+            existing = NewsletterSubscription.query.filter_by(email=email).first()
+            if existing is not None:
+                # Reactivated rather than new, so no welcome email
+                existing.is_active = True
+                record["mail"] = []
+                return
+        submission_keys.add(record["kind"], record.get("key"))
+        db.session.add(decode_submission(record["kind"], record["values"]))
+
+    def _send_mail(self, record):
+        for message in record.get("mail") or []:
+            try:
+                mail.send(Message(**message))
+            except Exception as e:
+                logger.error(f"Error sending {record['kind']} notification: {e}")
+
+    def metrics(self):
+        with self._cond:
+            queued = len(self._items)
+            uncommitted = len(self._uncommitted)
+        return {
+            "enabled": self.enabled,
+            "queued": queued,
+            "uncommitted_files": uncommitted,
+            "spool_depth": self.spool.depth(),
+            "spooled_during_outage": self.degraded,
+            "batches": self.batches,
+            "committed": self.committed,
+            "dead_lettered": self.dead_lettered,
+            "dead_letter_files": len(self.spool.dead_letter_files()),
+        }
+
+
+submission_queue = SubmissionQueue(SubmissionSpool())
+_spool_checked = False
+
+
+@app.before_request
+def replay_spool():
+    """
+    Replay anything spooled before a restart without waiting for the next post
+
+    Checked on a web worker's first request, so importing this module from a
+    CLI or migration never starts the commit threads.
+    """
+    global _spool_checked
+    if _spool_checked:
+        return
+    _spool_checked = True
+    if submission_queue.spool.files():
+        submission_queue.start()
@@ -0,0 +1,723 @@
+#!/usr/bin/env python3
+"""
+Partitioning, archival and PII purge for contact and intake submissions
+On Postgres both tables are range-partitioned by month on submitted_at
+(migration 4), so the admin pages' recent-first queries only touch small hot
+partitions and old months leave the table by detaching a partition rather
+than a large DELETE. Other databases fall back to moving old rows into
+<table>_archive in small batches.
+
+The daily retention job:
+- creates the next PARTITION_MONTHS_AHEAD monthly partitions
+- archives months older than SUBMISSION_HOT_MONTHS, to tables in the
+  "archive" schema (or <table>_archive), or to gzipped NDJSON files in
+  SUBMISSION_ARCHIVE_DIR when that is set
+- redacts names, emails, phone numbers and messages older than
+  SUBMISSION_PII_RETENTION_DAYS, SUBMISSION_PURGE_BATCH rows per transaction,
+  in live and archived tables alike
+
+Usage:
+    python submission_retention.py status
+    python submission_retention.py run
+    python submission_retention.py archive [--to-files DIR]
+    python submission_retention.py purge [--days DAYS]
+"""
+
+import argparse
+import fcntl
+import gzip
+import json
+import logging
+import os
+import re
+import sys
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import inspect, text
+
+from app_cache import CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+SUBMISSION_TABLES = ("contact_submission", "intake_submission")
+HOT_MONTHS = int(os.environ.get("SUBMISSION_HOT_MONTHS", "12"))
+PII_RETENTION_DAYS = int(os.environ.get("SUBMISSION_PII_RETENTION_DAYS", "730"))
+PURGE_BATCH = int(os.environ.get("SUBMISSION_PURGE_BATCH", "500"))
+# Pause between batches so purges and archival moves never hog the database
+BATCH_PAUSE_SECONDS = float(os.environ.get("SUBMISSION_BATCH_PAUSE_MS", "50")) / 1000
+ARCHIVE_DIR = os.environ.get("SUBMISSION_ARCHIVE_DIR")
+PARTITION_MONTHS_AHEAD = int(os.environ.get("PARTITION_MONTHS_AHEAD", "3"))
+ARCHIVE_SCHEMA = "archive"
+# pg_try_advisory_lock key, so only one worker's scheduler runs the job
+RETENTION_LOCK_ID = 72_651_046
+# Other databases are local to the host, so a file lock does the same job
+RETENTION_LOCK_FILE = Path(CACHE_DIR) / "submission_retention.lock"
+
+REDACTED_EMAIL = "redacted@example.invalid"
+# Columns cleared by the purge; the redacted email marks rows already done
+PII_COLUMNS = {
+    "contact_submission": {
+        "name": "Redacted",
+        "email": REDACTED_EMAIL,
+        "phone": None,
+        "message": "[removed]",
+    },
+    "intake_submission": {
+        "contact_name": "Redacted",
+        "email": REDACTED_EMAIL,
+        "phone": None,
+        "additional_notes": None,
+    },
+}
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table, month):
+    return f"{table}_{month:%Y_%m}"
+
+
+def _partition_month(table, name):
+    match = re.fullmatch(rf"{table}_(\d{{4}})_(\d{{2}})", name)
+    return date(int(match[1]), int(match[2]), 1) if match else None
+
+
+def is_partitioned(connection, table):
+    return connection.execute(
+        text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+            "WHERE partrelid = to_regclass(:table))"
+        ),
+        {"table": table},
+    ).scalar()
+
+
+def partitions(connection, table):
+    """Attached monthly partitions of a table, oldest first, as (month, name)"""
+    names = connection.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:table)"
+        ),
+        {"table": table},
+    ).scalars()
+    months = ((_partition_month(table, name), name) for name in names)
+    return sorted((month, name) for month, name in months if month)
+
+
+def _bounds(month):
+    return f"FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+
+
+def partition_table(db, table):
+    """
+    Convert a submission table to monthly range partitions on Postgres
+
+    Rows are copied under an exclusive lock, which is fine at this site's
+    volume; run it from the deploy step, not at boot. Postgres needs the
+    partition key in the primary key, so it becomes (id, submitted_at), and
+    foreign keys into the table are dropped; link_intakes_to_projects()
+    enforces the project link with triggers instead.
+
+    Returns:
+        bool: True if the table was converted
+    """
+    import schema_baseline
+
+    # Frozen so the migration using this does the same whatever the models say
+    frozen_table = schema_baseline.metadata.tables[table]
+    with db.engine.begin() as connection:
+        if db.engine.dialect.name != "postgresql" or is_partitioned(connection, table):
+            return False
+
+        connection.execute(text(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE"))
+        foreign_keys = connection.execute(
+            text(
+                "SELECT conrelid::regclass::text, conname FROM pg_constraint "
+                "WHERE contype = 'f' AND confrelid = to_regclass(:table)"
+            ),
+            {"table": table},
+        ).all()
+        for referencing, constraint in foreign_keys:
+            connection.execute(
+                text(f"ALTER TABLE {referencing} DROP CONSTRAINT {constraint}")
+            )
+
+        sequence = connection.execute(
+            text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": table}
+        ).scalar()
+        oldest = connection.execute(
+            text(f"SELECT min(submitted_at) FROM {table}")
+        ).scalar()
+
+        connection.execute(text(f"ALTER TABLE {table} RENAME TO {table}_unpartitioned"))
+        connection.execute(
+            text(
+                f"CREATE TABLE {table} (LIKE {table}_unpartitioned "
+                "INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+                "PARTITION BY RANGE (submitted_at)"
+            )
+        )
+        if sequence:
+            connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id"))
+
+        this_month = month_start(datetime.utcnow())
+        month = month_start(oldest) if oldest else this_month
+        while month <= add_months(this_month, PARTITION_MONTHS_AHEAD):
+            connection.execute(
+                text(
+                    f"CREATE TABLE {partition_name(table, month)} "
+                    f"PARTITION OF {table} FOR VALUES {_bounds(month)}"
+                )
+            )
+            month = add_months(month, 1)
+        # Catches clock-skewed or far-future rows instead of failing the insert
+        connection.execute(
+            text(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+        )
+
+        connection.execute(
+            text(f"INSERT INTO {table} SELECT * FROM {table}_unpartitioned")
+        )
+        connection.execute(text(f"DROP TABLE {table}_unpartitioned"))
+        connection.execute(
+            text(f"ALTER TABLE {table} ADD PRIMARY KEY (id, submitted_at)")
+        )
+        for index in frozen_table.indexes:
+            columns = ", ".join(column.name for column in index.columns)
+            connection.execute(
+                text(f"CREATE INDEX {index.name} ON {table} ({columns})")
+            )
+
+    logger.info(f"Partitioned {table} by month on submitted_at")
+    return True
+
+
+INTAKE_LINK_TRIGGERS = """
+CREATE OR REPLACE FUNCTION project_intake_exists() RETURNS trigger AS $$
+BEGIN
+    IF NEW.intake_submission_id IS NOT NULL THEN
+        -- Holds off a concurrent delete of the intake until this commits
+        PERFORM 1 FROM intake_submission
+        WHERE id = NEW.intake_submission_id FOR KEY SHARE;
+        IF NOT FOUND THEN
+            RAISE foreign_key_violation USING MESSAGE = format(
+                'intake_submission %s does not exist', NEW.intake_submission_id
+            );
+        END IF;
+    END IF;
+    RETURN NEW;
+END $$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION intake_unreferenced() RETURNS trigger AS $$
+BEGIN
+    -- Rows moved between partitions are deleted and re-inserted
+    IF current_setting('submission_retention.moving', true) = 'on' THEN
+        RETURN OLD;
+    END IF;
+    IF EXISTS (SELECT 1 FROM project WHERE intake_submission_id = OLD.id)
+        AND NOT EXISTS (SELECT 1 FROM intake_submission WHERE id = OLD.id)
+    THEN
+        RAISE foreign_key_violation USING MESSAGE = format(
+            'intake_submission %s is still referenced by a project', OLD.id
+        );
+    END IF;
+    RETURN OLD;
+END $$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS project_intake_exists ON project;
+CREATE TRIGGER project_intake_exists
+    BEFORE INSERT OR UPDATE OF intake_submission_id ON project
+    FOR EACH ROW EXECUTE FUNCTION project_intake_exists();
+
+DROP TRIGGER IF EXISTS intake_unreferenced ON intake_submission;
+CREATE TRIGGER intake_unreferenced
+    AFTER DELETE ON intake_submission
+    FOR EACH ROW EXECUTE FUNCTION intake_unreferenced();
+"""
+
+
+def link_intakes_to_projects(db):
+    """
+    Enforce project.intake_submission_id once intake_submission is partitioned
+
+    A foreign key can't point at the partitioned table's id alone, so
+    triggers stand in for it: a project must name an existing intake, and an
+    intake a project names can't be deleted. Idempotent.
+
+    Returns:
+        bool: True if the triggers were installed
+    """
+    if db.engine.dialect.name != "postgresql":
+        return False
+    with db.engine.begin() as connection:
+        if not is_partitioned(connection, "intake_submission"):
+            return False
+        connection.execute(text(INTAKE_LINK_TRIGGERS))
+    logger.info("Installed the project to intake_submission link triggers")
+    return True
+
+
+def create_partition(connection, table, month):
+    """
+    Add a monthly partition, claiming any of its rows from the default partition
+
+    Postgres refuses a new partition while the default one holds rows in its
+    range, so the partition is built detached, filled from the default
+    partition and then attached.
+    """
+    name = partition_name(table, month)
+    start, end = month, add_months(month, 1)
+    connection.execute(text("SET LOCAL submission_retention.moving = 'on'"))
+    connection.execute(
+        text(
+            f"CREATE TABLE {name} (LIKE {table} "
+            "INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+    )
+    connection.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {table}_default "
+            "WHERE submitted_at >= :start AND submitted_at < :end RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        {"start": start, "end": end},
+    )
+    connection.execute(text("SET LOCAL submission_retention.moving = 'off'"))
+    connection.execute(
+        text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES {_bounds(month)}")
+    )
+    logger.info(f"Created partition {name}")
+
+
+def ensure_partitions(db, months_ahead=PARTITION_MONTHS_AHEAD):
+    """Create any missing partitions from this month to months_ahead"""
+    created = []
+    if db.engine.dialect.name != "postgresql":
+        return created
+    this_month = month_start(datetime.utcnow())
+    for table in SUBMISSION_TABLES:
+        with db.engine.begin() as connection:
+            if not is_partitioned(connection, table):
+                continue
+            existing = {month for month, _ in partitions(connection, table)}
+            for offset in range(months_ahead + 1):
+                month = add_months(this_month, offset)
+                if month not in existing:
+                    create_partition(connection, table, month)
+                    created.append(partition_name(table, month))
+    return created
+
+
+def _json_default(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else str(value)
+
+
+ARCHIVE_SUFFIX = ".ndjson.gz"
+# Archive files are written under this suffix and renamed once committed
+PENDING_SUFFIX = ARCHIVE_SUFFIX + ".tmp"
+
+
+def _write_archive_file(archive_dir, name, result):
+    """
+    Write result rows to <archive_dir>/<name>.ndjson.gz.tmp
+
+    The caller commits the transaction that removes the rows and then calls
+    _publish_archive_file(); a rerun overwrites rather than appends.
+
+    Returns:
+        Path: The pending file
+    """
+    directory = Path(archive_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    pending = directory / f"{name}{PENDING_SUFFIX}"
+    with gzip.open(pending, "wt", encoding="utf-8") as archive:
+        for row in result.mappings():
+            archive.write(json.dumps(dict(row), default=_json_default) + "\n")
+    # On disk, gzip trailer included, before the rows are deleted
+    with open(pending, "rb") as handle:
+        os.fsync(handle.fileno())
+    return pending
+
+
+def _publish_archive_file(pending):
+    os.replace(pending, pending.with_name(pending.name[: -len(".tmp")]))
+
+
+@contextmanager
+def _archive_transaction(db, archive_dir):
+    """
+    Transaction that may write one archive file; published only on commit
+
+    Yields a one-item list for the pending file's path. A crash between the
+    commit and the rename leaves the .tmp file, which
+    _recover_archive_files() settles on the next run.
+    """
+    pending = [None]
+    try:
+        with db.engine.begin() as connection:
+            yield connection, pending
+    except BaseException:
+        if pending[0] is not None:
+            pending[0].unlink(missing_ok=True)
+        raise
+    if pending[0] is not None:
+        _publish_archive_file(pending[0])
+
+
+def _archived_ids(pending):
+    with gzip.open(pending, "rt", encoding="utf-8") as archive:
+        return [json.loads(line)["id"] for line in archive]
+
+
+def _recover_archive_files(db, archive_dir):
+    """
+    Publish pending archive files whose transaction committed, drop the rest
+
+    A partition's file committed if the partition is gone; a row batch's if
+    none of its rows are left in the live table.
+    """
+    directory = Path(archive_dir)
+    if not directory.exists():
+        return
+    for pending in sorted(directory.glob(f"*{PENDING_SUFFIX}")):
+        name = pending.name[: -len(PENDING_SUFFIX)]
+        with db.engine.connect() as connection:
+            table = next(
+                (table for table in SUBMISSION_TABLES if name.startswith(table)), None
+            )
+            if table and _partition_month(table, name):
+                committed = (
+                    connection.execute(
+                        text("SELECT to_regclass(:name)"), {"name": name}
+                    ).scalar()
+                    is None
+                )
+            elif table:
+                try:
+                    ids = _archived_ids(pending)
+                except (OSError, EOFError, ValueError, KeyError):
+                    # Cut short while writing, so its transaction never committed
+                    committed = False
+                else:
+                    id_list = ", ".join(str(int(row_id)) for row_id in ids) or "NULL"
+                    committed = not connection.execute(
+                        text(f"SELECT count(*) FROM {table} WHERE id IN ({id_list})")
+                    ).scalar()
+            else:
+                # Not named after a submission table, so nothing can publish it
+                committed = False
+        if committed:
+            logger.warning(f"Publishing archive file {name} left by an interrupted run")
+            _publish_archive_file(pending)
+        else:
+            pending.unlink(missing_ok=True)
+
+
+def _linked_intakes(table):
+    """Rows of table that a project points at, which must stay live"""
+    if table != "intake_submission":
+        return None
+    return (
+        "SELECT intake_submission_id FROM project "
+        "WHERE intake_submission_id IS NOT NULL"
+    )
+
+
+def _archive_partitions(db, table, cutoff, archive_dir):
+    archived = []
+    with db.engine.connect() as connection:
+        old = [name for month, name in partitions(connection, table) if month < cutoff]
+    linked = _linked_intakes(table)
+    for name in old:
+        with _archive_transaction(db, archive_dir) as (connection, pending):
+            # Detaching is a catalog change, but don't queue behind long queries
+            connection.execute(text("SET LOCAL lock_timeout = '5s'"))
+            connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+            if linked:
+                # Intakes that became projects go back in, to the default partition
+                connection.execute(
+                    text(
+                        f"INSERT INTO {table} SELECT * FROM {name} "
+                        f"WHERE id IN ({linked})"
+                    )
+                )
+                connection.execute(text(f"DELETE FROM {name} WHERE id IN ({linked})"))
+            if archive_dir:
+                pending[0] = _write_archive_file(
+                    archive_dir, name, connection.execute(text(f"SELECT * FROM {name}"))
+                )
+                connection.execute(text(f"DROP TABLE {name}"))
+            else:
+                connection.execute(
+                    text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}")
+                )
+                connection.execute(
+                    text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}")
+                )
+        logger.info(f"Archived partition {name}")
+        archived.append(name)
+    return archived
+
+
+def _archive_rows(db, table, cutoff, archive_dir, batch_size):
+    """Move rows older than cutoff into <table>_archive a batch at a time"""
+    moved = 0
+    archive_table = f"{table}_archive"
+    linked = _linked_intakes(table)
+    # Intakes that became projects stay while the database enforces the link
+    keep = f" AND id NOT IN ({linked})" if linked else ""
+    if not archive_dir:
+        with db.engine.begin() as connection:
+            connection.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {archive_table} AS "
+                    f"SELECT * FROM {table} WHERE 1 = 0"
+                )
+            )
+    while True:
+        with _archive_transaction(db, archive_dir) as (connection, pending):
+            ids = (
+                connection.execute(
+                    text(
+                        f"SELECT id FROM {table} WHERE submitted_at < :cutoff{keep} "
+                        "ORDER BY id LIMIT :limit"
+                    ),
+                    {"cutoff": cutoff, "limit": batch_size},
+                )
+                .scalars()
+                .all()
+            )
+            if not ids:
+                break
+            id_list = ", ".join(str(int(row_id)) for row_id in ids)
+            if archive_dir:
+                # Named by its first id, so a retried batch overwrites its file
+                pending[0] = _write_archive_file(
+                    archive_dir,
+                    f"{archive_table}_{ids[0]:010d}",
+                    connection.execute(
+                        text(f"SELECT * FROM {table} WHERE id IN ({id_list})")
+                    ),
+                )
+            else:
+                connection.execute(
+                    text(
+                        f"INSERT INTO {archive_table} "
+                        f"SELECT * FROM {table} WHERE id IN ({id_list})"
+                    )
+                )
+            connection.execute(text(f"DELETE FROM {table} WHERE id IN ({id_list})"))
+        moved += len(ids)
+        time.sleep(BATCH_PAUSE_SECONDS)
+    if moved:
+        logger.info(f"Archived {moved} rows from {table}")
+    return moved
+
+
+def archive_submissions(db, hot_months=HOT_MONTHS, archive_dir=ARCHIVE_DIR):
+    """
+    Move submissions older than hot_months whole months out of the live tables
+
+    Returns:
+        dict: Archived partition names (Postgres) or row counts per table
+    """
+    cutoff = add_months(month_start(datetime.utcnow()), -hot_months)
+    if archive_dir:
+        _recover_archive_files(db, archive_dir)
+    results = {}
+    for table in SUBMISSION_TABLES:
+        with db.engine.connect() as connection:
+            partitioned = db.engine.dialect.name == "postgresql" and is_partitioned(
+                connection, table
+            )
+        if partitioned:
+            results[table] = _archive_partitions(db, table, cutoff, archive_dir)
+        else:
+            results[table] = _archive_rows(db, table, cutoff, archive_dir, PURGE_BATCH)
+    return results
+
+
+def _purge_targets(db, table):
+    """Live and archived tables holding rows of a submission table"""
+    inspector = inspect(db.engine)
+    targets = [table]
+    if inspector.has_table(f"{table}_archive"):
+        targets.append(f"{table}_archive")
+    if db.engine.dialect.name == "postgresql" and ARCHIVE_SCHEMA in (
+        inspector.get_schema_names()
+    ):
+        targets.extend(
+            f"{ARCHIVE_SCHEMA}.{name}"
+            for name in inspector.get_table_names(schema=ARCHIVE_SCHEMA)
+            if _partition_month(table, name)
+        )
+    return targets
+
+
+def purge_pii(db, retention_days=PII_RETENTION_DAYS, batch_size=PURGE_BATCH):
+    """
+    Redact personal details from submissions older than retention_days
+
+    Each batch is its own short transaction, so the purge never holds row
+    locks for long and can be interrupted and resumed at any point.
+
+    Returns:
+        dict: Rows redacted per table
+    """
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    results = {}
+    for table, columns in PII_COLUMNS.items():
+        assignments = ", ".join(f"{column} = :{column}" for column in columns)
+        for target in _purge_targets(db, table):
+            redacted = 0
+            statement = text(
+                f"UPDATE {target} SET {assignments} WHERE id IN ("
+                f"SELECT id FROM {target} WHERE submitted_at < :cutoff "
+                "AND email <> :redacted_email LIMIT :limit)"
+            )
+            while True:
+                with db.engine.begin() as connection:
+                    count = connection.execute(
+                        statement,
+                        {
+                            **columns,
+                            "cutoff": cutoff,
+                            "redacted_email": REDACTED_EMAIL,
+                            "limit": batch_size,
+                        },
+                    ).rowcount
+                if not count:
+                    break
+                redacted += count
+                time.sleep(BATCH_PAUSE_SECONDS)
+            if redacted:
+                logger.info(
+                    f"Redacted personal details from {redacted} rows of {target}"
+                )
+            results[target] = redacted
+    return results
+
+
+@contextmanager
+def retention_lock(db):
+    """Yield True if this process should run the job, False if another is"""
+    if db.engine.dialect.name != "postgresql":
+        RETENTION_LOCK_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(RETENTION_LOCK_FILE, "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return
+    with db.engine.connect() as connection:
+        acquired = connection.execute(
+            text("SELECT pg_try_advisory_lock(:id)"), {"id": RETENTION_LOCK_ID}
+        ).scalar()
+        connection.commit()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                connection.execute(
+                    text("SELECT pg_advisory_unlock(:id)"), {"id": RETENTION_LOCK_ID}
+                )
+                connection.commit()
+
+
+def run_retention(db):
+    """Daily job: partitions ahead, archival, then the PII purge"""
+    with retention_lock(db) as acquired:
+        if not acquired:
+            logger.info("Submission retention is already running elsewhere")
+            return None
+        return {
+            "partitions_created": ensure_partitions(db),
+            "archived": archive_submissions(db),
+            "redacted": purge_pii(db),
+        }
+
+
+def status(db):
+    """Partition layout and row counts for the submission tables"""
+    report = {}
+    for table in SUBMISSION_TABLES:
+        with db.engine.connect() as connection:
+            if db.engine.dialect.name == "postgresql" and is_partitioned(
+                connection, table
+            ):
+                layout = {
+                    name: connection.execute(
+                        text(f"SELECT count(*) FROM {name}")
+                    ).scalar()
+                    for _, name in partitions(connection, table)
+                }
+                layout[f"{table}_default"] = connection.execute(
+                    text(f"SELECT count(*) FROM {table}_default")
+                ).scalar()
+            else:
+                layout = {
+                    table: connection.execute(
+                        text(f"SELECT count(*) FROM {table}")
+                    ).scalar()
+                }
+        for target in _purge_targets(db, table)[1:]:
+            with db.engine.connect() as connection:
+                layout[target] = connection.execute(
+                    text(f"SELECT count(*) FROM {target}")
+                ).scalar()
+        report[table] = layout
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Submission archival and PII purge")
+    parser.add_argument("command", choices=["status", "run", "archive", "purge"])
+    parser.add_argument("--to-files", metavar="DIR", help="Archive to NDJSON files")
+    parser.add_argument(
+        "--days", type=int, default=PII_RETENTION_DAYS, help="PII retention in days"
+    )
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.environ.setdefault("DB_POOL_PROFILE", "cli")
+    from app import app, db
+
+    with app.app_context():
+        if args.command == "status":
+            for table, layout in status(db).items():
+                print(f"📦 {table}")
+                for name, count in layout.items():
+                    print(f"   {name}: {count} rows")
+        elif args.command == "run":
+            result = run_retention(db)
+            print("✅ Retention complete" if result else "❌ Retention already running")
+            if result:
+                print(json.dumps(result, indent=2))
+        elif args.command == "archive":
+            result = archive_submissions(db, archive_dir=args.to_files or ARCHIVE_DIR)
+            print(f"✅ Archived: {json.dumps(result)}")
+        else:
+            result = purge_pii(db, retention_days=args.days)
+            print(f"✅ Redacted: {json.dumps(result)}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
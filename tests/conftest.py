@@ -0,0 +1,52 @@
+"""
+Shared test setup
+The app reads its configuration at import, so the environment is set here,
+before any test imports it: a throwaway SQLite database and spool directory,
+and no migrations at boot (the fixture below applies them).
+
+Set TEST_DATABASE_URL to an empty Postgres database to run the suite, and
+the Postgres-only tests, against it.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_scratch = tempfile.mkdtemp(prefix="grey-canvas-tests-")
+os.environ.setdefault("SESSION_SECRET", "test")
+os.environ.setdefault("REPL_ID", "test")
+os.environ["DATABASE_URL"] = os.environ.get(
+    "TEST_DATABASE_URL", f"sqlite:///{_scratch}/test.db"
+)
+os.environ.setdefault("FORM_SPOOL_DIR", os.path.join(_scratch, "spool"))
+os.environ.setdefault("CACHE_DIR", os.path.join(_scratch, "cache"))
+os.environ["DB_MIGRATE_AT_BOOT"] = "off"
+
+postgres_only = pytest.mark.skipif(
+    not os.environ["DATABASE_URL"].startswith("postgres"),
+    reason="needs TEST_DATABASE_URL pointing at Postgres",
+)
+
+
+@pytest.fixture(scope="session")
+def app():
+    from app import app, db
+    from migrations import upgrade
+
+    with app.app_context():
+        upgrade(db)
+    return app
+
+
+@pytest.fixture
+def db(app):
+    from app import db
+
+    with app.app_context():
+        yield db
+        db.session.rollback()
@@ -0,0 +1,32 @@
+"""The custom login URL index follows commits in every worker"""
+
+import uuid
+
+
+def test_login_url_change_is_broadcast(app, db, monkeypatch):
+    from admin_auth import LOGIN_URL_TAG, login_urls
+    from app_cache import cache
+    from models import AdminUser
+
+    name = uuid.uuid4().hex
+    admin = AdminUser(
+        username=name[:20], email=f"{name}@example.com", custom_login_url=name
+    )
+    admin.set_password("Very-Strong-Passw0rd!")
+    db.session.add(admin)
+    db.session.commit()
+    assert name in login_urls
+
+    published = []
+    publish = cache.broadcaster.publish
+    monkeypatch.setattr(
+        cache.broadcaster,
+        "publish",
+        lambda tags: published.append(tags) or publish(tags),
+    )
+    admin.custom_login_url = f"{name}-moved"
+    db.session.commit()
+
+    assert any(LOGIN_URL_TAG in tags for tags in published)
+    assert name not in login_urls
+    assert f"{name}-moved" in login_urls
@@ -0,0 +1,19 @@
+"""Blog feed links come from the configured site URL, not the request"""
+
+import uuid
+
+
+def test_forwarded_host_does_not_reach_the_feed(app, db):
+    from models import BlogPost
+
+    slug = uuid.uuid4().hex
+    db.session.add(BlogPost(title="Feed post", slug=slug, content="Body"))
+    db.session.commit()
+
+    client = app.test_client()
+    spoofed = client.get("/blog/feed.xml", headers={"X-Forwarded-Host": "evil.test"})
+    body = spoofed.get_data(as_text=True)
+
+    assert "evil.test" not in body
+    assert f'{app.config["SITE_URL"]}/blog/{slug}' in body
+    assert client.get("/blog/feed.xml").get_data(as_text=True) == body
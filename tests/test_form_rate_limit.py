@@ -0,0 +1,30 @@
+"""Public form rate limits per forwarded client IP"""
+
+import uuid
+
+
+def test_forwarded_clients_are_limited_independently(app, db, monkeypatch):
+    import routes
+    from form_rate_limit import _limiter
+
+    monkeypatch.setitem(app.config, "WTF_CSRF_ENABLED", False)
+    monkeypatch.setitem(_limiter.limits, ("newsletter", "ip"), (2, 600))
+    monkeypatch.setattr(routes.mail, "send", lambda message: None)
+    client = app.test_client()
+    attacker = {"X-Forwarded-For": "203.0.113.8"}
+    visitor = {"X-Forwarded-For": "198.51.100.24"}
+
+    def subscribe(headers):
+        return client.post(
+            "/newsletter/subscribe",
+            data={"email": f"{uuid.uuid4().hex}@example.com"},
+            headers=headers,
+        )
+
+    assert [subscribe(attacker).status_code for _ in range(2)] == [302, 302]
+
+    refused = subscribe(attacker)
+    assert refused.status_code == 429
+    assert int(refused.headers["Retry-After"]) > 0
+
+    assert subscribe(visitor).status_code == 302
@@ -0,0 +1,70 @@
+"""Admin login throttling per client IP and per account"""
+
+import uuid
+
+import pytest
+
+
+def add_admin(db):
+    from models import AdminUser
+
+    name = uuid.uuid4().hex
+    admin = AdminUser(
+        username=name[:20], email=f"{name}@example.com", custom_login_url=name
+    )
+    admin.set_password("Very-Strong-Passw0rd!")
+    db.session.add(admin)
+    db.session.commit()
+    return admin
+
+
+@pytest.mark.parametrize("store_class", ["MemoryBucketStore", "DatabaseBucketStore"])
+def test_reserve_takes_every_bucket_or_none(db, store_class):
+    import login_throttle
+    from login_throttle import ACCOUNT_LIMIT, IP_LIMIT
+
+    store = getattr(login_throttle, store_class)()
+    name = uuid.uuid4().hex
+    ip, account = (f"ip:{name}", IP_LIMIT), (f"account:{name}", ACCOUNT_LIMIT)
+    now = 1_000_000.0
+
+    for _ in range(int(ACCOUNT_LIMIT.capacity)):
+        assert store.reserve([ip, account], now) == (None, 0)
+    empty, wait = store.reserve([ip, account], now)
+    assert empty == account[0] and wait > 0
+
+    # The refused attempt left the IP bucket alone
+    remaining = int(IP_LIMIT.capacity - ACCOUNT_LIMIT.capacity)
+    for _ in range(remaining):
+        assert store.reserve([ip], now) == (None, 0)
+    assert store.reserve([ip], now)[0] == ip[0]
+
+    store.refund([ip], now)
+    assert store.reserve([ip], now) == (None, 0)
+
+
+def test_forwarded_clients_have_their_own_ip_bucket(app, db, monkeypatch):
+    from login_throttle import ACCOUNT_LIMIT
+
+    monkeypatch.setitem(app.config, "WTF_CSRF_ENABLED", False)
+    admins = [add_admin(db) for _ in range(3)]
+    client = app.test_client()
+    attacker = {"X-Forwarded-For": "203.0.113.7"}
+    visitor = {"X-Forwarded-For": "198.51.100.23"}
+
+    def attempt(admin, headers):
+        return client.post(
+            f"/admin-{admin.custom_login_url}",
+            data={"username": admin.username, "password": "wrong"},
+            headers=headers,
+        ).status_code
+
+    # Spend the attacker's IP budget across two accounts
+    per_account = int(ACCOUNT_LIMIT.capacity)
+    for admin in admins[:2]:
+        assert [attempt(admin, attacker) for _ in range(per_account)] == [
+            200
+        ] * per_account
+
+    assert attempt(admins[2], attacker) == 429
+    assert attempt(admins[2], visitor) == 200
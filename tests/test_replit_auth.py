@@ -0,0 +1,88 @@
+"""Refreshing Replit OAuth tokens that other workers may have rotated"""
+
+import time
+import uuid
+
+import pytest
+from flask import g
+from flask_login import login_user
+from oauthlib.oauth2.rfc6749.errors import InvalidGrantError
+from requests_oauthlib import OAuth2Session
+
+BROWSER = "browser-session"
+
+
+@pytest.fixture
+def signed_in(app, db):
+    """A signed-in Replit user's request; yields the blueprint and a stored-token reader"""
+    from models import OAuth, User
+
+    user_id = f"user-{uuid.uuid4().hex}"
+    user = User(id=user_id, email=f"{user_id}@example.com")
+    db.session.add(user)
+    db.session.commit()
+    blueprint = app.blueprints["replit_auth"]
+
+    def stored():
+        db.session.expire_all()
+        return (
+            db.session.query(OAuth)
+            .filter_by(user_id=user.id, browser_session_key=BROWSER)
+            .one()
+            .token
+        )
+
+    with app.test_request_context("/"):
+        login_user(user)
+        g.browser_session_key = BROWSER
+        yield blueprint, stored
+
+
+def token(name, expires_in):
+    return {
+        "access_token": f"{name}-access",
+        "refresh_token": f"{name}-refresh",
+        "token_type": "Bearer",
+        "expires_in": expires_in,
+        "expires_at": time.time() + expires_in,
+    }
+
+
+def test_rejected_refresh_uses_the_token_another_worker_stored(
+    signed_in, db, monkeypatch
+):
+    from models import OAuth
+    from replit_auth import refresh_token
+
+    blueprint, stored = signed_in
+    blueprint.token = token("old", -10)
+    oauth_session = blueprint.session
+    assert oauth_session.token["access_token"] == "old-access"
+
+    # Another worker refreshed first; its token went straight to the database
+    db.session.query(OAuth).filter_by(browser_session_key=BROWSER).update(
+        {"token": token("new", 3600)}
+    )
+    db.session.commit()
+
+    def rejected(self, *args, **kwargs):
+        raise InvalidGrantError()
+
+    monkeypatch.setattr(OAuth2Session, "refresh_token", rejected)
+
+    assert refresh_token(oauth_session)
+    assert oauth_session.token["access_token"] == "new-access"
+
+
+def test_refreshed_token_is_stored(signed_in, monkeypatch):
+    from replit_auth import refresh_token
+
+    blueprint, stored = signed_in
+    blueprint.token = token("old", -10)
+    monkeypatch.setattr(
+        OAuth2Session, "refresh_token", lambda self, *a, **kw: token("new", 3600)
+    )
+
+    assert refresh_token(blueprint.session)
+    assert stored()["refresh_token"] == "new-refresh"
+    assert blueprint.session.token["refresh_token"] == "new-refresh"
@@ -0,0 +1,11 @@
+"""The cached sitemap is built from the configured site URL"""
+
+
+def test_forwarded_host_does_not_reach_the_sitemap(app, db):
+    client = app.test_client()
+    spoofed = client.get("/sitemap.xml", headers={"X-Forwarded-Host": "evil.test"})
+    body = spoofed.get_data(as_text=True)
+
+    assert "evil.test" not in body
+    assert f'<loc>{app.config["SITE_URL"]}/</loc>' in body
+    assert client.get("/sitemap.xml").get_data(as_text=True) == body
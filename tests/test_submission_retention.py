@@ -0,0 +1,197 @@
+"""Submission archival, and the partitioned schema on Postgres"""
+
+import gzip
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from conftest import postgres_only
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+OLD = datetime.utcnow() - timedelta(days=3 * 365)
+
+
+def add_contact(db, submitted_at):
+    from models import ContactSubmission
+
+    submission = ContactSubmission(
+        name=f"visitor-{uuid.uuid4().hex}",
+        email="visitor@example.com",
+        subject="Hello",
+        message="Hi",
+        submitted_at=submitted_at,
+    )
+    db.session.add(submission)
+    db.session.commit()
+    return submission.id
+
+
+def add_intake(db, submitted_at):
+    from models import IntakeSubmission
+
+    intake = IntakeSubmission(
+        business_name=f"business-{uuid.uuid4().hex}",
+        contact_name="Client",
+        email="client@example.com",
+        website_type="business",
+        timeline="soon",
+        budget="some",
+        project_description="A site",
+        submitted_at=submitted_at,
+    )
+    db.session.add(intake)
+    db.session.commit()
+    return intake.id
+
+
+def add_project(db, intake_id):
+    from models import Project
+
+    project = Project(
+        client_name="Client",
+        project_name="Site",
+        project_type="website",
+        client_email="client@example.com",
+        intake_submission_id=intake_id,
+    )
+    db.session.add(project)
+    db.session.commit()
+    return project.id
+
+
+def split_old_month(db):
+    """On Postgres, give the seeded month its own partition, as migration 4 would"""
+    from submission_retention import (
+        SUBMISSION_TABLES,
+        create_partition,
+        is_partitioned,
+        month_start,
+        partitions,
+    )
+
+    if db.engine.dialect.name != "postgresql":
+        return
+    month = month_start(OLD)
+    with db.engine.begin() as connection:
+        for table in SUBMISSION_TABLES:
+            if not is_partitioned(connection, table):
+                continue
+            if month not in {existing for existing, _ in partitions(connection, table)}:
+                create_partition(connection, table, month)
+
+
+def archived_rows(directory, table):
+    rows = []
+    for path in directory.glob(f"{table}_*.ndjson.gz"):
+        with gzip.open(path, "rt", encoding="utf-8") as archive:
+            rows.extend(json.loads(line) for line in archive)
+    return rows
+
+
+def test_archive_to_files_once_and_keeps_linked_intakes(db, tmp_path):
+    from models import ContactSubmission, IntakeSubmission
+    from submission_retention import archive_submissions
+
+    contact_id = add_contact(db, OLD)
+    recent_id = add_contact(db, datetime.utcnow())
+    linked_id = add_intake(db, OLD)
+    add_project(db, linked_id)
+    split_old_month(db)
+
+    archive_submissions(db, hot_months=12, archive_dir=tmp_path)
+    archive_submissions(db, hot_months=12, archive_dir=tmp_path)
+    db.session.expire_all()
+
+    contacts = [row["id"] for row in archived_rows(tmp_path, "contact_submission")]
+    intakes = [row["id"] for row in archived_rows(tmp_path, "intake_submission")]
+    assert contacts.count(contact_id) == 1
+    assert recent_id not in contacts and linked_id not in intakes
+    assert not list(tmp_path.glob("*.tmp"))
+    assert db.session.get(ContactSubmission, contact_id) is None
+    assert db.session.get(ContactSubmission, recent_id) is not None
+    assert db.session.query(IntakeSubmission).filter_by(id=linked_id).count() == 1
+
+
+def test_interrupted_archive_files_are_settled(db, tmp_path):
+    from submission_retention import PENDING_SUFFIX, archive_submissions
+
+    committed_id = add_contact(db, OLD)
+    rolled_back_id = add_contact(db, datetime.utcnow())
+    db.session.execute(
+        text("DELETE FROM contact_submission WHERE id = :id"), {"id": committed_id}
+    )
+    db.session.commit()
+    for name, row_id in (
+        ("contact_submission_archive_committed", committed_id),
+        ("contact_submission_archive_rolled_back", rolled_back_id),
+    ):
+        with gzip.open(tmp_path / f"{name}{PENDING_SUFFIX}", "wt") as pending:
+            pending.write(json.dumps({"id": row_id}) + "\n")
+    (tmp_path / f"stray{PENDING_SUFFIX}").write_bytes(b"")
+
+    archive_submissions(db, hot_months=12, archive_dir=tmp_path)
+
+    assert (tmp_path / "contact_submission_archive_committed.ndjson.gz").exists()
+    assert not list(tmp_path.glob("*rolled_back*"))
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_only_one_process_holds_the_retention_lock(db):
+    from submission_retention import retention_lock
+
+    with retention_lock(db) as first:
+        with retention_lock(db) as second:
+            assert first and not second
+    with retention_lock(db) as again:
+        assert again
+
+
+@postgres_only
+def test_submission_tables_are_partitioned(db):
+    from submission_retention import SUBMISSION_TABLES, is_partitioned
+
+    with db.engine.connect() as connection:
+        for table in SUBMISSION_TABLES:
+            assert is_partitioned(connection, table)
+
+
+@postgres_only
+def test_project_must_name_an_existing_intake(db):
+    with pytest.raises(IntegrityError):
+        add_project(db, 2_000_000_000)
+    db.session.rollback()
+
+
+@postgres_only
+def test_intake_named_by_a_project_cannot_be_deleted(db):
+    intake_id = add_intake(db, datetime.utcnow())
+    add_project(db, intake_id)
+    with pytest.raises(IntegrityError):
+        db.session.execute(
+            text("DELETE FROM intake_submission WHERE id = :id"), {"id": intake_id}
+        )
+        db.session.commit()
+    db.session.rollback()
+
+
+@postgres_only
+def test_new_partition_claims_linked_intakes_from_default(db):
+    from submission_retention import add_months, create_partition, month_start
+
+    # Far enough ahead that no partition covers it yet: lands in default
+    month = add_months(month_start(datetime.utcnow()), 24)
+    intake_id = add_intake(db, datetime.combine(month, datetime.min.time()))
+    add_project(db, intake_id)
+
+    with db.engine.begin() as connection:
+        create_partition(connection, "intake_submission", month)
+        [(partition,)] = connection.execute(
+            text(
+                "SELECT tableoid::regclass::text FROM intake_submission "
+                "WHERE id = :id"
+            ),
+            {"id": intake_id},
+        ).all()
+    assert partition.endswith(f"{month:%Y_%m}")
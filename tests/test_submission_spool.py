@@ -0,0 +1,115 @@
+"""Replaying the submission spool after a database outage"""
+
+import shutil
+import uuid
+
+import pytest
+
+
+@pytest.fixture
+def queue(app):
+    from submission_queue import SubmissionQueue, SubmissionSpool, SPOOL_DIR
+
+    shutil.rmtree(SPOOL_DIR, ignore_errors=True)
+    return SubmissionQueue(SubmissionSpool(SPOOL_DIR), enabled=False)
+
+
+def newsletter_record(email):
+    from models import NewsletterSubscription
+    from submission_queue import spool_record
+
+    return spool_record("newsletter", NewsletterSubscription(email=email))
+
+
+def contact_record(name):
+    from models import ContactSubmission
+    from submission_queue import spool_record
+
+    submission = ContactSubmission(
+        name=name, email="visitor@example.com", subject="Hello", message="Hi"
+    )
+    return spool_record("contact", submission, uuid.uuid4().hex)
+
+
+def test_unreplayable_record_does_not_block_later_ones(app, queue):
+    from models import ContactSubmission, NewsletterSubscription
+
+    before = newsletter_record(f"before-{uuid.uuid4().hex}@example.com")
+    # A column that no longer exists, as after a schema change
+    broken = newsletter_record(f"broken-{uuid.uuid4().hex}@example.com")
+    broken["values"]["dropped_column"] = "x"
+    after = newsletter_record(f"after-{uuid.uuid4().hex}@example.com")
+    later = contact_record(f"later-{uuid.uuid4().hex}")
+    first = queue.spool.write([before, broken, after])
+    second = queue.spool.write([later])
+
+    assert queue.commit_files([first, second])
+
+    with app.app_context():
+        emails = {
+            subscription.email
+            for subscription in NewsletterSubscription.query.filter(
+                NewsletterSubscription.email.in_(
+                    [r["values"]["email"] for r in (before, broken, after)]
+                )
+            )
+        }
+        assert emails == {before["values"]["email"], after["values"]["email"]}
+        assert (
+            ContactSubmission.query.filter_by(name=later["values"]["name"]).count() == 1
+        )
+
+    assert queue.spool.files() == []
+    [dead_letter] = queue.spool.dead_letter_files()
+    [rejected] = queue.spool.read(dead_letter)
+    assert rejected["values"]["email"] == broken["values"]["email"]
+    assert "dropped_column" in rejected["error"]
+
+
+def test_replayed_records_are_not_saved_twice(app, queue):
+    from models import ContactSubmission
+
+    record = contact_record(f"replayed-{uuid.uuid4().hex}")
+    assert queue.commit_files([queue.spool.write([record])])
+    assert queue.commit_files([queue.spool.write([record])])
+
+    with app.app_context():
+        assert (
+            ContactSubmission.query.filter_by(name=record["values"]["name"]).count()
+            == 1
+        )
+    assert queue.spool.dead_letter_files() == []
+
+
+def test_spool_is_replayed_from_the_first_request(app, queue, monkeypatch):
+    import submission_queue
+
+    queue.spool.write([newsletter_record(f"{uuid.uuid4().hex}@example.com")])
+    monkeypatch.setattr(submission_queue, "submission_queue", queue)
+    monkeypatch.setattr(submission_queue, "_spool_checked", False)
+    assert not queue._threads
+
+    try:
+        app.test_client().get("/robots.txt")
+        assert queue._threads
+    finally:
+        queue.stop()
+
+
+def test_abandoned_temporary_files_are_removed(queue):
+    from submission_queue import DEAD_LETTER_DIR, _writer_prefix
+
+    dead_letters = queue.spool.directory / DEAD_LETTER_DIR
+    dead_letters.mkdir(parents=True)
+    # PID 2**22 + 1 is above Linux's pid_max, so its writer cannot be alive
+    abandoned = [
+        queue.spool.directory / f"{2**22 + 1}-0-1-1.tmp",
+        dead_letters / f"{2**22 + 1}-0-1-2.tmp",
+    ]
+    in_progress = queue.spool.directory / f"{_writer_prefix()}-1-3.tmp"
+    for path in (*abandoned, in_progress):
+        path.write_text("{}\n")
+
+    assert queue.spool.remove_abandoned() == 2
+    assert not any(path.exists() for path in abandoned)
+    assert in_progress.exists()
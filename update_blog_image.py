@@ -5,6 +5,7 @@ Update the featured image for the website redesign blog post
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DB_POOL_PROFILE", "cli")
 
 from app import app, db
 from models import BlogPost
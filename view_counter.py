@@ -0,0 +1,206 @@
+"""
+Buffered write-behind view counters for blog posts
+Counts views in memory and flushes aggregated increments in one batched UPSERT
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from app import app, db
+from models import BlogPost, BlogPostViewCount
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = float(os.environ.get("VIEW_COUNTER_FLUSH_SECONDS", "5"))
+RANKING_INTERVAL = float(os.environ.get("POPULAR_POSTS_REFRESH_SECONDS", "300"))
+POPULAR_POSTS_LIMIT = 5
+
+
+class ViewCounterBuffer:
+    """In-process view counter that never blocks the request on a database write"""
+
+    def __init__(
+        self, flush_interval=FLUSH_INTERVAL, ranking_interval=RANKING_INTERVAL
+    ):
+        self.flush_interval = flush_interval
+        self.ranking_interval = ranking_interval
+        # Off for synthetic traffic such as the index advisor's crawl
+        self.enabled = True
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._popular_posts = []
+        self._ranking_computed_at = 0.0
+        self._ranking_lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def record(self, post_id):
+        """Count one view of a post; only touches memory"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._pending[post_id] += 1
+        if self._thread is None:
+            self.start()
+
+    def start(self):
+        """Start the background flush thread once per worker"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="view-counter-flush", daemon=True
+            )
+            self._thread.start()
+        atexit.register(self.stop)
+        logger.info(f"View counter started - flushing every {self.flush_interval}s")
+
+    def stop(self):
+        """Flush whatever is buffered before the worker exits"""
+        self._stop.set()
+        self.flush()
+
+    def _run(self):
+        """Background loop: flush increments and refresh the popular ranking"""
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+                ranking_age = time.monotonic() - self._ranking_computed_at
+                if ranking_age >= self.ranking_interval:
+                    self.refresh_popular_posts()
+            except Exception as e:
+                logger.error(f"View counter loop error: {str(e)}")
+
+    def _take_pending(self):
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        return pending
+
+    def _requeue(self, pending):
+        with self._lock:
+            self._pending.update(pending)
+
+    def flush(self):
+        """Write all buffered increments in a single UPSERT statement"""
+        pending = self._take_pending()
+        if not pending:
+            return 0
+
+        with app.app_context():
+            try:
+                try:
+                    self._upsert(pending)
+                except IntegrityError:
+                    # A post was deleted while its views were buffered: drop
+                    # only its counts and write the rest
+                    db.session.rollback()
+                    missing = self._missing_posts(pending)
+                    logger.warning(f"Dropped view counts for missing posts {missing}")
+                    for post_id in missing:
+                        del pending[post_id]
+                    if not pending:
+                        return 0
+                    self._upsert(pending)
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                self._requeue(pending)
+                logger.error(f"Database error flushing view counts: {e}")
+                return 0
+
+        return sum(pending.values())
+
+    def _upsert(self, pending):
+        now = datetime.utcnow()
+        rows = [
+            {"post_id": post_id, "view_count": count, "updated_at": now}
+            for post_id, count in pending.items()
+        ]
+        dialect = db.engine.dialect.name
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        table = BlogPostViewCount.__table__
+        stmt = insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.post_id],
+            set_={
+                "view_count": table.c.view_count + stmt.excluded.view_count,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        db.session.execute(stmt)
+        db.session.commit()
+
+    @staticmethod
+    def _missing_posts(pending):
+        """Buffered post ids that no longer have a blog_post row"""
+        existing = {
+            post_id
+            for (post_id,) in db.session.query(BlogPost.id).filter(
+                BlogPost.id.in_(list(pending))
+            )
+        }
+        return sorted(set(pending) - existing)
+
+    def refresh_popular_posts(self, limit=POPULAR_POSTS_LIMIT):
+        """Recompute the most read published posts and cache the result"""
+        with app.app_context():
+            try:
+                rows = (
+                    db.session.query(
+                        BlogPost.id,
+                        BlogPost.title,
+                        BlogPost.slug,
+                        BlogPostViewCount.view_count,
+                    )
+                    .join(BlogPostViewCount, BlogPostViewCount.post_id == BlogPost.id)
+                    .filter(BlogPost.published == True)  # noqa: E712
+                    .order_by(BlogPostViewCount.view_count.desc())
+                    .limit(limit)
+                    .all()
+                )
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                logger.error(f"Database error computing popular posts: {e}")
+                return self._popular_posts
+
+        self._popular_posts = [
+            {"id": r.id, "title": r.title, "slug": r.slug, "view_count": r.view_count}
+            for r in rows
+        ]
+        self._ranking_computed_at = time.monotonic()
+        return self._popular_posts
+
+    def popular_posts(self):
+        """
+        Return the cached ranking
+
+        A fresh worker computes it on the first call, and starts the
+        background thread that keeps it current; later calls never touch
+        the database.
+        """
+        if not self._ranking_computed_at:
+            with self._ranking_lock:
+                if not self._ranking_computed_at:
+                    self.refresh_popular_posts()
+            self.start()
+        return self._popular_posts
+
+
+view_counter = ViewCounterBuffer()
+
+
+def record_view(post_id):
+    """Record a blog post view for the write-behind buffer"""
+    view_counter.record(post_id)
+
+
+def get_popular_posts():
+    """Most read posts from the last computed ranking"""
+    return view_counter.popular_posts()